@@ -0,0 +1,93 @@
+#app/core/allergens.py
+import re
+from enum import IntFlag
+
+# Canonical allergens (the 14 allergens of EU labelling rules), stored on menu
+# items as a bitmask in MenuItem.allergen_mask. Bit values are persisted: never
+# renumber them, only append new ones.
+
+class Allergen(IntFlag):
+    GLUTEN = 1 << 0
+    DAIRY = 1 << 1
+    EGGS = 1 << 2
+    NUTS = 1 << 3
+    PEANUTS = 1 << 4
+    SOY = 1 << 5
+    FISH = 1 << 6
+    CRUSTACEANS = 1 << 7
+    MOLLUSCS = 1 << 8
+    SESAME = 1 << 9
+    CELERY = 1 << 10
+    MUSTARD = 1 << 11
+    SULPHITES = 1 << 12
+    LUPIN = 1 << 13
+
+
+# display names, in canonical order
+ALLERGEN_NAMES = {allergen: allergen.name.capitalize() for allergen in Allergen}
+
+_ALIASES = {
+    **{allergen.name.lower(): allergen for allergen in Allergen},
+    "wheat": Allergen.GLUTEN,
+    "milk": Allergen.DAIRY,
+    "lactose": Allergen.DAIRY,
+    "egg": Allergen.EGGS,
+    "nut": Allergen.NUTS,
+    "tree nut": Allergen.NUTS,
+    "tree nuts": Allergen.NUTS,
+    "peanut": Allergen.PEANUTS,
+    "soya": Allergen.SOY,
+    "soybean": Allergen.SOY,
+    "soybeans": Allergen.SOY,
+    "crustacean": Allergen.CRUSTACEANS,
+    "mollusc": Allergen.MOLLUSCS,
+    "mollusk": Allergen.MOLLUSCS,
+    "mollusks": Allergen.MOLLUSCS,
+    "shellfish": Allergen.CRUSTACEANS | Allergen.MOLLUSCS,
+    "sesame seeds": Allergen.SESAME,
+    "sulphite": Allergen.SULPHITES,
+    "sulfite": Allergen.SULPHITES,
+    "sulfites": Allergen.SULPHITES,
+    "lupine": Allergen.LUPIN,
+}
+
+# values meaning "no allergens" in existing data (e.g. "None")
+_NONE_VALUES = {"none", "n/a", "na", "nil", "-"}
+
+_SEPARATORS = re.compile(r"[,;/]")
+
+
+# Returns (mask, unrecognized names) for a comma-separated allergen list
+def parse_allergens(text: str | None) -> tuple[int, list[str]]:
+    mask, unknown = 0, []
+    for name in _SEPARATORS.split(text or ""):
+        name = " ".join(name.split()).lower()
+        if not name or name in _NONE_VALUES:
+            continue
+        allergen = _ALIASES.get(name)
+        if allergen is None:
+            unknown.append(name)
+        else:
+            mask |= allergen
+    return mask, unknown
+
+
+def allergen_mask(text: str | None) -> int:
+    return parse_allergens(text)[0]
+
+
+# e.g. 3 -> "Gluten, Dairy"; None when there are no allergens
+def format_allergens(mask: int) -> str | None:
+    names = [name for allergen, name in ALLERGEN_NAMES.items() if mask & allergen]
+    return ", ".join(names) or None
+
+
+# Canonical form of user input; raises ValueError for unrecognized allergens
+def normalize_allergens(text: str | None) -> str | None:
+    mask, unknown = parse_allergens(text)
+    if unknown:
+        raise ValueError(
+            f"Unknown allergens: {', '.join(unknown)}. "
+            f"Known allergens: {', '.join(ALLERGEN_NAMES.values())}"
+        )
+    return format_allergens(mask)
@@ -0,0 +1,160 @@
+#app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from app.core.config import (
+    MENU_CACHE_ENABLED, MENU_CACHE_BACKEND, MENU_CACHE_MAX_ENTRIES, MENU_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+# Menu cache
+# Stores pre-serialized JSON response bodies (with their validators) for the
+# public menu/restaurant reads.
+# Every entry belongs to a scope: a restaurant id, or None for responses that span
+# several restaurants (e.g. unfiltered listings). Each scope has a generation
+# counter; an entry is only served while the generation it was built under is
+# still current, so invalidating a restaurant is a single counter bump.
+
+ALL_RESTAURANTS = None
+
+
+class CacheBackend:
+    """Storage interface for the menu cache.
+
+    Entries may live per worker, but generations must be shared by every
+    worker that serves the API, so that a write handled by one worker
+    invalidates what the others have cached (e.g. a Redis INCR per scope).
+    """
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_generation(self, scope: int | None) -> int:
+        raise NotImplementedError
+
+    def bump_generation(self, scope: int | None) -> int:
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """Bounded LRU with a TTL, local to the current process."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._generations: dict[int | None, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_generation(self, scope: int | None) -> int:
+        return self._generations.get(scope, 0)
+
+    def bump_generation(self, scope: int | None) -> int:
+        with self._lock:
+            generation = self._generations.get(scope, 0) + 1
+            self._generations[scope] = generation
+            return generation
+
+
+class MenuCache:
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self._listeners = []
+
+    def add_listener(self, callback) -> None:
+        # callback(restaurant_id) runs after each invalidation, so that other
+        # data derived from menus (e.g. the search index) can follow writes
+        self._listeners.append(callback)
+
+    @staticmethod
+    def make_key(kind: str, **params) -> str:
+        # None values are dropped so that omitted and default filters share an entry
+        query = urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+        return f"{kind}?{query}"
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        scope, generation, value = entry
+        if generation != self.backend.get_generation(scope):
+            return None
+        return value
+
+    def token(self) -> int:
+        # taken before reading from the database; see set()
+        return self.backend.get_generation(ALL_RESTAURANTS)
+
+    def set(self, key: str, scope: int | None, value, token: int) -> None:
+        if not self.enabled:
+            return
+        # any write since the read began bumps ALL_RESTAURANTS first, so the value
+        # may already be stale: skip storing it rather than serve it later.
+        # The scope generation is read before the check so a write racing with
+        # this call leaves the entry with an outdated generation.
+        generation = self.backend.get_generation(scope)
+        if token != self.backend.get_generation(ALL_RESTAURANTS):
+            return
+        self.backend.set(key, (scope, generation, value))
+
+    def invalidate_restaurant(self, restaurant_id: int) -> None:
+        # a restaurant's data also appears in cross-restaurant responses;
+        # ALL_RESTAURANTS is bumped first so in-flight reads are not stored
+        self.backend.bump_generation(ALL_RESTAURANTS)
+        self.backend.bump_generation(restaurant_id)
+        for callback in self._listeners:
+            callback(restaurant_id)
+
+
+def _create_backend(name: str) -> CacheBackend:
+    if name == "memory":
+        return InMemoryBackend(MENU_CACHE_MAX_ENTRIES, MENU_CACHE_TTL_SECONDS)
+    raise ValueError(f"Unknown MENU_CACHE_BACKEND: {name}")
+
+
+menu_cache = MenuCache(_create_backend(MENU_CACHE_BACKEND), enabled=MENU_CACHE_ENABLED)
+
+
+# Auth state of recently seen users, keyed by "user:<id>": (token_version, is_active).
+# Lets get_current_user trust the claims of a token without a database round trip.
+principal_cache = InMemoryBackend(PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS)
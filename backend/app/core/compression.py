@@ -0,0 +1,168 @@
+#app/core/compression.py
+import gzip
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.cache import InMemoryBackend
+from app.core.config import (
+    COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_MAX_ENTRIES, MENU_CACHE_TTL_SECONDS
+)
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+# Response compression (gzip, and brotli when installed) negotiated via Accept-Encoding.
+#
+# Bodies carrying a strong ETag are the cached/pre-serialized menu responses, whose
+# ETag changes with the menu version: their compressed form is kept in a small LRU
+# keyed by ETag, so it is computed once per version instead of once per request.
+
+IDENTITY = "identity"
+# encodings this process can produce, smallest output first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+# Picks the encoding to serve from an Accept-Encoding header, preferring the smallest
+def negotiate_encoding(accept_encoding: str | None, available) -> str:
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in available and quality > 0:
+            return encoding
+    return IDENTITY
+
+
+# best=True for output that is stored and served many times (e.g. menu snapshots)
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output reproducible
+        return gzip.compress(body, compresslevel=9 if best else COMPRESSION_GZIP_LEVEL, mtime=0)
+    return brotli.compress(body, quality=11 if best else COMPRESSION_BROTLI_QUALITY)
+
+
+class _StreamCompressor:
+    # compresses a streamed body chunk by chunk, flushing after each one so
+    # that clients receive data as it is produced
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "gzip":
+            data = self._compressor.compress(chunk)
+            return data + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        data = self._compressor.process(chunk)
+        return data + (self._compressor.finish() if final else self._compressor.flush())
+
+
+# compressed bodies by (encoding, ETag); per worker
+compressed_cache = InMemoryBackend(COMPRESSION_CACHE_MAX_ENTRIES, MENU_CACHE_TTL_SECONDS)
+
+
+def _is_compressible(headers) -> bool:
+    content_type = headers.get("content-type", "")
+    # event streams are long-lived and mostly idle: a compressor each would cost more
+    # memory than their small events save
+    if content_type.startswith("text/event-stream"):
+        return False
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _set_encoding_headers(headers: MutableHeaders, encoding: str) -> None:
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    # the compressed bytes differ from the ones the ETag was computed for; a weak
+    # validator still lets If-None-Match revalidate (see is_not_modified)
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware (see MetricsMiddleware)."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), SUPPORTED_ENCODINGS)
+        if encoding == IDENTITY:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None  # set while compressing a streamed body
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                await send({"type": "http.response.body", "body": compressor.compress(body, not more_body), "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if start["status"] in (204, 304) or not _is_compressible(headers) or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if more_body:
+                compressor = _StreamCompressor(encoding)
+                _set_encoding_headers(headers, encoding)
+                del headers["content-length"]
+                await send(start)
+                await send({"type": "http.response.body", "body": compressor.compress(body, False), "more_body": True})
+                return
+
+            etag = headers.get("etag")
+            key = f"{encoding}:{etag}:{len(body)}" if etag and not etag.startswith("W/") else None
+            compressed = compressed_cache.get(key) if key else None
+            if compressed is None:
+                compressed = compress(body, encoding)
+                if key:
+                    compressed_cache.set(key, compressed)
+            if len(compressed) >= len(body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            _set_encoding_headers(headers, encoding)
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
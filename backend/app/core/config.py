@@ -4,6 +4,146 @@ import os
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# async engine (asyncpg / aiosqlite); the URL is derived from DATABASE_URL when not set
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# applies pending Alembic migrations when the app starts (convenient in development)
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+# otherwise startup can check (read-only) that the database is at the latest migration
+VERIFY_SCHEMA_ON_STARTUP = os.getenv("VERIFY_SCHEMA_ON_STARTUP", "false").lower() == "true"
+
+# Connection pool (per engine, per worker: size Postgres for workers * (size + overflow))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+# connections opened per engine at startup, before the first request (at most DB_POOL_SIZE)
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", 1))
+# Postgres only; 0 disables the timeout
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
+
+# Password hashing
+# changing BCRYPT_ROUNDS rehashes existing passwords on their next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 16))
+
+# Rate limiting (429 with Retry-After, see app/core/rate_limit.py)
+# limits are "<requests>/<second|minute|hour>"; per worker with the "memory" backend
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# per client IP and group of routers; bursts of up to <requests> are allowed
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "20/minute")
+RATE_LIMIT_MENU = os.getenv("RATE_LIMIT_MENU", "300/minute")
+RATE_LIMIT_ADMIN = os.getenv("RATE_LIMIT_ADMIN", "120/minute")
+# failed logins per account; further attempts are refused without checking the password
+RATE_LIMIT_LOGIN_FAILURES = os.getenv("RATE_LIMIT_LOGIN_FAILURES", "5/15minute")
+
+# Menu cache
+MENU_CACHE_ENABLED = os.getenv("MENU_CACHE_ENABLED", "true").lower() == "true"
+MENU_CACHE_BACKEND = os.getenv("MENU_CACHE_BACKEND", "memory")
+MENU_CACHE_MAX_ENTRIES = int(os.getenv("MENU_CACHE_MAX_ENTRIES", 2048))
+MENU_CACHE_TTL_SECONDS = int(os.getenv("MENU_CACHE_TTL_SECONDS", 300))
+
+
+# Principal cache (auth fast path)
+# per-worker; another worker notices a revoked token at the latest after the TTL
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 4096))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+
+# Metrics (/metrics endpoint and SQL instrumentation)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Query tracking (debug/test): per-request query budgets and N+1 detection
+# strict mode raises on the offending statement instead of logging a warning
+QUERY_TRACKING_ENABLED = os.getenv("QUERY_TRACKING_ENABLED", "false").lower() == "true"
+QUERY_TRACKING_STRICT = os.getenv("QUERY_TRACKING_STRICT", "false").lower() == "true"
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", 10))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 3))
+# Bulk menu import/export (admin)
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", 5000))
+BULK_IMPORT_MAX_BYTES = int(os.getenv("BULK_IMPORT_MAX_BYTES", 5 * 1024 * 1024))
+# rows per INSERT statement; also the page size of the streaming export
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 500))
+
+# Search (GET /api/search)
+# "memory": in-process inverted index, refreshed per restaurant after menu writes
+# "postgres": full-text search in the database (requires PostgreSQL)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+# the in-process index is per worker; it is rebuilt after this long to pick up writes served by other workers
+SEARCH_INDEX_MAX_AGE_SECONDS = int(os.getenv("SEARCH_INDEX_MAX_AGE_SECONDS", 300))
+
+# Menu translations (?lang= on the menu endpoints, see app/core/translation.py)
+TRANSLATION_SOURCE_LANGUAGE = os.getenv("TRANSLATION_SOURCE_LANGUAGE", "en")
+# languages menus are translated into, e.g. "ar,fr"; none by default
+TRANSLATION_LANGUAGES = [lang.strip() for lang in os.getenv("TRANSLATION_LANGUAGES", "").split(",") if lang.strip()]
+# "dictionary": local word lists from TRANSLATION_DICTIONARY_PATH, a JSON file of
+#   {"<lang>": {"<source word or phrase>": "<translation>"}} (development and tests)
+# "libretranslate": a LibreTranslate-compatible API at TRANSLATION_API_URL
+TRANSLATION_PROVIDER = os.getenv("TRANSLATION_PROVIDER", "dictionary")
+TRANSLATION_DICTIONARY_PATH = os.getenv("TRANSLATION_DICTIONARY_PATH")
+TRANSLATION_API_URL = os.getenv("TRANSLATION_API_URL", "http://localhost:5000")
+TRANSLATION_API_KEY = os.getenv("TRANSLATION_API_KEY")
+TRANSLATION_TIMEOUT_SECONDS = float(os.getenv("TRANSLATION_TIMEOUT_SECONDS", 30))
+# texts per provider request
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", 50))
+
+# Background jobs (outbox table "jobs", see app/core/jobs.py)
+# workers per process; 0 leaves the jobs to a separate `python -m app.db.jobs` process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# how often idle workers look for jobs enqueued by other processes or due for a retry
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 5))
+# a failed job is retried with exponential backoff until it has run this many times
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", 2))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", 300))
+# a job still running after this long is assumed lost (its worker died) and run again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 600))
+# on shutdown, running jobs get this long to finish before they are cancelled
+JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", 10))
+
+# Menu events (GET /api/restaurants/{id}/menu/events, server-sent events, see app/core/menu_events.py)
+# events waiting per subscriber; subscribers that fall further behind are disconnected
+MENU_EVENTS_QUEUE_SIZE = int(os.getenv("MENU_EVENTS_QUEUE_SIZE", 64))
+# recent events kept per restaurant, replayed to clients reconnecting with Last-Event-ID
+MENU_EVENTS_BUFFER_SIZE = int(os.getenv("MENU_EVENTS_BUFFER_SIZE", 256))
+MENU_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("MENU_EVENTS_HEARTBEAT_SECONDS", 15))
+# streams are ended after this long (clients reconnect and resume), so that a
+# shutting down worker is not kept waiting by open streams
+MENU_EVENTS_STREAM_SECONDS = float(os.getenv("MENU_EVENTS_STREAM_SECONDS", 300))
+MENU_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("MENU_EVENTS_MAX_SUBSCRIBERS", 10000))
+
+# Menu snapshots (GET /api/menu/snapshot/{restaurant_id})
+# pre-serialized menu documents, rebuilt in the background after every write
+SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS_ENABLED", "true").lower() == "true"
+# "local": files under SNAPSHOT_DIR (shared by the workers of one host)
+SNAPSHOT_STORE = os.getenv("SNAPSHOT_STORE", "local")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+# the first language is the default one
+SNAPSHOT_LANGUAGES = [
+    lang.strip() for lang in os.getenv(
+        "SNAPSHOT_LANGUAGES", ",".join([TRANSLATION_SOURCE_LANGUAGE, *TRANSLATION_LANGUAGES])
+    ).split(",") if lang.strip()
+]
+# precompressed variants; "br" is skipped unless the brotli package is installed
+SNAPSHOT_ENCODINGS = [enc.strip() for enc in os.getenv("SNAPSHOT_ENCODINGS", "gzip,br").split(",") if enc.strip()]
+
+# Fast JSON path (opt-in): list endpoints read Core rows instead of ORM objects and
+# render them through prebuilt TypeAdapters; other responses are encoded with orjson
+# when it is installed
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+# Response compression (gzip; brotli when the brotli package is installed)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# smaller bodies are sent as they are (compression would barely pay for its headers)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+# compressed forms of ETag'd (cached menu) responses kept per worker
+COMPRESSION_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", 1024))
@@ -1,18 +1,31 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models.user import User
+from app.db.database import get_session, run_crud
+from app.crud import user as user_crud
+from app.core.cache import principal_cache
 from app.core.security import decode_access_token
-from jose import JWTError, jwt
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Authenticated user as described by the claims of a verified access token
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    is_admin: bool
+    is_active: bool
+    restaurant_id: int | None
+
 #get current user from jwt token
+#the claims are trusted as long as the token version matches the user's current one,
+#which is cached per user so most requests never touch the database
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: Session | AsyncSession = Depends(get_session)
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,21 +37,40 @@ async def get_current_user(
         raise credentials_exception
     
     email: str = payload.get("sub")
-    if payload is None:
+    user_id: int = payload.get("uid")
+    if email is None or user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    cache_key = user_crud.principal_cache_key(user_id)
+    auth_state = principal_cache.get(cache_key)
+    if auth_state is None:
+        auth_state = await run_crud(
+            db, user_crud.get_user_auth_state, user_crud.get_user_auth_state_async, user_id
+        )
+        if auth_state is None:
+            raise credentials_exception
+        auth_state = tuple(auth_state)
+        principal_cache.set(cache_key, auth_state)
+
+    token_version, is_active = auth_state
+    if payload.get("ver") != token_version:
+        #issued before the user was detached from their restaurant (see crud/user.py)
         raise credentials_exception
     
-    return user
+    return Principal(
+        id=user_id,
+        email=email,
+        is_admin=bool(payload.get("is_admin")),
+        is_active=is_active,
+        restaurant_id=payload.get("restaurant_id"),
+    )
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -46,10 +78,10 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
         )
     return current_user
 
-async def get_admin_restaurant_id(current_user: User = Depends(get_current_admin_user)) -> int:
+async def get_admin_restaurant_id(current_user: Principal = Depends(get_current_admin_user)) -> int:
     if not current_user.restaurant_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Admin user has no associated restaurant"
         )
-    return current_user.restaurant_id
\ No newline at end of file
+    return current_user.restaurant_id
@@ -0,0 +1,224 @@
+#app/core/jobs.py
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from app.core.config import (
+    JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_SECONDS, JOB_RETRY_MAX_SECONDS,
+    JOB_LEASE_SECONDS, JOB_SHUTDOWN_TIMEOUT_SECONDS
+)
+
+# Background jobs.
+#
+# Work that follows a menu write (rebuilding snapshots, translating the menu) runs
+# here instead of in the request. Writes add one row per registered job kind to the
+# "jobs" outbox table in their own transaction (see bump_menu_version), so jobs
+# survive restarts and a rolled back write leaves none behind. While pending, jobs
+# are deduplicated by (kind, restaurant id): several writes before a worker gets to
+# a restaurant make one job. Workers of every process claim jobs with a conditional
+# UPDATE, so a job runs in one place at a time; failed jobs are retried with
+# exponential backoff and kept with status "failed" after JOB_MAX_ATTEMPTS.
+# Cache invalidation stays in the request: the next read must not see the old menu.
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, FAILED = "pending", "running", "failed"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# SQLite returns naive datetimes; jobs are always stored in UTC
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+# Seconds to wait before running a job again after its `attempts`-th failure
+def retry_delay(attempts: int) -> float:
+    delay = min(JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), JOB_RETRY_MAX_SECONDS)
+    # jitter spreads out the retries of jobs that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+class JobStore:
+    """Persistence of the queue. Claimed jobs have id, kind, restaurant_id,
+    attempts (including the current one) and run_at."""
+
+    async def claim(self, now: datetime):
+        raise NotImplementedError
+
+    async def complete(self, job) -> None:
+        raise NotImplementedError
+
+    async def retry(self, job, error: str, run_at: datetime) -> None:
+        raise NotImplementedError
+
+    async def fail(self, job, error: str) -> None:
+        raise NotImplementedError
+
+    # makes jobs claimed before `claimed_before` pending again; returns how many
+    async def requeue_stale(self, claimed_before: datetime) -> int:
+        raise NotImplementedError
+
+
+# upper bounds in seconds; waits include the poll interval and retry delays
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, float("inf"))
+
+
+class LatencyHistogram:
+    # updated on the event loop only, so without a lock
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[next(i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound)] += 1
+        self.total += seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+            },
+            "count": sum(self.counts),
+            "sum_seconds": round(self.total, 6),
+        }
+
+
+class JobKindStats:
+    # per process; updated on the event loop only
+    def __init__(self):
+        self.wait = LatencyHistogram()  # from due to started
+        self.run = LatencyHistogram()  # handler duration
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "wait": self.wait.snapshot(),
+            "run": self.run.snapshot(),
+        }
+
+
+class JobQueue:
+    """Runs the jobs of the outbox on asyncio workers.
+
+    store is set by app.db.jobs; handlers are registered by the modules doing the
+    work, as async callables taking the job's restaurant id. notify() may be called
+    from any thread (e.g. after a write in a sync handler).
+    """
+
+    def __init__(self):
+        self.store: JobStore | None = None
+        self.handlers: dict = {}
+        # kinds enqueued by every menu write (see bump_menu_version)
+        self.menu_jobs: list[str] = []
+        self.stats: dict[str, JobKindStats] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._stopping: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, kind: str, handler, on_menu_write: bool = True) -> None:
+        self.handlers[kind] = handler
+        if on_menu_write and kind not in self.menu_jobs:
+            self.menu_jobs.append(kind)
+
+    # wakes idle workers; takes a restaurant id to be usable as a menu cache listener
+    def notify(self, restaurant_id: int | None = None) -> None:
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self, workers: int = JOB_WORKERS) -> None:
+        if workers <= 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(workers)]
+        self._tasks.append(asyncio.create_task(self._requeue_stale()))
+
+    # Workers finish the store call or job in hand and then exit; cancelling them
+    # mid-call would close a session still in use on a threadpool thread. Jobs still
+    # running after `timeout` are cancelled (and run again after their lease).
+    async def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        self._loop = None
+        if not self._tasks:
+            return
+        self._stopping.set()
+        self._wake.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            logger.warning("Background job worker still busy after %s s, cancelling it", timeout)
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self.store.claim(utcnow())
+                if job is not None:
+                    await self._run(job)
+                    continue
+            except Exception:
+                logger.exception("Processing background jobs failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            # left set once stopping, for the workers still finishing a call
+            if not self._stopping.is_set():
+                self._wake.clear()
+
+    async def _run(self, job) -> None:
+        stats = self.stats.setdefault(job.kind, JobKindStats())
+        stats.wait.observe(max((utcnow() - as_utc(job.run_at)).total_seconds(), 0.0))
+        start = time.perf_counter()
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job.kind!r}")
+            await handler(job.restaurant_id)
+        except Exception as exc:
+            stats.run.observe(time.perf_counter() - start)
+            error = f"{type(exc).__name__}: {exc}"
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                stats.failed += 1
+                logger.exception("Job %s (%s, restaurant %s) failed for good", job.id, job.kind, job.restaurant_id)
+                await self.store.fail(job, error)
+            else:
+                stats.retried += 1
+                logger.warning("Job %s (%s, restaurant %s) failed, will retry: %s",
+                               job.id, job.kind, job.restaurant_id, error)
+                await self.store.retry(job, error, utcnow() + timedelta(seconds=retry_delay(job.attempts)))
+            return
+        stats.run.observe(time.perf_counter() - start)
+        stats.succeeded += 1
+        await self.store.complete(job)
+
+    async def _requeue_stale(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.store.requeue_stale(utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)):
+                    self._wake.set()
+            except Exception:
+                logger.exception("Requeueing stale background jobs failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), JOB_LEASE_SECONDS / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    def latency_stats(self) -> dict:
+        return {kind: stats.snapshot() for kind, stats in sorted(self.stats.items())}
+
+
+job_queue = JobQueue()
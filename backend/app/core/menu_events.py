@@ -0,0 +1,183 @@
+#app/core/menu_events.py
+import asyncio
+import json
+import secrets
+from collections import deque
+from fastapi import HTTPException, status
+from app.core.config import (
+    MENU_EVENTS_QUEUE_SIZE, MENU_EVENTS_BUFFER_SIZE, MENU_EVENTS_HEARTBEAT_SECONDS, MENU_EVENTS_STREAM_SECONDS,
+    MENU_EVENTS_MAX_SUBSCRIBERS
+)
+from app.schemas.menu import MenuItemResponse
+
+# Menu events
+# Admin writes to a menu (see crud/menu.py) are pushed to the diners viewing it as
+# server-sent events, instead of their clients polling the menu. Publishing works
+# from any thread; fan-out happens on the event loop, where each subscriber has a
+# bounded queue. A subscriber whose queue is full is disconnected rather than
+# slowing down the others; its client reconnects with Last-Event-ID and gets the
+# events it missed from a short per-restaurant buffer, or a "reset" event (refetch
+# the menu) when they are no longer buffered.
+# Subscribers only see writes handled by their own worker; with several workers a
+# shared broker (e.g. Redis pub/sub, Postgres LISTEN/NOTIFY) has to relay publish().
+
+ITEM_CREATED = "item_created"
+ITEM_UPDATED = "item_updated"
+ITEM_AVAILABILITY = "item_availability"
+ITEM_DELETED = "item_deleted"
+# many items changed at once (e.g. an import); clients refetch the menu
+MENU_CHANGED = "menu_changed"
+RESET = "reset"
+
+# reconnection delay for EventSource clients, in milliseconds
+_RETRY = b"retry: 3000\n\n"
+_HEARTBEAT = b": heartbeat\n\n"
+
+
+def _message(event_id: str, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode()
+
+
+def item_json(item) -> str:
+    return MenuItemResponse.model_validate(item).model_dump_json()
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.dropped = False
+
+
+class MenuEventBroker:
+    """In-process pub/sub of menu events per restaurant.
+
+    Event ids are "<epoch>.<sequence>", the sequence counting the events of a
+    restaurant; the epoch changes with every process, so ids from another worker or
+    an earlier run are recognised and answered with a reset.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = MENU_EVENTS_QUEUE_SIZE,
+        buffer_size: int = MENU_EVENTS_BUFFER_SIZE,
+        max_subscribers: int = MENU_EVENTS_MAX_SUBSCRIBERS,
+    ):
+        self.queue_size = queue_size
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.epoch = secrets.token_hex(4)
+        self.subscriber_count = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._sequences: dict[int, int] = {}
+        self._buffers: dict[int, deque] = {}
+        self._subscribers: dict[int, set[Subscriber]] = {}
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self) -> None:
+        self._loop = None
+
+    # May be called from any thread, after the write is committed; dropped while
+    # the broker is not running (e.g. in CLI scripts)
+    def publish(self, restaurant_id: int, event: str, data: str) -> None:
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._publish, restaurant_id, event, data)
+
+    def _publish(self, restaurant_id: int, event: str, data: str) -> None:
+        sequence = self._sequences.get(restaurant_id, 0) + 1
+        self._sequences[restaurant_id] = sequence
+        # encoded once for every subscriber
+        message = _message(f"{self.epoch}.{sequence}", event, data)
+        buffer = self._buffers.get(restaurant_id)
+        if buffer is None:
+            buffer = self._buffers[restaurant_id] = deque(maxlen=self.buffer_size)
+        buffer.append((sequence, message))
+
+        for subscriber in list(self._subscribers.get(restaurant_id, ())):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                self.unsubscribe(restaurant_id, subscriber)
+
+    # The events after `last_event_id` to send first: the buffered ones, or a reset
+    # when the id is unknown or events after it are no longer buffered
+    def _replay(self, restaurant_id: int, last_event_id: str | None) -> list[bytes]:
+        if last_event_id is None:
+            return []
+        current = self._sequences.get(restaurant_id, 0)
+        epoch, _, sequence = last_event_id.partition(".")
+        if epoch == self.epoch and sequence.isdigit() and int(sequence) <= current:
+            sequence = int(sequence)
+            buffer = self._buffers.get(restaurant_id, ())
+            if sequence == current:
+                return []
+            if buffer and buffer[0][0] <= sequence + 1:
+                return [message for buffered, message in buffer if buffered > sequence]
+        return [_message(f"{self.epoch}.{current}", RESET, "{}")]
+
+    # Must be called on the event loop; replaying and subscribing happen without
+    # yielding to it, so no event is missed or sent twice in between
+    def subscribe(self, restaurant_id: int, last_event_id: str | None = None) -> tuple[Subscriber, list[bytes]]:
+        if self.subscriber_count >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open event streams",
+                headers={"Retry-After": "5"},
+            )
+        subscriber = Subscriber(self.queue_size)
+        replay = self._replay(restaurant_id, last_event_id)
+        self._subscribers.setdefault(restaurant_id, set()).add(subscriber)
+        self.subscriber_count += 1
+        return subscriber, replay
+
+    def unsubscribe(self, restaurant_id: int, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(restaurant_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        self.subscriber_count -= 1
+        if not subscribers:
+            del self._subscribers[restaurant_id]
+
+    # Body of the event stream response; ends when the subscriber is dropped or after
+    # `max_seconds`, the client then reconnects with Last-Event-ID
+    async def stream(
+        self,
+        restaurant_id: int,
+        subscriber: Subscriber,
+        replay: list[bytes],
+        heartbeat_seconds: float = MENU_EVENTS_HEARTBEAT_SECONDS,
+        max_seconds: float = MENU_EVENTS_STREAM_SECONDS,
+    ):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        try:
+            yield _RETRY
+            for message in replay:
+                yield message
+            while not subscriber.dropped:
+                timeout = min(heartbeat_seconds, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    # keeps proxies from closing the idle connection
+                    yield _HEARTBEAT
+        finally:
+            self.unsubscribe(restaurant_id, subscriber)
+
+
+menu_events = MenuEventBroker()
+
+
+# availability flips, the most frequent change during service, are sent as a small delta
+def publish_item_change(restaurant_id: int, item, fields) -> None:
+    if set(fields) == {"is_available"}:
+        data = json.dumps({"id": item.id, "is_available": item.is_available})
+        menu_events.publish(restaurant_id, ITEM_AVAILABILITY, data)
+    else:
+        menu_events.publish(restaurant_id, ITEM_UPDATED, item_json(item))
@@ -0,0 +1,178 @@
+#app/core/menu_io.py
+import codecs
+import csv
+import io
+import json
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from pydantic_core import to_json
+from app.core.config import BULK_IMPORT_MAX_ROWS, BULK_IMPORT_MAX_BYTES
+from app.schemas.menu import MenuItemCreate, MenuImportRowError
+
+# Parsing of bulk menu imports and formatting of menu exports.
+# CSV and NDJSON bodies are parsed as they arrive; a JSON array is parsed once complete.
+
+IMPORT_FORMATS = {
+    "application/json": "json",
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# columns of an export; an exported CSV can be imported again (id is ignored)
+EXPORT_FIELDS = (
+    "id", "name", "description", "price", "category", "allergens",
+    "is_available", "image_url", "ar_model_url",
+)
+
+
+def import_format(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Type, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    return fmt
+
+
+async def _iter_chunks(request: Request):
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > BULK_IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Import is larger than {BULK_IMPORT_MAX_BYTES} bytes")
+        yield chunk
+
+
+async def _iter_lines(request: Request):
+    # utf-8-sig drops the BOM spreadsheet programs like to add
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="strict")
+    pending = ""
+    try:
+        async for chunk in _iter_chunks(request):
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.removesuffix("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import must be UTF-8 encoded")
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def _iter_csv_records(request: Request):
+    # a quoted field may span lines; a record is complete once its quotes are balanced
+    record = None
+    async for line in _iter_lines(request):
+        record = line if record is None else f"{record}\n{line}"
+        if record.count('"') % 2 == 0:
+            yield next(csv.reader([record]), [])
+            record = None
+    if record is not None:
+        yield next(csv.reader([record]), [])
+
+
+async def iter_rows(request: Request, fmt: str):
+    """Yields (row number, dict) for each row of the body, or (row number, message)
+    for a row that could not be parsed."""
+    if fmt == "json":
+        body = b"".join([chunk async for chunk in _iter_chunks(request)])
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON")
+        if not isinstance(data, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of menu items")
+        for number, value in enumerate(data, start=1):
+            yield number, value if isinstance(value, dict) else "expected a JSON object"
+
+    elif fmt == "ndjson":
+        number = 0
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                value = json.loads(line)
+            except ValueError:
+                yield number, "invalid JSON"
+                continue
+            yield number, value if isinstance(value, dict) else "expected a JSON object"
+
+    else:
+        header = None
+        number = 0
+        async for record in _iter_csv_records(request):
+            if not any(value.strip() for value in record):
+                continue
+            if header is None:
+                header = [name.strip().lower() for name in record]
+                continue
+            number += 1
+            if len(record) != len(header):
+                yield number, f"expected {len(header)} columns, got {len(record)}"
+                continue
+            # empty cells fall back to the field defaults
+            yield number, {name: value for name, value in zip(header, record) if value != ""}
+
+
+def _format_errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    ]
+
+
+async def read_menu_import(request: Request):
+    """Parses and validates an import body (see IMPORT_FORMATS).
+    Returns the valid rows as (row number, item data) and the errors of the others."""
+    fmt = import_format(request)
+    rows: list[tuple[int, dict]] = []
+    errors: list[MenuImportRowError] = []
+    first_row_by_name: dict[str, int] = {}
+
+    async for number, value in iter_rows(request, fmt):
+        if number > BULK_IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"Import has more than {BULK_IMPORT_MAX_ROWS} rows")
+        if isinstance(value, str):
+            errors.append(MenuImportRowError(row=number, errors=[value]))
+            continue
+        try:
+            item = MenuItemCreate.model_validate(value)
+        except ValidationError as e:
+            errors.append(MenuImportRowError(row=number, errors=_format_errors(e)))
+            continue
+        # names identify items within a restaurant (see mode=upsert)
+        if item.name in first_row_by_name:
+            errors.append(MenuImportRowError(
+                row=number, errors=[f"name: duplicate of row {first_row_by_name[item.name]}"]
+            ))
+            continue
+        first_row_by_name[item.name] = number
+        rows.append((number, item.model_dump(mode="json", exclude={"restaurant_id"})))
+
+    return rows, errors
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+
+def csv_rows(items) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in items:
+        writer.writerow(["" if v is None else v for v in (getattr(item, f) for f in EXPORT_FIELDS)])
+    return buffer.getvalue()
+
+
+def ndjson_rows(items) -> bytes:
+    return b"".join(to_json({f: getattr(item, f) for f in EXPORT_FIELDS}) + b"\n" for item in items)
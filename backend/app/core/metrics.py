@@ -0,0 +1,192 @@
+#app/core/metrics.py
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Request and SQL metrics, rendered in the Prometheus text exposition format.
+#
+# Route series are created once per (method, route template) and then only
+# mutated. All aggregation happens on the event loop thread when a request
+# finishes, so no locks are needed: SQL events (which may fire on threadpool
+# threads) only write to the RequestStats of their own request.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, float("inf"))
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _bucket_index(buckets: tuple, value: float) -> int:
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets) - 1
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class RequestStats:
+    """Per-request accumulator, reachable from SQL event hooks through a contextvar."""
+
+    __slots__ = ("queries", "rows", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+class RouteSeries:
+    __slots__ = (
+        "labels", "latency_counts", "latency_sum", "count", "status_counts",
+        "query_counts", "queries", "rows", "db_time",
+    )
+
+    def __init__(self, method: str, route: str):
+        self.labels = f'method="{method}",route="{route}"'
+        self.latency_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.status_counts: dict[int, int] = {}
+        self.query_counts = [0] * len(QUERY_COUNT_BUCKETS)
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+
+    def observe(self, status: int, duration: float, stats: RequestStats) -> None:
+        self.count += 1
+        self.latency_sum += duration
+        self.latency_counts[_bucket_index(LATENCY_BUCKETS, duration)] += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.query_counts[_bucket_index(QUERY_COUNT_BUCKETS, stats.queries)] += 1
+        self.queries += stats.queries
+        self.rows += stats.rows
+        self.db_time += stats.db_time
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteSeries] = {}
+        self.in_flight = 0
+
+    def series(self, method: str, route: str) -> RouteSeries:
+        series = self.routes.get((method, route))
+        if series is None:
+            series = self.routes[(method, route)] = RouteSeries(method, route)
+        return series
+
+    def render(self) -> str:
+        routes = list(self.routes.values())
+        lines = [
+            "# HELP gusto_http_requests_in_flight HTTP requests currently being served.",
+            "# TYPE gusto_http_requests_in_flight gauge",
+            f"gusto_http_requests_in_flight {self.in_flight}",
+            "# HELP gusto_http_requests_total HTTP requests by route and status code.",
+            "# TYPE gusto_http_requests_total counter",
+        ]
+        for s in routes:
+            for status, count in list(s.status_counts.items()):
+                lines.append(f'gusto_http_requests_total{{{s.labels},status="{status}"}} {count}')
+
+        lines += [
+            "# HELP gusto_http_request_duration_seconds HTTP request latency by route.",
+            "# TYPE gusto_http_request_duration_seconds histogram",
+        ]
+        for s in routes:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, s.latency_counts):
+                cumulative += count
+                lines.append(f'gusto_http_request_duration_seconds_bucket{{{s.labels},le="{_le(bound)}"}} {cumulative}')
+            lines.append(f"gusto_http_request_duration_seconds_sum{{{s.labels}}} {s.latency_sum}")
+            lines.append(f"gusto_http_request_duration_seconds_count{{{s.labels}}} {s.count}")
+
+        lines += [
+            "# HELP gusto_db_queries_per_request SQL statements issued per HTTP request.",
+            "# TYPE gusto_db_queries_per_request histogram",
+        ]
+        for s in routes:
+            cumulative = 0
+            for bound, count in zip(QUERY_COUNT_BUCKETS, s.query_counts):
+                cumulative += count
+                lines.append(f'gusto_db_queries_per_request_bucket{{{s.labels},le="{_le(bound)}"}} {cumulative}')
+            lines.append(f"gusto_db_queries_per_request_sum{{{s.labels}}} {s.queries}")
+            lines.append(f"gusto_db_queries_per_request_count{{{s.labels}}} {s.count}")
+
+        for name, help_text, attr in (
+            ("gusto_db_rows_total", "Rows reported by the driver for SQL statements, by route.", "rows"),
+            ("gusto_db_time_seconds_total", "Time spent executing SQL statements, by route.", "db_time"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for s in routes:
+                lines.append(f"{name}{{{s.labels}}} {getattr(s, attr)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (BaseHTTPMiddleware would break contextvar propagation)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+        registry.in_flight += 1
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            registry.in_flight -= 1
+            current_request_stats.reset(token)
+            # the router stores the matched route in the scope; its path is the template
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            registry.series(scope["method"], path).observe(status_code, duration, stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_request_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.rows += max(cursor.rowcount, 0)
+    stats.db_time += elapsed
+
+def _handle_error(exception_context):
+    # keep the timing stack balanced when a statement fails
+    starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    # pass `async_engine.sync_engine` for an AsyncEngine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
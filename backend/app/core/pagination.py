@@ -0,0 +1,28 @@
+#app/core/pagination.py
+import base64
+import json
+from fastapi import HTTPException, status
+
+# Keyset pagination helpers.
+# A cursor is an opaque url-safe token wrapping the sort key of the last row
+# that was returned, e.g. (restaurant_id, id) for menu items.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(*key: int) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> tuple[int, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, list) or len(key) != size or not all(isinstance(k, int) for k in key):
+            raise ValueError(key)
+        return tuple(key)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
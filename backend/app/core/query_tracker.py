@@ -0,0 +1,126 @@
+#app/core/query_tracker.py
+import logging
+import os
+import traceback
+from contextvars import ContextVar
+from sqlalchemy import event
+from app.core.config import QUERY_TRACKING_STRICT, QUERY_BUDGET_DEFAULT, QUERY_REPEAT_THRESHOLD
+
+# Request-scoped SQL query tracking for debug and test runs.
+#
+# Every statement issued while serving a request is recorded together with the
+# application frame that triggered it. A request that exceeds its query budget,
+# or runs the same statement QUERY_REPEAT_THRESHOLD times (the signature of a lazy
+# relationship loaded once per row), is reported. In strict mode (tests) the
+# offending statement raises instead, so the failure points at the call site.
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryTracker:
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.repeat_threshold = QUERY_REPEAT_THRESHOLD
+        self.statements: list[tuple[str, str]] = []
+        self.counts: dict[str, int] = {}
+
+    def record(self, statement: str) -> None:
+        call_site = _call_site()
+        self.statements.append((statement, call_site))
+        count = self.counts[statement] = self.counts.get(statement, 0) + 1
+
+        if QUERY_TRACKING_STRICT:
+            if len(self.statements) > self.budget:
+                raise QueryBudgetExceeded(
+                    f"Query budget of {self.budget} exceeded by statement issued at {call_site}:\n{statement}"
+                )
+            if self.repeat_threshold and count >= self.repeat_threshold:
+                raise QueryBudgetExceeded(
+                    f"Statement repeated {count} times (possible N+1), last issued at {call_site}:\n{statement}"
+                )
+
+    def report(self, route: str) -> list[str]:
+        problems = []
+        if len(self.statements) > self.budget:
+            problems.append(f"{route}: {len(self.statements)} queries, budget is {self.budget}")
+        for statement, count in self.counts.items():
+            if self.repeat_threshold and count >= self.repeat_threshold:
+                sites = sorted({site for s, site in self.statements if s == statement})
+                problems.append(
+                    f"{route}: statement repeated {count} times (possible N+1) from {', '.join(sites)}:\n{statement}"
+                )
+        return problems
+
+
+current_query_tracker: ContextVar[QueryTracker | None] = ContextVar("current_query_tracker", default=None)
+
+
+def _call_site() -> str:
+    # innermost application frame outside this module; lazy loads triggered while
+    # FastAPI serializes a response have none, so fall back to the innermost frame
+    # outside SQLAlchemy (e.g. fastapi/routing.py in serialize_response)
+    fallback = None
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename == _THIS_FILE:
+            continue
+        if filename.startswith(_APP_DIR):
+            return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.lineno} in {frame.name}"
+        if fallback is None and f"{os.sep}sqlalchemy{os.sep}" not in filename:
+            fallback = f"{filename}:{frame.lineno} in {frame.name}"
+    return fallback or "<unknown>"
+
+
+def query_budget(max_queries: int, allow_repeats: bool = False):
+    """Dependency setting the query budget of a route, e.g.
+    `@router.get(..., dependencies=[Depends(query_budget(2))])`.
+    `allow_repeats` turns off N+1 detection for routes that execute the same
+    statement in batches on purpose (bulk writes)."""
+
+    def set_budget():
+        tracker = current_query_tracker.get()
+        if tracker is not None:
+            tracker.budget = max_queries
+            if allow_repeats:
+                tracker.repeat_threshold = None
+
+    return set_budget
+
+
+class QueryTrackerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker(QUERY_BUDGET_DEFAULT)
+        token = current_query_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_tracker.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            for problem in tracker.report(f'{scope["method"]} {route}'):
+                logger.warning(problem)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracker = current_query_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+
+
+def track_engine(engine) -> None:
+    # pass `async_engine.sync_engine` for an AsyncEngine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
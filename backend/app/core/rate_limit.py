@@ -0,0 +1,221 @@
+#app/core/rate_limit.py
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fastapi import HTTPException, Request, status
+from app.core.config import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_AUTH, RATE_LIMIT_MENU, RATE_LIMIT_ADMIN,
+    RATE_LIMIT_LOGIN_FAILURES
+)
+
+# Rate limiting
+# Requests are counted per client IP for each group of routers (token buckets: a
+# steady rate, with bursts of up to the limit), and failed logins per account
+# (sliding window counters), so that the bcrypt verify of a login cannot be used to
+# exhaust the CPU and passwords cannot be guessed at request speed. Over a limit
+# the API answers 429 with Retry-After.
+# Behind a reverse proxy, run uvicorn with --proxy-headers (and --forwarded-allow-ips)
+# so that the client IP is the real one rather than the proxy's.
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600}
+_RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour)s?\s*$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    requests: int
+    seconds: float
+
+    # e.g. "10/minute", "5/15minute"
+    @classmethod
+    def parse(cls, text: str) -> "Rate":
+        match = _RATE_RE.match(text)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {text!r} (expected e.g. 10/minute)")
+        requests, multiplier, unit = match.groups()
+        return cls(int(requests), int(multiplier or 1) * _UNITS[unit])
+
+
+class RateLimitBackend:
+    """Storage of the counters.
+
+    The in-memory backend limits each worker on its own; a store shared by the
+    workers (e.g. Redis, each operation one Lua script) makes the limits apply to
+    all of them together. `now` is wall clock time in seconds.
+    """
+
+    # Takes a token from the bucket at `key`, which holds up to rate.requests tokens
+    # and refills at rate.requests per rate.seconds; returns 0 when a token was
+    # taken, otherwise the seconds until one is available
+    def take_token(self, key: str, rate: Rate, now: float) -> float:
+        raise NotImplementedError
+
+    # Seconds until fewer than rate.requests events were added at `key` within the
+    # last rate.seconds (0 when that is already the case)
+    def window_wait(self, key: str, rate: Rate, now: float) -> float:
+        raise NotImplementedError
+
+    def window_add(self, key: str, rate: Rate, now: float) -> None:
+        raise NotImplementedError
+
+    def reset(self, key: str) -> None:
+        raise NotImplementedError
+
+
+def _refill(bucket: list, rate: Rate, now: float) -> None:
+    tokens, updated = bucket
+    bucket[0] = min(rate.requests, tokens + (now - updated) * rate.requests / rate.seconds)
+    bucket[1] = now
+
+
+# The window counts events of the current fixed window plus those of the previous
+# one, weighted by how much of it still overlaps the last rate.seconds
+def _roll(window: list, rate: Rate, now: float) -> None:
+    start = now - now % rate.seconds
+    if start != window[0]:
+        window[2] = window[1] if start - window[0] == rate.seconds else 0
+        window[1] = 0
+        window[0] = start
+
+
+def _window_wait(window: list, rate: Rate, now: float) -> float:
+    start, current, previous = window
+    elapsed = now - start
+    if previous * (1 - elapsed / rate.seconds) + current < rate.requests:
+        return 0.0
+    if current >= rate.requests:
+        # the current window's events alone are over the limit until enough of them
+        # have slid into the past
+        return start + rate.seconds - now + rate.seconds * (1 - rate.requests / current)
+    # still over the limit when exactly at it, so never 0
+    return max(rate.seconds * (1 - (rate.requests - current) / previous) - elapsed, 0.001)
+
+
+class MemoryBackend(RateLimitBackend):
+    """Counters of this process, in shards with a lock each so that concurrent
+    requests rarely wait for one another. Past max_keys the least recently used
+    keys are dropped."""
+
+    def __init__(self, max_keys: int, shards: int = 16):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self._max_keys_per_shard = max(max_keys // shards, 1)
+
+    def _shard(self, key: str):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _entry(self, entries: OrderedDict, key: str, default: list) -> list:
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = default
+            if len(entries) > self._max_keys_per_shard:
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(key)
+        return entry
+
+    def take_token(self, key: str, rate: Rate, now: float) -> float:
+        lock, entries = self._shard(key)
+        with lock:
+            bucket = self._entry(entries, key, [rate.requests, now])
+            _refill(bucket, rate, now)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) * rate.seconds / rate.requests
+
+    def window_wait(self, key: str, rate: Rate, now: float) -> float:
+        lock, entries = self._shard(key)
+        with lock:
+            window = entries.get(key)
+            if window is None:
+                return 0.0
+            _roll(window, rate, now)
+            return _window_wait(window, rate, now)
+
+    def window_add(self, key: str, rate: Rate, now: float) -> None:
+        lock, entries = self._shard(key)
+        with lock:
+            window = self._entry(entries, key, [now - now % rate.seconds, 0, 0])
+            _roll(window, rate, now)
+            window[1] += 1
+
+    def reset(self, key: str) -> None:
+        lock, entries = self._shard(key)
+        with lock:
+            entries.pop(key, None)
+
+
+def _too_many_requests(wait: float, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(math.ceil(wait), 1))},
+    )
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    # counts a request; raises 429 when the bucket is empty
+    def check(self, key: str, rate: Rate) -> None:
+        if not self.enabled:
+            return
+        wait = self.backend.take_token(key, rate, time.time())
+        if wait:
+            raise _too_many_requests(wait, "Too many requests")
+
+    # raises 429 while rate.requests failures were recorded within rate.seconds
+    def check_failures(self, key: str, rate: Rate) -> None:
+        if not self.enabled:
+            return
+        wait = self.backend.window_wait(key, rate, time.time())
+        if wait:
+            raise _too_many_requests(wait, "Too many failed attempts, try again later")
+
+    def add_failure(self, key: str, rate: Rate) -> None:
+        if self.enabled:
+            self.backend.window_add(key, rate, time.time())
+
+    def reset(self, key: str) -> None:
+        if self.enabled:
+            self.backend.reset(key)
+
+
+def _create_backend(name: str) -> RateLimitBackend:
+    if name == "memory":
+        return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+rate_limiter = RateLimiter(_create_backend(RATE_LIMIT_BACKEND), enabled=RATE_LIMIT_ENABLED)
+
+# per client IP, for each group of routers (see create_app)
+RATE_LIMITS = {
+    "auth": Rate.parse(RATE_LIMIT_AUTH),
+    "menu": Rate.parse(RATE_LIMIT_MENU),
+    "admin": Rate.parse(RATE_LIMIT_ADMIN),
+}
+LOGIN_FAILURE_RATE = Rate.parse(RATE_LIMIT_LOGIN_FAILURES)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+# Router dependency counting each request against the group's per-IP limit
+def limit_requests(group: str):
+    rate = RATE_LIMITS[group]
+
+    async def dependency(request: Request) -> None:
+        rate_limiter.check(f"{group}:{client_ip(request)}", rate)
+
+    return dependency
+
+
+def login_failures_key(username: str) -> str:
+    return f"login-failures:{username.strip().casefold()}"
@@ -0,0 +1,303 @@
+#app/core/search.py
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from typing import NamedTuple
+from app.core.cache import menu_cache
+from app.core.config import SEARCH_BACKEND, SEARCH_INDEX_MAX_AGE_SECONDS
+
+# In-process search over menu items and restaurants (SEARCH_BACKEND=memory).
+#
+# An inverted index maps every term to the documents containing it, weighted by
+# the fields it appears in. A query matches documents containing all of its terms:
+# the last term also matches as a prefix (autocomplete), and a term the index
+# does not know matches the known terms one edit away (typo tolerance, looked up
+# through precomputed single-character deletions). Scores are field weight * idf.
+#
+# Menu writes invalidate the menu cache, which marks the restaurant stale here;
+# the next search reloads the stale restaurants before answering.
+
+MENU_ITEM = "menu_item"
+RESTAURANT = "restaurant"
+
+ITEM_FIELD_WEIGHTS = (("name", 3.0), ("category", 1.5), ("description", 1.0), ("allergens", 1.0))
+RESTAURANT_FIELD_WEIGHTS = (("name", 3.0), ("category", 1.5))
+
+PREFIX_MIN_LENGTH = 2
+PREFIX_FACTOR = 0.8
+# only the most frequent completions of a short prefix are scored
+MAX_PREFIX_EXPANSIONS = 10
+MAX_PREFIX_SCAN = 5000
+FUZZY_MIN_LENGTH = 4
+FUZZY_FACTOR = 0.6
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    # case- and accent-insensitive: "Crème Brûlée" -> "creme brulee"
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _deletions(term: str):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    # insertion, deletion, substitution or transposition of adjacent characters
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) <= 1:
+            return True
+        return (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+        )
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class SearchDoc(NamedTuple):
+    type: str
+    id: int
+    name: str
+    restaurant_id: int
+    restaurant_name: str | None
+    category: str | None
+    price: float | None = None
+    is_available: bool | None = None
+
+
+# documents are keyed by int: 2 * id for menu items, 2 * id + 1 for restaurants
+def _item_key(item_id: int) -> int:
+    return 2 * item_id
+
+def _restaurant_key(restaurant_id: int) -> int:
+    return 2 * restaurant_id + 1
+
+
+class _IndexData:
+    def __init__(self):
+        self.docs: dict[int, SearchDoc] = {}
+        self.doc_terms: dict[int, tuple[str, ...]] = {}
+        self.postings: dict[str, dict[int, float]] = {}
+        self.terms: list[str] = []  # sorted, for prefix lookups
+        self.deletes: dict[str, set[str]] = {}
+        self.restaurant_docs: dict[int, set[int]] = {}
+
+    def load(self, restaurants, items) -> None:
+        self._add_documents(restaurants, items, building=True)
+        self.terms = sorted(self.postings)
+
+    def reload_restaurants(self, restaurant_ids, restaurants, items) -> None:
+        for restaurant_id in restaurant_ids:
+            for key in self.restaurant_docs.pop(restaurant_id, ()):
+                self._remove(key)
+        self._add_documents(restaurants, items)
+
+    def _add_documents(self, restaurants, items, building: bool = False) -> None:
+        names = {}
+        for r in restaurants:
+            names[r.id] = r.name
+            doc = SearchDoc(RESTAURANT, r.id, r.name, r.id, r.name, r.category)
+            self._add(_restaurant_key(r.id), doc, RESTAURANT_FIELD_WEIGHTS, r, building)
+        for i in items:
+            doc = SearchDoc(
+                MENU_ITEM, i.id, i.name, i.restaurant_id, names.get(i.restaurant_id),
+                i.category, i.price, i.is_available
+            )
+            self._add(_item_key(i.id), doc, ITEM_FIELD_WEIGHTS, i, building)
+
+    def _add(self, key: int, doc: SearchDoc, field_weights, row, building: bool) -> None:
+        weights: dict[str, float] = {}
+        for field, weight in field_weights:
+            for term in set(tokenize(getattr(row, field))):
+                weights[term] = weights.get(term, 0.0) + weight
+
+        self.docs[key] = doc
+        self.doc_terms[key] = tuple(weights)
+        self.restaurant_docs.setdefault(doc.restaurant_id, set()).add(key)
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                if not building:
+                    bisect.insort(self.terms, term)
+                if len(term) >= FUZZY_MIN_LENGTH:
+                    for deletion in _deletions(term):
+                        self.deletes.setdefault(deletion, set()).add(term)
+            postings[key] = weight
+
+    def _remove(self, key: int) -> None:
+        self.docs.pop(key, None)
+        for term in self.doc_terms.pop(key, ()):
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if postings:
+                continue
+            del self.postings[term]
+            index = bisect.bisect_left(self.terms, term)
+            if index < len(self.terms) and self.terms[index] == term:
+                del self.terms[index]
+            if len(term) >= FUZZY_MIN_LENGTH:
+                for deletion in _deletions(term):
+                    similar = self.deletes.get(deletion)
+                    if similar is not None:
+                        similar.discard(term)
+                        if not similar:
+                            del self.deletes[deletion]
+
+    def _expand(self, token: str, prefix: bool) -> list[tuple[str, float]]:
+        matches = {token: 1.0} if token in self.postings else {}
+
+        if prefix and len(token) >= PREFIX_MIN_LENGTH:
+            completions = []
+            index = bisect.bisect_left(self.terms, token)
+            end = min(len(self.terms), index + MAX_PREFIX_SCAN)
+            while index < end and self.terms[index].startswith(token):
+                if self.terms[index] != token:
+                    completions.append(self.terms[index])
+                index += 1
+            for term in heapq.nlargest(MAX_PREFIX_EXPANSIONS, completions, key=lambda t: len(self.postings[t])):
+                matches[term] = PREFIX_FACTOR
+
+        if not matches and len(token) >= FUZZY_MIN_LENGTH:
+            candidates = set(self.deletes.get(token, ()))
+            for deletion in _deletions(token):
+                if deletion in self.postings:
+                    candidates.add(deletion)
+                candidates.update(self.deletes.get(deletion, ()))
+            for term in candidates:
+                if _within_one_edit(token, term):
+                    matches[term] = FUZZY_FACTOR
+
+        return list(matches.items())
+
+    def search(self, query: str, limit: int, kind: str | None, restaurant_id: int | None):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        total = max(len(self.docs), 1)
+        # (postings, multiplier) of every term each query token expands to
+        expansions = []
+        for position, token in enumerate(tokens):
+            terms = self._expand(token, prefix=position == len(tokens) - 1)
+            if not terms:
+                return []
+            expansions.append([
+                (self.postings[term], factor * math.log(1 + total / len(self.postings[term])))
+                for term, factor in terms
+            ])
+        # start from the most selective token, then only probe the remaining candidates
+        expansions.sort(key=lambda entries: sum(len(postings) for postings, _ in entries))
+
+        first, *rest = expansions
+        # the largest posting list is copied in one pass, the others merged into it
+        first.sort(key=lambda entry: len(entry[0]), reverse=True)
+        postings, multiplier = first[0]
+        scores = {key: weight * multiplier for key, weight in postings.items()}
+        for postings, multiplier in first[1:]:
+            for key, weight in postings.items():
+                score = weight * multiplier
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+
+        for entries in rest:
+            narrowed = {}
+            for key, score in scores.items():
+                best = max(postings.get(key, 0.0) * multiplier for postings, multiplier in entries)
+                if best:
+                    narrowed[key] = score + best
+            scores = narrowed
+            if not scores:
+                return []
+
+        if kind is not None:
+            parity = 1 if kind == RESTAURANT else 0
+            scores = {key: score for key, score in scores.items() if key % 2 == parity}
+        if restaurant_id is not None:
+            scores = {key: score for key, score in scores.items() if self.docs[key].restaurant_id == restaurant_id}
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [(self.docs[key], scores[key]) for key in best]
+
+
+class InMemorySearchIndex:
+    """Thread-safe wrapper that tracks which restaurants need reloading.
+
+    Refresh protocol: pending() -> load documents from the database -> apply().
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._data: _IndexData | None = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        # restaurant id -> sequence number of the latest write
+        self._stale: dict[int, int] = {}
+        self._sequence = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._data is not None
+
+    def mark_stale(self, restaurant_id: int) -> None:
+        with self._lock:
+            self._sequence += 1
+            self._stale[restaurant_id] = self._sequence
+
+    def pending(self):
+        # returns (token, restaurant ids to reload); None means a full rebuild.
+        # Writes committed before this call are visible to the load that follows.
+        with self._lock:
+            if self._data is None or time.monotonic() - self._built_at > self.max_age_seconds:
+                return self._sequence, None
+            return self._sequence, set(self._stale)
+
+    def apply(self, documents, restaurant_ids: set[int] | None, token: int) -> None:
+        restaurants, items = documents
+        if restaurant_ids is None:
+            data = _IndexData()
+            data.load(restaurants, items)
+            with self._lock:
+                self._data = data
+                self._built_at = time.monotonic()
+                self._clear_stale(token)
+            return
+
+        with self._lock:
+            self._data.reload_restaurants(restaurant_ids, restaurants, items)
+            self._clear_stale(token)
+
+    def _clear_stale(self, token: int) -> None:
+        # restaurants written again since pending() stay stale
+        self._stale = {rid: seq for rid, seq in self._stale.items() if seq > token}
+
+    def search(self, query: str, limit: int, kind: str | None = None, restaurant_id: int | None = None):
+        with self._lock:
+            if self._data is None:
+                return []
+            return self._data.search(query, limit, kind, restaurant_id)
+
+
+search_index = InMemorySearchIndex(SEARCH_INDEX_MAX_AGE_SECONDS)
+
+if SEARCH_BACKEND == "memory":
+    menu_cache.add_listener(search_index.mark_stale)
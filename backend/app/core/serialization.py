@@ -0,0 +1,85 @@
+#app/core/serialization.py
+from enum import Enum
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+from app.schemas.menu import MenuCategory, MenuItemResponse
+from app.schemas.restaurant import RestaurantResponse
+from app.core.translation import translate_items
+
+try:
+    import orjson
+except ImportError:  # optional: pydantic-core's encoder is used without it
+    orjson = None
+
+# Response building helpers for endpoints that return pre-serialized JSON
+
+MENU_ITEM_FIELDS = frozenset(MenuItemResponse.model_fields)
+
+# Parses a `fields=` query parameter into the set of menu item fields to return;
+# None means all fields. `id` is always included so clients can address items.
+def parse_menu_item_fields(fields: str | None) -> frozenset | None:
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - MENU_ITEM_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown menu item fields: {', '.join(sorted(unknown))}"
+        )
+    return frozenset(requested | {"id"})
+
+# Serializes a restaurant (with menu_items loaded) and its menu grouped by category
+# `translations` replaces translated item fields (see app.core.translation)
+def restaurant_with_menu_json(restaurant, fields: frozenset | None = None, translations: dict | None = None) -> bytes:
+    menu: dict[str, list] = {category.value: [] for category in MenuCategory}
+    for item in sorted(restaurant.menu_items, key=lambda i: i.id):
+        data = MenuItemResponse.model_validate(item).model_dump(mode="json", include=fields)
+        if translations:
+            translate_items([data], translations)
+        menu.setdefault(item.category, []).append(data)
+
+    document = RestaurantResponse.model_validate(restaurant).model_dump(mode="json")
+    document["menu"] = menu
+    return to_json(document)
+
+# Menu items (ORM objects or rows) as dicts with their translated fields replaced
+def translated_menu_items(items, translations: dict) -> list[dict]:
+    return translate_items([MenuItemResponse.model_validate(item).model_dump(mode="json") for item in items], translations)
+
+# Serializes Core rows selected with a schema's columns, in field order (see the
+# *_ROW_COLUMNS of the crud modules). Rows from the database already have the
+# schema's types, so they are dumped through a prebuilt TypeAdapter without the
+# validation (and model instances) of Model.model_validate(obj).model_dump_json().
+class RowSerializer:
+    def __init__(self, model):
+        self.fields = tuple(model.model_fields)
+        # enum columns are stored as their plain values
+        annotations = {
+            name: str if isinstance(field.annotation, type) and issubclass(field.annotation, Enum) else field.annotation
+            for name, field in model.model_fields.items()
+        }
+        self.adapter = TypeAdapter(list[TypedDict(f"{model.__name__}Row", annotations)])
+
+    def dump_json(self, rows) -> bytes:
+        fields = self.fields
+        return self.adapter.dump_json([dict(zip(fields, row)) for row in rows])
+
+
+MENU_ITEM_ROWS = RowSerializer(MenuItemResponse)
+RESTAURANT_ROWS = RowSerializer(RestaurantResponse)
+
+# Same bytes as MenuItemPage/RestaurantPage(...).model_dump_json() for serialized items
+def page_json(items_json: bytes, next_cursor: str | None) -> bytes:
+    return b'{"items":' + items_json + b',"next_cursor":' + to_json(next_cursor) + b"}"
+
+# Response class encoding with orjson (or pydantic-core) instead of the stdlib json module
+# (FastAPI's default); the app's default response class when FAST_JSON_RESPONSES is set
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return to_json(content)
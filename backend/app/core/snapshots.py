@@ -0,0 +1,202 @@
+#app/core/snapshots.py
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable
+from app.core.compression import IDENTITY, SUPPORTED_ENCODINGS, compress
+from app.core.config import SNAPSHOT_STORE, SNAPSHOT_DIR, SNAPSHOT_ENCODINGS
+
+# Menu snapshots: each restaurant's full menu document, serialized (and
+# compressed) once per write instead of once per read, per language.
+#
+# Files of a snapshot are named after the menu version they were built from:
+#   <restaurant id>/<lang>-v<version>.json[.gz|.br]
+# and a small manifest <restaurant id>/<lang>.meta.json, written last, points
+# at the current ones. Readers only look at the manifest, so a rebuild never
+# exposes a half-written snapshot; deleting the manifest retires a snapshot.
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {IDENTITY: "", "gzip": ".gz", "br": ".br"}
+
+
+def available_encodings(encodings=SNAPSHOT_ENCODINGS) -> list[str]:
+    return [e for e in encodings if e in SUPPORTED_ENCODINGS]
+
+
+class SnapshotStore:
+    """Storage interface for snapshot files (e.g. local disk, an object store).
+
+    Names are relative paths such as "12/en.meta.json". put() must replace a
+    file atomically: a reader sees either the old or the new content.
+    """
+
+    def get(self, name: str) -> bytes | None:
+        raise NotImplementedError
+
+    def put(self, name: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, name: str) -> None:
+        raise NotImplementedError
+
+    def list(self, prefix: str) -> list[str]:
+        raise NotImplementedError
+
+    def local_path(self, name: str) -> str | None:
+        # path to serve the file from directly, or None to serve get()
+        return None
+
+
+class LocalSnapshotStore(SnapshotStore):
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> bytes | None:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, name: str) -> None:
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str) -> list[str]:
+        directory, _, start = prefix.rpartition("/")
+        try:
+            names = os.listdir(self._path(directory))
+        except FileNotFoundError:
+            return []
+        return [f"{directory}/{n}" if directory else n for n in names if n.startswith(start)]
+
+    def local_path(self, name: str) -> str | None:
+        return self._path(name)
+
+
+def _manifest_name(restaurant_id: int, lang: str) -> str:
+    return f"{restaurant_id}/{lang}.meta.json"
+
+
+def _file_name(restaurant_id: int, lang: str, version: int, encoding: str) -> str:
+    return f"{restaurant_id}/{lang}-v{version}.json{_EXTENSIONS[encoding]}"
+
+
+def read_manifest(store: SnapshotStore, restaurant_id: int, lang: str) -> dict | None:
+    # {"menu_version", "last_modified", "files": {encoding: name}}
+    data = store.get(_manifest_name(restaurant_id, lang))
+    return json.loads(data) if data else None
+
+
+def write_snapshot(
+    store: SnapshotStore, restaurant_id: int, lang: str,
+    body: bytes, menu_version: int, last_modified: str | None,
+    encodings=None, current_version: Callable[[], int | None] | None = None,
+) -> None:
+    # current_version() re-reads the restaurant's menu version: a write that lands
+    # while the body is built bumps it (commit), then deletes the manifest
+    def stale() -> bool:
+        return current_version is not None and current_version() != menu_version
+
+    current = read_manifest(store, restaurant_id, lang)
+    if current is not None and current["menu_version"] > menu_version:
+        return  # a newer snapshot was written meanwhile (e.g. by another worker)
+
+    files = {}
+    for encoding in [IDENTITY, *available_encodings(encodings or SNAPSHOT_ENCODINGS)]:
+        name = _file_name(restaurant_id, lang, menu_version, encoding)
+        store.put(name, body if encoding == IDENTITY else compress(body, encoding, best=True))
+        files[encoding] = name
+    manifest = {"menu_version": menu_version, "last_modified": last_modified, "files": files}
+    if stale():
+        return
+    store.put(_manifest_name(restaurant_id, lang), json.dumps(manifest).encode())
+    if stale():
+        # the write's invalidation may have run between the check and put() above
+        current = read_manifest(store, restaurant_id, lang)
+        if current is not None and current["menu_version"] == menu_version:
+            store.delete(_manifest_name(restaurant_id, lang))
+        return
+
+    # the newest older version is kept for responses that may still be reading it
+    prefix = f"{restaurant_id}/{lang}-v"
+    older = {}
+    for name in store.list(prefix):
+        version = int(name[len(prefix):].split(".")[0])
+        if version < menu_version:
+            older.setdefault(version, []).append(name)
+    for version in sorted(older)[:-1]:
+        for name in older[version]:
+            store.delete(name)
+
+
+def invalidate_snapshots(store: SnapshotStore, restaurant_id: int, languages) -> None:
+    for lang in languages:
+        store.delete(_manifest_name(restaurant_id, lang))
+
+
+def delete_snapshots(store: SnapshotStore, restaurant_id: int) -> None:
+    for name in store.list(f"{restaurant_id}/"):
+        store.delete(name)
+
+
+class SnapshotBuilder:
+    """Rebuilds the snapshots of scheduled restaurants on a background thread.
+
+    build(restaurant_ids) is set by app.db.snapshots. Restaurants scheduled
+    while a build is running are built again afterwards.
+    """
+
+    def __init__(self):
+        self.build = None
+        self._pending: set[int] = set()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, restaurant_id: int) -> None:
+        with self._condition:
+            self._pending.add(restaurant_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-builder", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                restaurant_ids, self._pending = self._pending, set()
+            try:
+                self.build(restaurant_ids)
+            except Exception:
+                logger.exception("Rebuilding menu snapshots of restaurants %s failed", sorted(restaurant_ids))
+
+
+def _create_store(name: str) -> SnapshotStore:
+    if name == "local":
+        return LocalSnapshotStore(SNAPSHOT_DIR)
+    raise ValueError(f"Unknown SNAPSHOT_STORE: {name}")
+
+
+snapshot_store = _create_store(SNAPSHOT_STORE)
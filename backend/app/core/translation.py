@@ -0,0 +1,212 @@
+#app/core/translation.py
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+from fastapi import HTTPException
+from app.core.config import (
+    TRANSLATION_SOURCE_LANGUAGE, TRANSLATION_LANGUAGES, TRANSLATION_DICTIONARY_PATH,
+    TRANSLATION_API_URL, TRANSLATION_API_KEY, TRANSLATION_TIMEOUT_SECONDS
+)
+
+# Menu translations.
+#
+# Menu item names and descriptions are translated in the background into
+# TRANSLATION_LANGUAGES and stored in menu_item_translations, keyed by a hash of
+# the source text: a translation is served only while the item still has that
+# text, and a text is sent to the provider once per language however many
+# items share it. Reads with ?lang= serve what is translated and fall back to the
+# source text for the rest, scheduling the restaurant for translation.
+
+logger = logging.getLogger(__name__)
+
+TRANSLATED_FIELDS = ("name", "description")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# Validates ?lang=; returns None for the source language (nothing to translate)
+def parse_language(lang: str | None) -> str | None:
+    if lang is None or lang == TRANSLATION_SOURCE_LANGUAGE:
+        return None
+    if lang not in TRANSLATION_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language: {lang}. "
+                   f"Supported languages: {', '.join([TRANSLATION_SOURCE_LANGUAGE, *TRANSLATION_LANGUAGES])}"
+        )
+    return lang
+
+
+# Returns {(item id, field): text} for the stored translations (rows of
+# menu_item_translations) that still match the items' current text
+def fresh_translations(items, rows) -> dict:
+    stored = {(row.menu_item_id, row.field): (row.source_hash, row.text) for row in rows}
+    translations = {}
+    for item in items:
+        for field in TRANSLATED_FIELDS:
+            value = getattr(item, field)
+            entry = stored.get((item.id, field))
+            if value and entry is not None and entry[0] == source_hash(value):
+                translations[(item.id, field)] = entry[1]
+    return translations
+
+
+# Returns the ids of the restaurants with items that are not (or no longer) translated
+def untranslated_restaurants(items, translations) -> set[int]:
+    return {
+        item.restaurant_id for item in items
+        if any(getattr(item, field) and (item.id, field) not in translations for field in TRANSLATED_FIELDS)
+    }
+
+
+# Replaces the translated fields of serialized menu items
+def translate_items(items: list[dict], translations) -> list[dict]:
+    for data in items:
+        for field in TRANSLATED_FIELDS:
+            text = translations.get((data["id"], field))
+            if text is not None and field in data:
+                data[field] = text
+    return items
+
+
+class TranslationProvider:
+    """Machine translation backend: returns one translation per text, in order."""
+
+    async def translate(self, texts: list[str], source: str, target: str) -> list[str]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class DictionaryProvider(TranslationProvider):
+    """Translates whole texts or word by word from local word lists; words without
+    an entry are kept. For development and tests."""
+
+    def __init__(self, dictionary: dict[str, dict[str, str]]):
+        self.dictionary = {
+            lang: {source.casefold(): target for source, target in words.items()}
+            for lang, words in dictionary.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str | None) -> "DictionaryProvider":
+        if not path:
+            return cls({})
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    async def translate(self, texts: list[str], source: str, target: str) -> list[str]:
+        words = self.dictionary.get(target, {})
+
+        def replace(match):
+            word = match.group(0)
+            translated = words.get(word.casefold())
+            if translated is None:
+                return word
+            return translated[:1].upper() + translated[1:] if word[:1].isupper() else translated
+
+        return [words.get(text.casefold()) or _WORD_RE.sub(replace, text) for text in texts]
+
+
+class LibreTranslateProvider(TranslationProvider):
+    """LibreTranslate-compatible HTTP API (POST /translate with a list of texts)."""
+
+    def __init__(self, url: str, api_key: str | None = None, timeout: float = 30):
+        self.url = url.rstrip("/") + "/translate"
+        self.api_key = api_key
+        self.timeout = timeout
+        self._session = None
+
+    async def translate(self, texts: list[str], source: str, target: str) -> list[str]:
+        if self._session is None:
+            # imported here: aiohttp takes a while to import and only this provider needs it
+            import aiohttp
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        async with self._session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            translated = (await response.json())["translatedText"]
+        if len(translated) != len(texts):
+            raise ValueError(f"Expected {len(texts)} translations, got {len(translated)}")
+        return translated
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class TranslationWorker:
+    """Translates the menus of scheduled restaurants on the event loop.
+
+    translate_restaurant(provider, restaurant_id) is set by app.db.translations,
+    which holds the instance.
+    schedule() may be called from any thread (e.g. after a write in a sync handler).
+    """
+
+    def __init__(self, provider: TranslationProvider):
+        self.provider = provider
+        self.translate_restaurant = None
+        self._pending: set[int] = set()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def schedule(self, restaurant_id: int) -> None:
+        with self._lock:
+            self._pending.add(restaurant_id)
+            loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self) -> None:
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            if self._pending:
+                self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        with self._lock:
+            self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.provider.close()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                restaurant_ids, self._pending = self._pending, set()
+            for restaurant_id in sorted(restaurant_ids):
+                try:
+                    await self.translate_restaurant(self.provider, restaurant_id)
+                except Exception:
+                    logger.exception("Translating the menu of restaurant %s failed", restaurant_id)
+
+
+def create_provider(name: str) -> TranslationProvider:
+    if name == "dictionary":
+        return DictionaryProvider.from_file(TRANSLATION_DICTIONARY_PATH)
+    if name == "libretranslate":
+        return LibreTranslateProvider(TRANSLATION_API_URL, TRANSLATION_API_KEY, TRANSLATION_TIMEOUT_SECONDS)
+    raise ValueError(f"Unknown TRANSLATION_PROVIDER: {name}")
+
@@ -0,0 +1,178 @@
+from datetime import datetime
+from sqlalchemy import and_, delete, exists, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from app.models.job import Job
+from app.core.jobs import PENDING, RUNNING, FAILED, utcnow
+
+# CRUD operations for the background job outbox (see app/core/jobs.py)
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# jobs looked at per claim; the next one is tried when another worker was faster
+_CLAIM_CANDIDATES = 5
+
+_CLAIMED_COLUMNS = (Job.id, Job.kind, Job.restaurant_id, Job.attempts, Job.run_at)
+
+def _enqueue_statement(dialect_name: str, kinds: list[str], restaurant_id: int | None):
+    now = utcnow()
+    statement = _DIALECT_INSERTS[dialect_name](Job).values([
+        {"kind": kind, "restaurant_id": restaurant_id, "status": PENDING, "attempts": 0,
+         "run_at": now, "created_at": now}
+        for kind in kinds
+    ])
+    # a job already pending for the restaurant covers this write too; it is made due
+    # now (and given its attempts back) in case it was backing off after a failure
+    return statement.on_conflict_do_update(
+        index_elements=[Job.kind, Job.restaurant_id],
+        index_where=Job.status == PENDING,
+        set_={"run_at": statement.excluded.run_at, "attempts": 0},
+    )
+
+# Adds jobs to the caller's transaction; they are committed (or rolled back) with it
+def enqueue_jobs(db: Session, kinds: list[str], restaurant_id: int | None):
+    if kinds:
+        db.execute(_enqueue_statement(db.bind.dialect.name, kinds, restaurant_id))
+
+def _due_jobs_query(now: datetime):
+    return (
+        select(Job.id)
+        .where(Job.status == PENDING, Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(_CLAIM_CANDIDATES)
+    )
+
+def _claim_query(job_id: int, now: datetime):
+    return (
+        update(Job)
+        .where(Job.id == job_id, Job.status == PENDING)
+        .values(status=RUNNING, claimed_at=now, attempts=Job.attempts + 1)
+        .returning(*_CLAIMED_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+# Marks the next due job as running and returns it, or None when no job is due
+def claim_job(db: Session, now: datetime):
+    for job_id in db.execute(_due_jobs_query(now)).scalars().all():
+        job = db.execute(_claim_query(job_id, now)).first()
+        if job is not None:
+            db.commit()
+            return job
+    db.rollback()
+    return None
+
+def _complete_query(job_id: int):
+    return delete(Job).where(Job.id == job_id).execution_options(synchronize_session=False)
+
+def complete_job(db: Session, job_id: int):
+    db.execute(_complete_query(job_id))
+    db.commit()
+
+def _pending_duplicate():
+    # a pending job of the same kind and restaurant, enqueued while this one ran
+    pending = aliased(Job)
+    return exists().where(
+        pending.kind == Job.kind, pending.restaurant_id == Job.restaurant_id, pending.status == PENDING
+    )
+
+def _retry_query(job_id: int, error: str, run_at: datetime):
+    return (
+        update(Job)
+        .where(Job.id == job_id, ~_pending_duplicate())
+        .values(status=PENDING, run_at=run_at, claimed_at=None, last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+
+# Makes a failed job pending again at `run_at`; if a newer job of the same kind is
+# already pending, that one does the work and this one is dropped
+def retry_job(db: Session, job_id: int, error: str, run_at: datetime):
+    if not db.execute(_retry_query(job_id, error, run_at)).rowcount:
+        db.execute(_complete_query(job_id))
+    db.commit()
+
+def _fail_query(job_id: int, error: str):
+    return (
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=FAILED, last_error=error)
+        .execution_options(synchronize_session=False)
+    )
+
+def fail_job(db: Session, job_id: int, error: str):
+    db.execute(_fail_query(job_id, error))
+    db.commit()
+
+def _requeue_stale_queries(claimed_before: datetime):
+    stale = and_(Job.status == RUNNING, Job.claimed_at < claimed_before)
+    # of stale duplicates (claimed one after the other), only the newest is run again
+    newer = aliased(Job)
+    newer_stale = exists().where(
+        newer.kind == Job.kind, newer.restaurant_id == Job.restaurant_id, newer.id > Job.id,
+        newer.status == RUNNING, newer.claimed_at < claimed_before
+    )
+    return (
+        update(Job).where(stale, ~_pending_duplicate(), ~newer_stale).values(status=PENDING, claimed_at=None)
+        .execution_options(synchronize_session=False),
+        delete(Job).where(stale).execution_options(synchronize_session=False),
+    )
+
+# Jobs whose worker died while running them are made pending again (or dropped
+# in favour of a pending duplicate); returns the number of jobs made pending
+def requeue_stale_jobs(db: Session, claimed_before: datetime) -> int:
+    requeue, drop = _requeue_stale_queries(claimed_before)
+    requeued = db.execute(requeue).rowcount
+    db.execute(drop)
+    db.commit()
+    return requeued
+
+def _job_counts_query():
+    return (
+        select(Job.kind, Job.status, func.count(), func.min(Job.created_at))
+        .group_by(Job.kind, Job.status)
+        .order_by(Job.kind, Job.status)
+    )
+
+# Returns (kind, status, count, oldest created_at) per kind and status
+def get_job_counts(db: Session):
+    return db.execute(_job_counts_query()).all()
+
+
+# -------ASYNC VARIANTS------
+# Same operations on an AsyncSession (see USE_ASYNC_DB)
+
+async def enqueue_jobs_async(db: AsyncSession, kinds: list[str], restaurant_id: int | None):
+    if kinds:
+        await db.execute(_enqueue_statement(db.bind.dialect.name, kinds, restaurant_id))
+
+async def claim_job_async(db: AsyncSession, now: datetime):
+    for job_id in (await db.execute(_due_jobs_query(now))).scalars().all():
+        job = (await db.execute(_claim_query(job_id, now))).first()
+        if job is not None:
+            await db.commit()
+            return job
+    await db.rollback()
+    return None
+
+async def complete_job_async(db: AsyncSession, job_id: int):
+    await db.execute(_complete_query(job_id))
+    await db.commit()
+
+async def retry_job_async(db: AsyncSession, job_id: int, error: str, run_at: datetime):
+    if not (await db.execute(_retry_query(job_id, error, run_at))).rowcount:
+        await db.execute(_complete_query(job_id))
+    await db.commit()
+
+async def fail_job_async(db: AsyncSession, job_id: int, error: str):
+    await db.execute(_fail_query(job_id, error))
+    await db.commit()
+
+async def requeue_stale_jobs_async(db: AsyncSession, claimed_before: datetime) -> int:
+    requeue, drop = _requeue_stale_queries(claimed_before)
+    requeued = (await db.execute(requeue)).rowcount
+    await db.execute(drop)
+    await db.commit()
+    return requeued
+
+async def get_job_counts_async(db: AsyncSession):
+    return (await db.execute(_job_counts_query())).all()
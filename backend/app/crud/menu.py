@@ -1,18 +1,89 @@
+import json
+from sqlalchemy import Numeric, bindparam, case, cast, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.menuitems import MenuItem
-from app.schemas.menu import MenuItemCreate, MenuItemUpdate
+from app.models.restaurant import Restaurant
+from app.schemas.menu import (
+    MenuItemCreate, MenuItemUpdate, MenuItemResponse, MenuItemBatchChange, MenuItemBatchOperation
+)
 from app.models.user import User
+from app.core.cache import menu_cache
+from app.core.menu_events import (
+    menu_events, item_json, publish_item_change, ITEM_CREATED, ITEM_DELETED, MENU_CHANGED
+)
+from app.crud.restaurant import bump_menu_version, bump_menu_version_async
+from app.core.config import BULK_BATCH_SIZE
+from app.core.allergens import allergen_mask
 
 # CRUD operations for menu items
 
-# Returns all menu items
-def get_all_menu_items(db: Session):
-    return db.query(MenuItem).all()
+# Columns of MenuItemResponse, for reads that return Core rows instead of ORM objects:
+# no identity map or attribute instrumentation, and rows validate from attributes alike
+MENU_ITEM_ROW_COLUMNS = tuple(MenuItem.__table__.c[name] for name in MenuItemResponse.model_fields)
+
+# Builds the statement for one page of menu items ordered by (restaurant_id, id)
+# `after` is the (restaurant_id, id) key of the last item of the previous page
+def _menu_items_page_query(
+    limit: int,
+    after: tuple[int, int] | None = None,
+    restaurant_id: int | None = None,
+    category: str | None = None,
+    is_available: bool | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    exclude_allergens: int | None = None,
+    rows: bool = False,
+):
+    query = select(*MENU_ITEM_ROW_COLUMNS) if rows else select(MenuItem)
+
+    if restaurant_id is not None:
+        query = query.where(MenuItem.restaurant_id == restaurant_id)
+    if category is not None:
+        query = query.where(MenuItem.category == category)
+    if is_available is not None:
+        query = query.where(MenuItem.is_available == is_available)
+    if min_price is not None:
+        query = query.where(MenuItem.price >= min_price)
+    if max_price is not None:
+        query = query.where(MenuItem.price <= max_price)
+    if exclude_allergens:
+        # bitmask of app.core.allergens.Allergen
+        query = query.where(MenuItem.allergen_mask.bitwise_and(exclude_allergens) == 0)
+
+    if after is not None:
+        query = query.where(tuple_(MenuItem.restaurant_id, MenuItem.id) > tuple_(*after))
+
+    # fetch one extra row to know whether there is a next page
+    return query.order_by(MenuItem.restaurant_id, MenuItem.id).limit(limit + 1)
+
+# Returns one page of menu items and whether more pages follow
+def get_menu_items_page(db: Session, limit: int, **filters):
+    items = db.execute(_menu_items_page_query(limit, **filters)).scalars().all()
+    has_more = len(items) > limit
+    return items[:limit], has_more
+
+# Same page as Core rows with the MenuItemResponse columns
+def get_menu_item_rows_page(db: Session, limit: int, **filters):
+    rows = db.execute(_menu_items_page_query(limit, rows=True, **filters)).all()
+    return rows[:limit], len(rows) > limit
 
 # Returns a specific menu item by ID
 def get_menu_item(db: Session, item_id: int):
     return db.query(MenuItem).filter(MenuItem.id==item_id).first()
 
+def _menu_item_version_query(item_id: int):
+    return (
+        select(MenuItem.restaurant_id, MenuItem.updated_at, Restaurant.menu_version)
+        .join(Restaurant, MenuItem.restaurant_id == Restaurant.id)
+        .where(MenuItem.id == item_id)
+    )
+
+# Returns (restaurant_id, updated_at, menu_version) for an item without loading it, or None
+def get_menu_item_version(db: Session, item_id: int):
+    return db.execute(_menu_item_version_query(item_id)).first()
+
 # -------ADMIN FUNCTIONS------
 
 #get menu item (for admin only)
@@ -30,6 +101,15 @@ def get_admin_menu_items(db:Session, admin_user: User):
         return []
     return db.query(MenuItem).filter(MenuItem.restaurant_id == admin_user.restaurant_id).all()
 
+def _admin_menu_item_rows_query(restaurant_id: int):
+    return select(*MENU_ITEM_ROW_COLUMNS).where(MenuItem.restaurant_id == restaurant_id).order_by(MenuItem.id)
+
+# Same items as Core rows with the MenuItemResponse columns
+def get_admin_menu_item_rows(db: Session, admin_user: User):
+    if not admin_user.restaurant_id:
+        return []
+    return db.execute(_admin_menu_item_rows_query(admin_user.restaurant_id)).all()
+
 # Creates a new menu item (admin only)
 def create_admin_menu_item(db: Session, item: MenuItemCreate, admin_user: User):
     if not admin_user.restaurant_id:
@@ -40,8 +120,11 @@ def create_admin_menu_item(db: Session, item: MenuItemCreate, admin_user: User):
     item_data['restaurant_id'] = admin_user.restaurant_id
     menu_item = MenuItem(**item_data)
     db.add(menu_item)
+    bump_menu_version(db, admin_user.restaurant_id)
     db.commit()
     db.refresh(menu_item)
+    menu_cache.invalidate_restaurant(menu_item.restaurant_id)
+    menu_events.publish(menu_item.restaurant_id, ITEM_CREATED, item_json(menu_item))
 
     return menu_item
 
@@ -53,11 +136,15 @@ def update_admin_menu_item(db: Session, item_id: int, data: MenuItemUpdate, admi
         return None
     
     # Update only the fields that are provided
-    for field, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(menu_item, field, value)
+    bump_menu_version(db, menu_item.restaurant_id)
 
     db.commit()
     db.refresh(menu_item)
+    menu_cache.invalidate_restaurant(menu_item.restaurant_id)
+    publish_item_change(menu_item.restaurant_id, menu_item, changes)
     return menu_item
 
 # Deletes a menu item (admin only)
@@ -67,7 +154,314 @@ def delete_admin_menu_item(db: Session, item_id: int, admin_user: User):
     if not menu_item:
         return False
     
+    restaurant_id = menu_item.restaurant_id
     db.delete(menu_item)
+    bump_menu_version(db, restaurant_id)
+    db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
+    menu_events.publish(restaurant_id, ITEM_DELETED, json.dumps({"id": item_id}))
+    return True
+
+# -------BULK IMPORT------
+# Items are matched by name within the restaurant (unique index
+# uq_menuitems_restaurant_id_name)
+
+# columns overwritten when an upsert finds an existing item
+UPSERT_COLUMNS = (
+    "description", "price", "category", "allergens", "allergen_mask", "is_available", "image_url", "ar_model_url"
+)
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _existing_names_query(restaurant_id: int, names: list[str]):
+    return select(MenuItem.name).where(MenuItem.restaurant_id == restaurant_id, MenuItem.name.in_(names))
+
+def _upsert_statement(dialect_name: str):
+    statement = _DIALECT_INSERTS[dialect_name](MenuItem)
+    return statement.on_conflict_do_update(
+        index_elements=[MenuItem.restaurant_id, MenuItem.name],
+        # onupdate defaults don't apply to ON CONFLICT DO UPDATE
+        set_={**{c: statement.excluded[c] for c in UPSERT_COLUMNS}, "updated_at": func.now()},
+    )
+
+# Updates existing items matched by name, one executemany per batch (Core, as the ORM's
+# bulk update only matches by primary key)
+_UPDATE_BY_NAME = (
+    update(MenuItem.__table__)
+    .where(
+        MenuItem.__table__.c.restaurant_id == bindparam("match_restaurant_id"),
+        MenuItem.__table__.c.name == bindparam("match_name"),
+    )
+    .values(**{c: bindparam(f"new_{c}") for c in UPSERT_COLUMNS}, updated_at=func.now())
+)
+
+def _update_by_name_params(values: list[dict]) -> list[dict]:
+    return [
+        {"match_restaurant_id": v["restaurant_id"], "match_name": v["name"], **{f"new_{c}": v[c] for c in UPSERT_COLUMNS}}
+        for v in values
+    ]
+
+# The statements and parameter batches writing the planned values. Dialects without
+# INSERT ... ON CONFLICT insert the new names and update the existing ones (known from
+# the names query); a name added concurrently fails the transaction, as without upsert
+def _import_writes(dialect_name: str, upsert: bool, values: list[dict], existing: set[str]):
+    if not upsert:
+        return [(insert(MenuItem), batch) for batch in _batches(values)]
+    if dialect_name in _DIALECT_INSERTS:
+        statement = _upsert_statement(dialect_name)
+        return [(statement, batch) for batch in _batches(values)]
+    new = [v for v in values if v["name"] not in existing]
+    changed = _update_by_name_params([v for v in values if v["name"] in existing])
+    return (
+        [(insert(MenuItem), batch) for batch in _batches(new)]
+        + [(_UPDATE_BY_NAME, batch) for batch in _batches(changed)]
+    )
+
+# Splits rows into the values to write and the row numbers that conflict with existing items
+def _plan_import(rows: list[tuple[int, dict]], existing: set[str], upsert: bool, restaurant_id: int):
+    values, conflicts, updated = [], [], 0
+    for number, data in rows:
+        if data["name"] in existing:
+            if not upsert:
+                conflicts.append(number)
+                continue
+            updated += 1
+        values.append({**data, "restaurant_id": restaurant_id, "allergen_mask": allergen_mask(data["allergens"])})
+    return values, conflicts, len(values) - updated, updated
+
+def _batches(values: list[dict]):
+    for start in range(0, len(values), BULK_BATCH_SIZE):
+        yield values[start:start + BULK_BATCH_SIZE]
+
+# Imports validated rows (row number, item data) into the admin's restaurant in one transaction
+# Returns (created, updated, conflicting row numbers), or None without a restaurant.
+# Without upsert, rows whose name already exists are not imported; with atomic, nothing is.
+def import_admin_menu_items(
+    db: Session, rows: list[tuple[int, dict]], admin_user: User, upsert: bool = False, atomic: bool = False
+):
+    if not admin_user.restaurant_id:
+        return None
+    restaurant_id = admin_user.restaurant_id
+
+    names = [data["name"] for _, data in rows]
+    existing = set(db.execute(_existing_names_query(restaurant_id, names)).scalars()) if names else set()
+    values, conflicts, created, updated = _plan_import(rows, existing, upsert, restaurant_id)
+    if not values or (atomic and conflicts):
+        return 0, 0, conflicts
+
+    for statement, batch in _import_writes(db.bind.dialect.name, upsert, values, existing):
+        db.execute(statement, batch)
+    bump_menu_version(db, restaurant_id)
     db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
+    menu_events.publish(restaurant_id, MENU_CHANGED, "{}")
+    return created, updated, conflicts
+
+# -------BATCH UPDATE------
+# Every statement is an UPDATE ... WHERE restaurant_id = ... RETURNING, so items of
+# other restaurants are never touched and no item is loaded before being changed.
+
+# Groups per-item changes by their values: items receiving the same changes
+# (e.g. is_available=false) are updated by one statement
+# Statements are returned with the names of the columns they change
+def _batch_change_queries(restaurant_id: int, entries: list[MenuItemBatchChange]):
+    groups: dict[tuple, list[int]] = {}
+    for entry in entries:
+        values = entry.changes.model_dump(mode="json", exclude_unset=True)
+        if "allergens" in values:
+            values["allergen_mask"] = allergen_mask(values["allergens"])
+        groups.setdefault(tuple(sorted(values.items())), []).append(entry.id)
+    return [
+        (
+            update(MenuItem)
+            .where(MenuItem.restaurant_id == restaurant_id, MenuItem.id.in_(ids))
+            .values(**dict(values))
+            .returning(MenuItem),
+            [name for name, _ in values],
+        )
+        for values, ids in groups.items()
+    ]
+
+def _batch_operation_query(restaurant_id: int, operation: MenuItemBatchOperation):
+    query = update(MenuItem).where(MenuItem.restaurant_id == restaurant_id)
+    if operation.category is not None:
+        query = query.where(MenuItem.category == operation.category.value)
+    if operation.ids is not None:
+        query = query.where(MenuItem.id.in_(operation.ids))
+
+    values = {}
+    if operation.is_available is not None:
+        values["is_available"] = operation.is_available
+    if operation.price_multiplier is not None or operation.price_delta is not None:
+        price = MenuItem.price
+        if operation.price_multiplier is not None:
+            price = price * operation.price_multiplier
+        if operation.price_delta is not None:
+            price = price + operation.price_delta
+        # Postgres only rounds numerics
+        price = func.round(cast(price, Numeric(12, 4)), 2)
+        values["price"] = case((price < 0, 0), else_=price)
+    return query.values(**values).returning(MenuItem), list(values)
+
+# Built before committing, while the returned rows are still loaded
+def _batch_result(updated: dict[int, MenuItem], entries, operations):
+    requested = [entry.id for entry in entries] + [i for operation in operations for i in operation.ids or []]
+    items = [MenuItemResponse.model_validate(item) for item in updated.values()]
+    return items, sorted({i for i in requested if i not in updated})
+
+def _publish_batch(restaurant_id: int, items: list[MenuItemResponse], changed: dict[int, set]):
+    for item in items:
+        publish_item_change(restaurant_id, item, changed[item.id])
+
+# Applies per-item changes, then set-based operations, in one transaction
+# Returns (updated items, requested ids that are not items of the restaurant)
+def batch_update_admin_menu_items(
+    db: Session, restaurant_id: int,
+    entries: list[MenuItemBatchChange], operations: list[MenuItemBatchOperation]
+):
+    queries = _batch_change_queries(restaurant_id, entries)
+    queries += [_batch_operation_query(restaurant_id, operation) for operation in operations]
+    updated: dict[int, MenuItem] = {}
+    changed: dict[int, set] = {}
+    for query, fields in queries:
+        for item in db.execute(query).scalars():
+            updated[item.id] = item
+            changed.setdefault(item.id, set()).update(fields)
+
+    result = _batch_result(updated, entries, operations)
+    if updated:
+        bump_menu_version(db, restaurant_id)
+        db.commit()
+        menu_cache.invalidate_restaurant(restaurant_id)
+        _publish_batch(restaurant_id, result[0], changed)
+    return result
+
+
+# -------ASYNC VARIANTS------
+# Same operations on an AsyncSession (see USE_ASYNC_DB)
+
+async def get_menu_items_page_async(db: AsyncSession, limit: int, **filters):
+    items = (await db.execute(_menu_items_page_query(limit, **filters))).scalars().all()
+    has_more = len(items) > limit
+    return items[:limit], has_more
+
+async def get_menu_item_rows_page_async(db: AsyncSession, limit: int, **filters):
+    rows = (await db.execute(_menu_items_page_query(limit, rows=True, **filters))).all()
+    return rows[:limit], len(rows) > limit
+
+async def get_menu_item_async(db: AsyncSession, item_id: int):
+    return await db.get(MenuItem, item_id)
+
+async def get_menu_item_version_async(db: AsyncSession, item_id: int):
+    return (await db.execute(_menu_item_version_query(item_id))).first()
+
+async def get_admin_menu_item_async(db: AsyncSession, item_id: int, admin_user: User):
+    if not admin_user.restaurant_id:
+        return None
+    return (await db.execute(
+        select(MenuItem).where(
+            MenuItem.id == item_id,
+            MenuItem.restaurant_id == admin_user.restaurant_id
+        )
+    )).scalars().first()
+
+async def get_admin_menu_items_async(db: AsyncSession, admin_user: User):
+    if not admin_user.restaurant_id:
+        return []
+    return (await db.execute(
+        select(MenuItem).where(MenuItem.restaurant_id == admin_user.restaurant_id)
+    )).scalars().all()
+
+async def get_admin_menu_item_rows_async(db: AsyncSession, admin_user: User):
+    if not admin_user.restaurant_id:
+        return []
+    return (await db.execute(_admin_menu_item_rows_query(admin_user.restaurant_id))).all()
+
+async def create_admin_menu_item_async(db: AsyncSession, item: MenuItemCreate, admin_user: User):
+    if not admin_user.restaurant_id:
+        return None
+
+    item_data = item.model_dump()
+    item_data['restaurant_id'] = admin_user.restaurant_id
+    menu_item = MenuItem(**item_data)
+    db.add(menu_item)
+    await bump_menu_version_async(db, admin_user.restaurant_id)
+    await db.commit()
+    await db.refresh(menu_item)
+    menu_cache.invalidate_restaurant(menu_item.restaurant_id)
+    menu_events.publish(menu_item.restaurant_id, ITEM_CREATED, item_json(menu_item))
+
+    return menu_item
+
+async def update_admin_menu_item_async(db: AsyncSession, item_id: int, data: MenuItemUpdate, admin_user: User):
+    menu_item = await get_admin_menu_item_async(db, item_id, admin_user)
+
+    if not menu_item:
+        return None
+
+    changes = data.model_dump(exclude_unset=True)
+    for field, value in changes.items():
+        setattr(menu_item, field, value)
+    await bump_menu_version_async(db, menu_item.restaurant_id)
+
+    await db.commit()
+    await db.refresh(menu_item)
+    menu_cache.invalidate_restaurant(menu_item.restaurant_id)
+    publish_item_change(menu_item.restaurant_id, menu_item, changes)
+    return menu_item
+
+async def delete_admin_menu_item_async(db: AsyncSession, item_id: int, admin_user: User):
+    menu_item = await get_admin_menu_item_async(db, item_id, admin_user)
+
+    if not menu_item:
+        return False
+
+    restaurant_id = menu_item.restaurant_id
+    await db.delete(menu_item)
+    await bump_menu_version_async(db, restaurant_id)
+    await db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
+    menu_events.publish(restaurant_id, ITEM_DELETED, json.dumps({"id": item_id}))
     return True
-    
\ No newline at end of file
+
+async def import_admin_menu_items_async(
+    db: AsyncSession, rows: list[tuple[int, dict]], admin_user: User, upsert: bool = False, atomic: bool = False
+):
+    if not admin_user.restaurant_id:
+        return None
+    restaurant_id = admin_user.restaurant_id
+
+    names = [data["name"] for _, data in rows]
+    existing = set((await db.execute(_existing_names_query(restaurant_id, names))).scalars()) if names else set()
+    values, conflicts, created, updated = _plan_import(rows, existing, upsert, restaurant_id)
+    if not values or (atomic and conflicts):
+        return 0, 0, conflicts
+
+    for statement, batch in _import_writes(db.bind.dialect.name, upsert, values, existing):
+        await db.execute(statement, batch)
+    await bump_menu_version_async(db, restaurant_id)
+    await db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
+    menu_events.publish(restaurant_id, MENU_CHANGED, "{}")
+    return created, updated, conflicts
+
+async def batch_update_admin_menu_items_async(
+    db: AsyncSession, restaurant_id: int,
+    entries: list[MenuItemBatchChange], operations: list[MenuItemBatchOperation]
+):
+    queries = _batch_change_queries(restaurant_id, entries)
+    queries += [_batch_operation_query(restaurant_id, operation) for operation in operations]
+    updated: dict[int, MenuItem] = {}
+    changed: dict[int, set] = {}
+    for query, fields in queries:
+        for item in (await db.execute(query)).scalars():
+            updated[item.id] = item
+            changed.setdefault(item.id, set()).update(fields)
+
+    result = _batch_result(updated, entries, operations)
+    if updated:
+        await bump_menu_version_async(db, restaurant_id)
+        await db.commit()
+        menu_cache.invalidate_restaurant(restaurant_id)
+        _publish_batch(restaurant_id, result[0], changed)
+    return result
@@ -1,20 +1,91 @@
 #app/crud/restaurant.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from app.models.restaurant import Restaurant
-from app.schemas.restaurant import RestaurantCreate, RestaurantUpdate
+from app.schemas.restaurant import RestaurantCreate, RestaurantUpdate, RestaurantResponse
 from app.models.user import User
+from app.core.cache import menu_cache
+from app.core.jobs import job_queue
+from app.crud.jobs import enqueue_jobs, enqueue_jobs_async
+from app.crud.user import detach_restaurant_admins, detach_restaurant_admins_async, forget_principals
 
-def get_all_restaurants(db: Session):
-    return db.query(Restaurant).all()
+# Columns of RestaurantResponse, for reads that return Core rows instead of ORM objects
+RESTAURANT_ROW_COLUMNS = tuple(Restaurant.__table__.c[name] for name in RestaurantResponse.model_fields)
+
+# Builds the statement for one page of restaurants ordered by id
+# `after` is the id of the last restaurant of the previous page
+def _restaurants_page_query(
+    limit: int,
+    after: int | None = None,
+    category: str | None = None,
+    min_rating: float | None = None,
+    rows: bool = False,
+):
+    query = select(*RESTAURANT_ROW_COLUMNS) if rows else select(Restaurant)
+
+    if category is not None:
+        query = query.where(Restaurant.category == category)
+    if min_rating is not None:
+        query = query.where(Restaurant.rating >= min_rating)
+    if after is not None:
+        query = query.where(Restaurant.id > after)
+
+    # fetch one extra row to know whether there is a next page
+    return query.order_by(Restaurant.id).limit(limit + 1)
+
+# Returns one page of restaurants and whether more pages follow
+def get_restaurants_page(db: Session, limit: int, **filters):
+    restaurants = db.execute(_restaurants_page_query(limit, **filters)).scalars().all()
+    has_more = len(restaurants) > limit
+    return restaurants[:limit], has_more
+
+# Same page as Core rows with the RestaurantResponse columns
+def get_restaurant_rows_page(db: Session, limit: int, **filters):
+    rows = db.execute(_restaurants_page_query(limit, rows=True, **filters)).all()
+    return rows[:limit], len(rows) > limit
 
 def get_restaurant(db: Session, restaurant_id: int):
     return db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
 
+def _restaurant_with_menu_query(restaurant_id: int):
+    return (
+        select(Restaurant)
+        .options(selectinload(Restaurant.menu_items))
+        .where(Restaurant.id == restaurant_id)
+    )
+
+# Returns the restaurant with its menu items loaded in one extra query
+def get_restaurant_with_menu(db: Session, restaurant_id: int):
+    return db.execute(_restaurant_with_menu_query(restaurant_id)).scalars().first()
+
+def _restaurant_version_query(restaurant_id: int):
+    return select(Restaurant.menu_version, Restaurant.updated_at).where(Restaurant.id == restaurant_id)
+
+# Returns (menu_version, updated_at) without loading the restaurant, or None
+def get_restaurant_version(db: Session, restaurant_id: int):
+    return db.execute(_restaurant_version_query(restaurant_id)).first()
+
+def _bump_menu_version_query(restaurant_id: int):
+    return (
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(menu_version=Restaurant.menu_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+# Bumps the restaurant's menu version and enqueues the follow-up jobs of menu
+# writes; called before committing any write to the restaurant or its menu items
+def bump_menu_version(db: Session, restaurant_id: int):
+    db.execute(_bump_menu_version_query(restaurant_id))
+    enqueue_jobs(db, job_queue.menu_jobs, restaurant_id)
+
 def create_restaurant(db: Session, restaurant: RestaurantCreate):
     db_restaurant = Restaurant(**restaurant.model_dump())
     db.add(db_restaurant)
     db.commit()
     db.refresh(db_restaurant)
+    menu_cache.invalidate_restaurant(db_restaurant.id)
     return db_restaurant
 
 def update_restaurant(db: Session, restaurant_id: int, data: RestaurantUpdate):
@@ -26,9 +97,11 @@ def update_restaurant(db: Session, restaurant_id: int, data: RestaurantUpdate):
     print(f"Update data: {update_data}")
     for key, value in update_data.items():
         setattr(restaurant, key, value)
+    bump_menu_version(db, restaurant.id)
 
     db.commit()
     db.refresh(restaurant)
+    menu_cache.invalidate_restaurant(restaurant.id)
     return restaurant
 
 def delete_restaurant(db: Session, restaurant_id: int):
@@ -36,8 +109,14 @@ def delete_restaurant(db: Session, restaurant_id: int):
     if not restaurant:
         return False
     
+    # the admins' tokens still name the restaurant
+    admin_ids = detach_restaurant_admins(db, restaurant_id)
     db.delete(restaurant)
+    # follow-up jobs clean up after the restaurant (e.g. its snapshots)
+    enqueue_jobs(db, job_queue.menu_jobs, restaurant_id)
     db.commit()
+    forget_principals(admin_ids)
+    menu_cache.invalidate_restaurant(restaurant_id)
     return True
 
 # ADMIN FUNCTIONS
@@ -56,7 +135,88 @@ def update_admin_restaurant(db: Session, admin_user: User, data: RestaurantUpdat
     print(f"Update data: {update_data}")
     for key, value in update_data.items():
         setattr(restaurant, key, value)
+    bump_menu_version(db, restaurant.id)
 
     db.commit()
     db.refresh(restaurant)
-    return restaurant
\ No newline at end of file
+    menu_cache.invalidate_restaurant(restaurant.id)
+    return restaurant
+
+
+# ASYNC VARIANTS
+# Same operations on an AsyncSession (see USE_ASYNC_DB)
+
+async def get_restaurants_page_async(db: AsyncSession, limit: int, **filters):
+    restaurants = (await db.execute(_restaurants_page_query(limit, **filters))).scalars().all()
+    has_more = len(restaurants) > limit
+    return restaurants[:limit], has_more
+
+async def get_restaurant_rows_page_async(db: AsyncSession, limit: int, **filters):
+    rows = (await db.execute(_restaurants_page_query(limit, rows=True, **filters))).all()
+    return rows[:limit], len(rows) > limit
+
+async def get_restaurant_async(db: AsyncSession, restaurant_id: int):
+    return await db.get(Restaurant, restaurant_id)
+
+async def get_restaurant_with_menu_async(db: AsyncSession, restaurant_id: int):
+    return (await db.execute(_restaurant_with_menu_query(restaurant_id))).scalars().first()
+
+async def get_restaurant_version_async(db: AsyncSession, restaurant_id: int):
+    return (await db.execute(_restaurant_version_query(restaurant_id))).first()
+
+async def bump_menu_version_async(db: AsyncSession, restaurant_id: int):
+    await db.execute(_bump_menu_version_query(restaurant_id))
+    await enqueue_jobs_async(db, job_queue.menu_jobs, restaurant_id)
+
+async def create_restaurant_async(db: AsyncSession, restaurant: RestaurantCreate):
+    db_restaurant = Restaurant(**restaurant.model_dump())
+    db.add(db_restaurant)
+    await db.commit()
+    await db.refresh(db_restaurant)
+    menu_cache.invalidate_restaurant(db_restaurant.id)
+    return db_restaurant
+
+async def _update_restaurant_async(db: AsyncSession, restaurant, data: RestaurantUpdate):
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(restaurant, key, value)
+    await bump_menu_version_async(db, restaurant.id)
+
+    await db.commit()
+    await db.refresh(restaurant)
+    menu_cache.invalidate_restaurant(restaurant.id)
+    return restaurant
+
+async def update_restaurant_async(db: AsyncSession, restaurant_id: int, data: RestaurantUpdate):
+    restaurant = await get_restaurant_async(db, restaurant_id)
+    if not restaurant:
+        return None
+    return await _update_restaurant_async(db, restaurant, data)
+
+async def delete_restaurant_async(db: AsyncSession, restaurant_id: int):
+    # related rows are loaded up front: the delete cascade cannot lazy load them
+    restaurant = (await db.execute(
+        select(Restaurant)
+        .options(selectinload(Restaurant.menu_items), selectinload(Restaurant.admins))
+        .where(Restaurant.id == restaurant_id)
+    )).scalars().first()
+    if not restaurant:
+        return False
+
+    admin_ids = await detach_restaurant_admins_async(db, restaurant_id)
+    await db.delete(restaurant)
+    await enqueue_jobs_async(db, job_queue.menu_jobs, restaurant_id)
+    await db.commit()
+    forget_principals(admin_ids)
+    menu_cache.invalidate_restaurant(restaurant_id)
+    return True
+
+async def get_admin_restaurant_async(db: AsyncSession, admin_user: User):
+    if not admin_user.restaurant_id:
+        return None
+    return await get_restaurant_async(db, admin_user.restaurant_id)
+
+async def update_admin_restaurant_async(db: AsyncSession, admin_user: User, data: RestaurantUpdate):
+    restaurant = await get_admin_restaurant_async(db, admin_user)
+    if not restaurant:
+        return None
+    return await _update_restaurant_async(db, restaurant, data)
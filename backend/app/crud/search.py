@@ -0,0 +1,91 @@
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.menuitems import MenuItem, menu_item_search_vector
+from app.models.restaurant import Restaurant, restaurant_search_vector
+from app.core.search import MENU_ITEM, RESTAURANT, SearchDoc
+
+# Queries behind GET /api/search
+
+# Rows indexed by the in-process search index, optionally limited to some restaurants
+def _search_documents_queries(restaurant_ids: set[int] | None = None):
+    restaurants = select(Restaurant.id, Restaurant.name, Restaurant.category)
+    items = select(
+        MenuItem.id, MenuItem.restaurant_id, MenuItem.name, MenuItem.description,
+        MenuItem.category, MenuItem.allergens, MenuItem.price, MenuItem.is_available
+    )
+    if restaurant_ids is not None:
+        restaurants = restaurants.where(Restaurant.id.in_(restaurant_ids))
+        items = items.where(MenuItem.restaurant_id.in_(restaurant_ids))
+    return restaurants, items
+
+# Returns (restaurant rows, menu item rows) for the search index
+def get_search_documents(db: Session, restaurant_ids: set[int] | None = None):
+    restaurants, items = _search_documents_queries(restaurant_ids)
+    return db.execute(restaurants).all(), db.execute(items).all()
+
+
+# Full-text search in Postgres (SEARCH_BACKEND=postgres): all terms must match,
+# the last one as a prefix; trigram similarity on names tolerates typos
+def _postgres_search_queries(tokens: list[str], limit: int, kind: str | None, restaurant_id: int | None):
+    ts_query = func.to_tsquery(text("'simple'"), " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"]))
+    phrase = " ".join(tokens)
+    queries = []
+
+    if kind in (None, MENU_ITEM):
+        score = func.ts_rank(menu_item_search_vector, ts_query) + func.similarity(MenuItem.name, phrase)
+        items = (
+            select(
+                MenuItem.id, MenuItem.name, MenuItem.restaurant_id, Restaurant.name.label("restaurant_name"),
+                MenuItem.category, MenuItem.price, MenuItem.is_available, score.label("score")
+            )
+            .join(Restaurant, MenuItem.restaurant_id == Restaurant.id)
+            .where(or_(menu_item_search_vector.bool_op("@@")(ts_query), MenuItem.name.bool_op("%")(phrase)))
+        )
+        if restaurant_id is not None:
+            items = items.where(MenuItem.restaurant_id == restaurant_id)
+        queries.append((MENU_ITEM, items.order_by(score.desc()).limit(limit)))
+
+    if kind in (None, RESTAURANT):
+        score = func.ts_rank(restaurant_search_vector, ts_query) + func.similarity(Restaurant.name, phrase)
+        restaurants = (
+            select(
+                Restaurant.id, Restaurant.name, Restaurant.id.label("restaurant_id"),
+                Restaurant.name.label("restaurant_name"), Restaurant.category, score.label("score")
+            )
+            .where(or_(restaurant_search_vector.bool_op("@@")(ts_query), Restaurant.name.bool_op("%")(phrase)))
+        )
+        if restaurant_id is not None:
+            restaurants = restaurants.where(Restaurant.id == restaurant_id)
+        queries.append((RESTAURANT, restaurants.order_by(score.desc()).limit(limit)))
+
+    return queries
+
+def _search_results(rows_by_type, limit: int):
+    results = [
+        (SearchDoc(
+            kind, row.id, row.name, row.restaurant_id, row.restaurant_name, row.category,
+            getattr(row, "price", None), getattr(row, "is_available", None)
+        ), row.score)
+        for kind, rows in rows_by_type
+        for row in rows
+    ]
+    return sorted(results, key=lambda result: result[1], reverse=True)[:limit]
+
+# Returns the best matches as (SearchDoc, score), like the in-process index
+def search_postgres(db: Session, tokens: list[str], limit: int, kind: str | None = None, restaurant_id: int | None = None):
+    queries = _postgres_search_queries(tokens, limit, kind, restaurant_id)
+    return _search_results([(k, db.execute(q).all()) for k, q in queries], limit)
+
+
+# -------ASYNC VARIANTS------
+
+async def get_search_documents_async(db: AsyncSession, restaurant_ids: set[int] | None = None):
+    restaurants, items = _search_documents_queries(restaurant_ids)
+    return (await db.execute(restaurants)).all(), (await db.execute(items)).all()
+
+async def search_postgres_async(
+    db: AsyncSession, tokens: list[str], limit: int, kind: str | None = None, restaurant_id: int | None = None
+):
+    queries = _postgres_search_queries(tokens, limit, kind, restaurant_id)
+    return _search_results([(k, (await db.execute(q)).all()) for k, q in queries], limit)
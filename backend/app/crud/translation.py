@@ -0,0 +1,90 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.menuitems import MenuItem
+from app.models.translation import MenuItemTranslation
+from app.core.cache import menu_cache
+from app.crud.restaurant import bump_menu_version, bump_menu_version_async
+
+# CRUD operations for menu item translations (see app/core/translation.py)
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _translations_query(item_ids: list[int], lang: str):
+    return select(
+        MenuItemTranslation.menu_item_id, MenuItemTranslation.field,
+        MenuItemTranslation.source_hash, MenuItemTranslation.text,
+    ).where(MenuItemTranslation.menu_item_id.in_(item_ids), MenuItemTranslation.lang == lang)
+
+# Returns the stored translations of the given items (fresh or stale)
+def get_translations(db: Session, item_ids: list[int], lang: str):
+    if not item_ids:
+        return []
+    return db.execute(_translations_query(item_ids, lang)).all()
+
+def _translation_sources_query(restaurant_id: int):
+    return (
+        select(MenuItem.id, MenuItem.restaurant_id, MenuItem.name, MenuItem.description)
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .order_by(MenuItem.id)
+    )
+
+# Returns (id, restaurant_id, name, description) of the restaurant's menu items
+def get_translation_sources(db: Session, restaurant_id: int):
+    return db.execute(_translation_sources_query(restaurant_id)).all()
+
+def _known_translations_query(lang: str, hashes: list[str]):
+    return (
+        select(MenuItemTranslation.source_hash, func.min(MenuItemTranslation.text))
+        .where(MenuItemTranslation.lang == lang, MenuItemTranslation.source_hash.in_(hashes))
+        .group_by(MenuItemTranslation.source_hash)
+    )
+
+# Returns {source hash: text} of texts already translated for any item
+def get_known_translations(db: Session, lang: str, hashes: list[str]) -> dict:
+    if not hashes:
+        return {}
+    return dict(db.execute(_known_translations_query(lang, hashes)).all())
+
+def _save_translations_statement(dialect_name: str):
+    statement = _DIALECT_INSERTS[dialect_name](MenuItemTranslation)
+    return statement.on_conflict_do_update(
+        index_elements=[MenuItemTranslation.menu_item_id, MenuItemTranslation.lang, MenuItemTranslation.field],
+        set_={
+            "source_hash": statement.excluded.source_hash,
+            "text": statement.excluded.text,
+            "updated_at": func.now(),
+        },
+    )
+
+# Upserts translations (dicts of menu_item_id, lang, field, source_hash, text)
+# of one restaurant's items; translated menus get a new version like any menu write
+def save_translations(db: Session, restaurant_id: int, values: list[dict]):
+    db.execute(_save_translations_statement(db.bind.dialect.name), values)
+    bump_menu_version(db, restaurant_id)
+    db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
+
+
+# -------ASYNC VARIANTS------
+# Same operations on an AsyncSession (see USE_ASYNC_DB)
+
+async def get_translations_async(db: AsyncSession, item_ids: list[int], lang: str):
+    if not item_ids:
+        return []
+    return (await db.execute(_translations_query(item_ids, lang))).all()
+
+async def get_translation_sources_async(db: AsyncSession, restaurant_id: int):
+    return (await db.execute(_translation_sources_query(restaurant_id))).all()
+
+async def get_known_translations_async(db: AsyncSession, lang: str, hashes: list[str]) -> dict:
+    if not hashes:
+        return {}
+    return dict((await db.execute(_known_translations_query(lang, hashes))).all())
+
+async def save_translations_async(db: AsyncSession, restaurant_id: int, values: list[dict]):
+    await db.execute(_save_translations_statement(db.bind.dialect.name), values)
+    await bump_menu_version_async(db, restaurant_id)
+    await db.commit()
+    menu_cache.invalidate_restaurant(restaurant_id)
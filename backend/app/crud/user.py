@@ -0,0 +1,93 @@
+#app/crud/user.py
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.core.cache import principal_cache
+
+def principal_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def get_user(db: Session, user_id: int):
+    return db.get(User, user_id)
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _auth_state_query(user_id: int):
+    return select(User.token_version, User.is_active).where(User.id == user_id)
+
+# Returns (token_version, is_active) without loading the user, or None
+def get_user_auth_state(db: Session, user_id: int):
+    return db.execute(_auth_state_query(user_id)).first()
+
+# A user's active flag and restaurant are trusted from the token claims, so changing
+# them revokes the user's tokens. Deleting a restaurant detaches its admins: they are
+# revoked in the delete's transaction, and their principal cache entries dropped
+# after its commit (see delete_restaurant)
+def _detach_restaurant_admins_query(restaurant_id: int):
+    return (
+        update(User)
+        .where(User.restaurant_id == restaurant_id)
+        .values(token_version=User.token_version + 1, restaurant_id=None)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+
+# Returns the ids of the detached users; does not commit
+def detach_restaurant_admins(db: Session, restaurant_id: int) -> list[int]:
+    return list(db.execute(_detach_restaurant_admins_query(restaurant_id)).scalars())
+
+def forget_principals(user_ids: list[int]) -> None:
+    for user_id in user_ids:
+        principal_cache.delete(principal_cache_key(user_id))
+
+def create_admin_user(db: Session, email: str, hashed_password: str, restaurant_id: int | None):
+    new_admin = User(
+        email=email,
+        hashed_password=hashed_password,
+        is_admin=True,
+        is_active=True,
+        restaurant_id=restaurant_id
+    )
+    db.add(new_admin)
+    db.commit()
+    db.refresh(new_admin)
+    return new_admin
+
+def update_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+    return user
+
+# ASYNC VARIANTS
+
+async def get_user_async(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+async def get_user_auth_state_async(db: AsyncSession, user_id: int):
+    return (await db.execute(_auth_state_query(user_id))).first()
+
+async def detach_restaurant_admins_async(db: AsyncSession, restaurant_id: int) -> list[int]:
+    return list((await db.execute(_detach_restaurant_admins_query(restaurant_id))).scalars())
+
+async def create_admin_user_async(db: AsyncSession, email: str, hashed_password: str, restaurant_id: int | None):
+    new_admin = User(
+        email=email,
+        hashed_password=hashed_password,
+        is_admin=True,
+        is_active=True,
+        restaurant_id=restaurant_id
+    )
+    db.add(new_admin)
+    await db.commit()
+    await db.refresh(new_admin)
+    return new_admin
+
+async def update_password_hash_async(db: AsyncSession, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    await db.commit()
+    return user
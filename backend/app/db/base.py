@@ -1,3 +1,19 @@
+from sqlalchemy import String, func, literal, text
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+def _inline(value: str):
+    return literal(value, String, literal_execute=True)
+
+
+# Full-text document over the given text columns, as searched by the Postgres
+# search backend (app/crud/search.py). Constants are rendered inline, not as
+# bound parameters, so queries match the GIN indexes of migration 0004.
+def search_vector(*columns):
+    document = None
+    for column in columns:
+        value = func.coalesce(column, _inline(""))
+        document = value if document is None else document + _inline(" ") + value
+    return func.to_tsvector(text("'simple'"), document)
\ No newline at end of file
@@ -1,8 +1,42 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import DATABASE_URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import (
+    DATABASE_URL, USE_ASYNC_DB, ASYNC_DATABASE_URL,
+    DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_STATEMENT_TIMEOUT_MS,
+    METRICS_ENABLED, QUERY_TRACKING_ENABLED
+)
+from app.core.metrics import instrument_engine
+from app.core.query_tracker import track_engine
+from app.db.pool import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
 
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
+_POOL_OPTIONS = dict(
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+)
+
+def _connect_args(url: str, is_async: bool) -> dict:
+    if not DB_STATEMENT_TIMEOUT_MS or not url.startswith("postgresql"):
+        return {}
+    if is_async:
+        return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    connect_args=_connect_args(DATABASE_URL, is_async=False),
+    **_POOL_OPTIONS
+)
+if METRICS_ENABLED:
+    instrument_engine(engine)
+if QUERY_TRACKING_ENABLED:
+    track_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -11,4 +45,50 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async engine
+# Maps the sync driver in DATABASE_URL to its asyncio counterpart
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+async_engine = None
+AsyncSessionLocal = None
+
+if USE_ASYNC_DB:
+    _async_url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(
+        _async_url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        connect_args=_connect_args(_async_url, is_async=True),
+        **_POOL_OPTIONS
+    )
+    if METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    if QUERY_TRACKING_ENABLED:
+        track_engine(async_engine.sync_engine)
+    # objects stay usable after commit, lazy loads are not possible on an AsyncSession
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session dependency for `async def` handlers: an AsyncSession when USE_ASYNC_DB is on,
+# otherwise a sync Session whose queries must be run in the threadpool
+get_session = get_async_db if USE_ASYNC_DB else get_db
+
+# Runs a sync CRUD function or awaits its async variant, depending on the session type,
+# so `async def` handlers never block the event loop on a database call
+async def run_crud(db: Session | AsyncSession, sync_fn, async_fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await async_fn(db, *args, **kwargs)
+    return await run_in_threadpool(sync_fn, db, *args, **kwargs)
@@ -0,0 +1,88 @@
+#backend/app/db/jobs.py
+import asyncio
+import logging
+from fastapi.concurrency import run_in_threadpool
+from app.db.database import SessionLocal, AsyncSessionLocal, run_crud
+from app.crud.jobs import (
+    claim_job, claim_job_async, complete_job, complete_job_async, retry_job, retry_job_async,
+    fail_job, fail_job_async, requeue_stale_jobs, requeue_stale_jobs_async, get_job_counts, get_job_counts_async
+)
+from app.core.cache import menu_cache
+from app.core.config import USE_ASYNC_DB, JOB_WORKERS
+from app.core.jobs import JobStore, PENDING, as_utc, job_queue, utcnow
+
+# Stores background jobs in the "jobs" table (see app/core/jobs.py).
+# Run as a module to process jobs in a dedicated process (with JOB_WORKERS=0 on the
+# API processes):
+#
+#     cd backend
+#     python -m app.db.jobs
+
+
+def _call_sync(sync_fn, *args):
+    db = SessionLocal()
+    try:
+        return sync_fn(db, *args)
+    finally:
+        db.close()
+
+
+# The sync session is opened and closed on the threadpool thread that uses it, so
+# a cancelled caller can never close it while a query or commit is in progress
+async def _call(sync_fn, async_fn, *args):
+    if not USE_ASYNC_DB:
+        return await run_in_threadpool(_call_sync, sync_fn, *args)
+    async with AsyncSessionLocal() as db:
+        return await async_fn(db, *args)
+
+
+class DatabaseJobStore(JobStore):
+    async def claim(self, now):
+        return await _call(claim_job, claim_job_async, now)
+
+    async def complete(self, job) -> None:
+        await _call(complete_job, complete_job_async, job.id)
+
+    async def retry(self, job, error: str, run_at) -> None:
+        await _call(retry_job, retry_job_async, job.id, error, run_at)
+
+    async def fail(self, job, error: str) -> None:
+        await _call(fail_job, fail_job_async, job.id, error)
+
+    async def requeue_stale(self, claimed_before) -> int:
+        return await _call(requeue_stale_jobs, requeue_stale_jobs_async, claimed_before)
+
+
+job_queue.store = DatabaseJobStore()
+# jobs are committed with the write, so its invalidation is the moment to wake the workers
+menu_cache.add_listener(job_queue.notify)
+
+
+# Queue depth per job kind, and this process's job latency
+async def job_stats(db) -> dict:
+    now = utcnow()
+    depth = {}
+    for kind, status, count, oldest in await run_crud(db, get_job_counts, get_job_counts_async):
+        kind_depth = depth.setdefault(kind, {"pending": 0, "running": 0, "failed": 0})
+        kind_depth[status] = count
+        if status == PENDING:
+            kind_depth["oldest_pending_seconds"] = round((now - as_utc(oldest)).total_seconds(), 3)
+    return {"depth": depth, "latency": job_queue.latency_stats()}
+
+
+async def run_workers() -> None:
+    # the modules doing the work register their job kinds when imported
+    import app.db.snapshots  # noqa: F401
+    import app.db.translations  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+    job_queue.start(max(JOB_WORKERS, 1))
+    print(f"✅ Processing {', '.join(job_queue.handlers) or 'no'} jobs with {max(JOB_WORKERS, 1)} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_queue.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_workers())
@@ -0,0 +1,41 @@
+#app/db/migrations.py
+import os
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+# Programmatic access to the Alembic migrations in backend/migrations.
+# From the command line: `alembic upgrade head` (run in backend/).
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+# arbitrary constant identifying the migration lock
+_MIGRATION_LOCK_ID = 4172_0011
+
+def _config(connection=None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+# Upgrades the database to the latest revision
+def upgrade_to_head(engine, revision: str = "head") -> None:
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # several workers may start at once; only one migrates at a time
+            connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _MIGRATION_LOCK_ID})
+        command.upgrade(_config(connection), revision)
+
+def downgrade_to(engine, revision: str) -> None:
+    with engine.begin() as connection:
+        command.downgrade(_config(connection), revision)
+
+# Returns True when the database is at the latest revision
+def is_up_to_date(engine) -> bool:
+    heads = set(ScriptDirectory.from_config(_config()).get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return current == heads
@@ -0,0 +1,114 @@
+#app/db/pool.py
+import asyncio
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Connection pool instrumentation
+# The pools below time how long callers wait to check a connection out
+# (including a pre-ping), so pool exhaustion shows up before it becomes latency.
+
+# upper bounds in seconds; the last bucket catches everything slower
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class WaitHistogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * len(WAIT_BUCKETS)
+        self.total = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        index = next(i for i, bound in enumerate(WAIT_BUCKETS) if seconds <= bound)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += seconds
+
+    def timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            total = self.total
+            timeouts = self.timeouts
+        return {
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(WAIT_BUCKETS, counts)
+            },
+            "count": sum(counts),
+            "sum_seconds": round(total, 6),
+            "timeouts": timeouts,
+        }
+
+
+class _TimedCheckoutMixin:
+    # shared by every pool of the class, including pools recreated on dispose()
+    wait_histogram: WaitHistogram
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_histogram.timeout()
+            raise
+        self.wait_histogram.observe(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_histogram = WaitHistogram()
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_histogram = WaitHistogram()
+
+
+def pool_stats(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # negative while the pool has not yet opened `size` connections
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+        })
+    if isinstance(pool, _TimedCheckoutMixin):
+        stats["wait"] = pool.wait_histogram.snapshot()
+    return stats
+
+
+# Opens up to `count` connections (no more than the pool keeps) and returns them to
+# the pool, so that the first requests of a new worker do not wait for connecting
+def prewarm_pool(engine, count: int) -> int:
+    if isinstance(engine.pool, QueuePool):
+        count = min(count, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def prewarm_async_pool(async_engine, count: int) -> int:
+    if isinstance(async_engine.pool, QueuePool):
+        count = min(count, async_engine.pool.size())
+    # connected concurrently; the ones opened are returned even if another one failed
+    results = await asyncio.gather(*(async_engine.connect().start() for _ in range(count)), return_exceptions=True)
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    for connection in connections:
+        await connection.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return len(connections)
@@ -1,15 +1,15 @@
 #backend/app/db/seed.py
 from sqlalchemy.orm import Session
 from app.db.database import engine, SessionLocal
-from app.db.base import Base
+from app.db.migrations import upgrade_to_head
 
 from app.models.restaurant import Restaurant
 from app.models.menuitems import MenuItem
 
 # Seed initial data into the database
+# (larger generated datasets for benchmarks: app/db/synthetic.py)
 def seed_data():
-    # Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    upgrade_to_head(engine)
 
     db: Session = SessionLocal()
 
@@ -106,7 +106,7 @@ def seed_data():
                 description="Crispy golden fries with sea salt",
                 price=3.99,
                 category="sides",
-                allergens="None",
+                allergens=None,
                 is_available=True,
                 image_url="https://images.unsplash.com/photo-1518013431117-eb1465fa5752?q=80&w=870&auto=format&fit=crop&ixlib=rb-4.1.0&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D",
                 restaurant_id=restaurants[0].id
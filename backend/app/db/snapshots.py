@@ -0,0 +1,97 @@
+#backend/app/db/snapshots.py
+import time
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.db.translations import load_translations
+from app.models.restaurant import Restaurant
+from app.crud.restaurant import get_restaurant_with_menu
+from app.core.cache import menu_cache
+from app.core.conditional import http_date
+from app.core.config import SNAPSHOTS_ENABLED, SNAPSHOT_LANGUAGES, TRANSLATION_LANGUAGES
+from app.core.serialization import restaurant_with_menu_json
+from app.core.jobs import job_queue
+from app.core.snapshots import (
+    SnapshotBuilder, snapshot_store, write_snapshot, delete_snapshots, invalidate_snapshots
+)
+
+# Builds the menu snapshots served by GET /api/menu/snapshot/{restaurant_id}.
+# Run as a module to (re)build every restaurant's snapshots, e.g. on a cold start:
+#
+#     cd backend
+#     python -m app.db.snapshots
+
+
+def current_menu_version(restaurant_id: int) -> int | None:
+    # own session: the build's session may still read the version it started from
+    with SessionLocal() as db:
+        return db.execute(
+            select(Restaurant.menu_version).where(Restaurant.id == restaurant_id)
+        ).scalar_one_or_none()
+
+
+def rebuild_snapshot(db: Session, restaurant_id: int) -> bool:
+    restaurant = get_restaurant_with_menu(db, restaurant_id)
+    if restaurant is None:
+        delete_snapshots(snapshot_store, restaurant_id)
+        return False
+    source = restaurant_with_menu_json(restaurant)
+    last_modified = http_date(restaurant.updated_at)
+    for lang in SNAPSHOT_LANGUAGES:
+        body = source
+        if lang in TRANSLATION_LANGUAGES:
+            translations = load_translations(db, restaurant.menu_items, lang)
+            body = restaurant_with_menu_json(restaurant, translations=translations)
+        write_snapshot(
+            snapshot_store, restaurant_id, lang, body, restaurant.menu_version, last_modified,
+            current_version=lambda: current_menu_version(restaurant_id),
+        )
+    return True
+
+
+def rebuild_snapshots(restaurant_ids) -> None:
+    db = SessionLocal()
+    try:
+        for restaurant_id in restaurant_ids:
+            rebuild_snapshot(db, restaurant_id)
+            # release the loaded menu before the next restaurant
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+# menu cache listener: stops serving the old snapshots at once; the "snapshot" job
+# (see app/core/jobs.py) rebuilds them
+def invalidate_restaurant_snapshots(restaurant_id: int) -> None:
+    invalidate_snapshots(snapshot_store, restaurant_id, SNAPSHOT_LANGUAGES)
+
+
+async def rebuild_snapshot_job(restaurant_id: int) -> None:
+    await run_in_threadpool(rebuild_snapshots, [restaurant_id])
+
+
+# rebuilds snapshots found missing on a read (see GET /api/menu/snapshot/{restaurant_id})
+snapshot_builder = SnapshotBuilder()
+snapshot_builder.build = rebuild_snapshots
+
+if SNAPSHOTS_ENABLED:
+    menu_cache.add_listener(invalidate_restaurant_snapshots)
+    job_queue.register("snapshot", rebuild_snapshot_job)
+
+
+def rebuild_all() -> None:
+    db = SessionLocal()
+    try:
+        restaurant_ids = db.execute(select(Restaurant.id).order_by(Restaurant.id)).scalars().all()
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    rebuild_snapshots(restaurant_ids)
+    print(f"✅ Rebuilt menu snapshots of {len(restaurant_ids)} restaurants "
+          f"({', '.join(SNAPSHOT_LANGUAGES)}) in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    rebuild_all()
@@ -0,0 +1,314 @@
+#backend/app/db/synthetic.py
+"""Adds synthetic restaurants, menus and admins to a database, at any scale.
+
+Unlike app/db/seed.py, which adds the handful of demo restaurants, rows are
+generated from a seeded RNG (the same arguments always produce the same data) and
+streamed to the database in batches of --batch-size rows, each in its own
+transaction, so memory stays flat however many rows are written. On PostgreSQL
+(psycopg2 or psycopg) menu items are loaded with COPY; elsewhere with multi-row
+Core inserts. Admins of a run share one password, hashed once.
+
+Usage (from backend/, with DATABASE_URL set; migrates the database first):
+
+    python -m app.db.synthetic --restaurants 5000 --items 400 --admins-per-restaurant 1 \\
+        --admin-password 'staging-only'
+
+Also used by benchmarks/load.py.
+"""
+import argparse
+import csv
+import functools
+import io
+import itertools
+import random
+import sys
+import time
+from sqlalchemy import insert, text
+from app.models.restaurant import Restaurant
+from app.models.menuitems import MenuItem
+from app.models.user import User
+from app.core.allergens import ALLERGEN_NAMES, allergen_mask
+from app.schemas.menu import MenuCategory
+
+CUISINES = ("Indian", "Italian", "Japanese", "Mexican", "Chinese", "Greek", "Thai", "American", "Grill", "Seafood")
+DISHES = (
+    "chicken beef lamb tofu paneer prawn salmon duck mushroom falafel halloumi biryani curry tikka "
+    "burger pizza pasta risotto ramen pho taco burrito sushi tempura gyoza dumplings noodles rice "
+    "salad soup wrap kebab shawarma lasagne gnocchi ravioli brownie cheesecake sorbet lemonade lassi"
+).split()
+STYLES = (
+    "spicy crispy grilled smoked roasted fried steamed braised garlic lemon honey chilli teriyaki "
+    "tandoori butter creamy classic house signature loaded"
+).split()
+EXTRAS = (
+    "fresh herbs seasonal greens homemade sauce slow cooked tender charred toasted sesame coriander "
+    "mint yogurt cheese tomato onion pepper basil ginger"
+).split()
+
+# share of menu items per category (weights, not percentages)
+DEFAULT_CATEGORY_WEIGHTS = {
+    MenuCategory.MAINS.value: 4, MenuCategory.SIDES.value: 2,
+    MenuCategory.DESSERTS.value: 1, MenuCategory.DRINKS.value: 2,
+}
+ALLERGENS = tuple(ALLERGEN_NAMES.values())
+
+ADMIN_EMAIL = "admin{restaurant_id}-{index}@bench.example.com"
+
+# columns loaded by COPY, in order
+MENU_ITEM_COLUMNS = (
+    "restaurant_id", "name", "description", "price", "category", "is_available", "allergens",
+    "allergen_mask", "image_url",
+)
+
+# the same few hundred allergen lists come up over and over
+_allergen_mask = functools.lru_cache(maxsize=None)(allergen_mask)
+
+
+# Parses "mains=4,sides=2,..." into category weights (missing categories get 0)
+def parse_category_weights(text: str) -> dict[str, float]:
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        # the category as stored ("dessert") or its MenuCategory name ("desserts")
+        if name.upper() in MenuCategory.__members__:
+            name = MenuCategory[name.upper()].value
+        if name not in DEFAULT_CATEGORY_WEIGHTS:
+            raise ValueError(f"Unknown category: {name}. Known categories: {', '.join(DEFAULT_CATEGORY_WEIGHTS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+def restaurant_rows(rng: random.Random, start: int, count: int) -> list[dict]:
+    return [
+        {
+            "name": f"{rng.choice(STYLES).title()} {rng.choice(DISHES).title()} House {i}",
+            "category": rng.choice(CUISINES),
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "image": f"https://example.com/restaurants/{i}.jpg",
+            "menu_version": 0,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+# `allergen_rate` is the share of items with allergens; those have 1 to `max_allergens`
+def menu_item_rows(
+    rng: random.Random,
+    restaurant_id: int,
+    count: int,
+    category_weights: dict[str, float] = DEFAULT_CATEGORY_WEIGHTS,
+    allergen_rate: float = 0.6,
+    max_allergens: int = 3,
+) -> list[dict]:
+    categories = list(category_weights)
+    cum_weights = list(itertools.accumulate(category_weights.values()))
+    rows = []
+    for i in range(count):
+        allergens = None
+        if rng.random() < allergen_rate:
+            allergens = ", ".join(rng.sample(ALLERGENS, rng.randint(1, max_allergens)))
+        rows.append({
+            "restaurant_id": restaurant_id,
+            # names are unique per restaurant (see migration 0003)
+            "name": f"{rng.choice(STYLES).title()} {rng.choice(DISHES).title()} {i + 1}",
+            "description": " ".join(rng.sample(EXTRAS, 6)),
+            "price": round(rng.uniform(3, 40), 2),
+            "category": rng.choices(categories, cum_weights=cum_weights)[0],
+            "is_available": rng.random() > 0.1,
+            "allergens": allergens,
+            # Core inserts bypass the ORM validator that keeps the mask in step
+            "allergen_mask": _allergen_mask(allergens),
+            "image_url": f"https://example.com/items/{restaurant_id}/{i + 1}.jpg",
+        })
+    return rows
+
+
+def admin_rows(restaurant_ids, admins_per_restaurant: int, hashed_password: str) -> list[dict]:
+    return [
+        {
+            "email": ADMIN_EMAIL.format(restaurant_id=restaurant_id, index=index),
+            "hashed_password": hashed_password,
+            "is_admin": True,
+            "is_active": True,
+            "restaurant_id": restaurant_id,
+            "token_version": 0,
+        }
+        for restaurant_id in restaurant_ids
+        for index in range(admins_per_restaurant)
+    ]
+
+
+class Progress:
+    """Prints rows written (and the rate) to stderr, at most once a second."""
+
+    def __init__(self, label: str, total: int, stream=sys.stderr):
+        self.label = label
+        self.total = total
+        self.stream = stream
+        self.done = 0
+        self.start = self.printed = time.perf_counter()
+
+    def __call__(self, rows: int) -> None:
+        self.done += rows
+        now = time.perf_counter()
+        if now - self.printed >= 1 or self.done >= self.total:
+            self.printed = now
+            rate = self.done / max(now - self.start, 1e-9)
+            end = "\n" if self.done >= self.total else ""
+            print(f"\r{self.label}: {self.done:,}/{self.total:,} ({rate:,.0f} rows/s)", end=end,
+                  file=self.stream, flush=True)
+
+
+def _no_progress(label: str, total: int):
+    return lambda rows: None
+
+
+def _batches(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_menu_items(engine, batch: list[dict]) -> None:
+    buffer = io.StringIO()
+    # None is written as an empty field, which COPY reads as NULL (generated texts are never empty)
+    writer = csv.writer(buffer)
+    writer.writerows([row[column] for column in MENU_ITEM_COLUMNS] for row in batch)
+    statement = f"COPY {MenuItem.__tablename__} ({', '.join(MENU_ITEM_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _load_method(engine, method: str) -> str:
+    copy_supported = engine.dialect.name == "postgresql" and engine.dialect.driver in ("psycopg2", "psycopg")
+    if method == "auto":
+        return "copy" if copy_supported else "insert"
+    if method == "copy" and not copy_supported:
+        raise ValueError(f"COPY needs PostgreSQL with psycopg2 or psycopg, not {engine.dialect.name}+{engine.dialect.driver}")
+    return method
+
+
+# Adds `restaurants` restaurants of `items_per_restaurant` menu items each (and
+# `admins_per_restaurant` admins sharing one password hash) to a migrated database;
+# returns the ids of the new restaurants. `method` is "insert", "copy" or "auto";
+# `progress(label, total)` returns a callable taking the rows of each batch written
+# (e.g. Progress).
+def seed_synthetic(
+    engine,
+    restaurants: int,
+    items_per_restaurant: int,
+    category_weights: dict[str, float] = DEFAULT_CATEGORY_WEIGHTS,
+    allergen_rate: float = 0.6,
+    max_allergens: int = 3,
+    admins_per_restaurant: int = 0,
+    hashed_password: str | None = None,
+    seed: int = 21,
+    batch_size: int = 5000,
+    method: str = "auto",
+    progress=None,
+) -> list[int]:
+    if admins_per_restaurant and hashed_password is None:
+        raise ValueError("Admins need a hashed_password")
+    method = _load_method(engine, method)
+    progress = progress or _no_progress
+    rng = random.Random(seed)
+
+    restaurant_ids = []
+    written = progress("restaurants", restaurants)
+    for start in range(0, restaurants, batch_size):
+        rows = restaurant_rows(rng, start + 1, min(batch_size, restaurants - start))
+        with engine.begin() as conn:
+            result = conn.execute(insert(Restaurant).returning(Restaurant.id, sort_by_parameter_order=True), rows)
+            restaurant_ids.extend(result.scalars().all())
+        written(len(rows))
+
+    items = (
+        row
+        for restaurant_id in restaurant_ids
+        for row in menu_item_rows(rng, restaurant_id, items_per_restaurant, category_weights, allergen_rate, max_allergens)
+    )
+    written = progress("menu items", len(restaurant_ids) * items_per_restaurant)
+    for batch in _batches(items, batch_size):
+        if method == "copy":
+            _copy_menu_items(engine, batch)
+        else:
+            with engine.begin() as conn:
+                conn.execute(insert(MenuItem), batch)
+        written(len(batch))
+
+    if admins_per_restaurant:
+        written = progress("admins", len(restaurant_ids) * admins_per_restaurant)
+        per_batch = max(batch_size // admins_per_restaurant, 1)
+        for start in range(0, len(restaurant_ids), per_batch):
+            rows = admin_rows(restaurant_ids[start:start + per_batch], admins_per_restaurant, hashed_password)
+            with engine.begin() as conn:
+                conn.execute(insert(User), rows)
+            written(len(rows))
+    return restaurant_ids
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100)
+    parser.add_argument("--items", type=int, default=50, help="menu items per restaurant")
+    parser.add_argument("--admins-per-restaurant", type=int, default=0)
+    parser.add_argument("--admin-password", help="shared by every admin (required with --admins-per-restaurant)")
+    parser.add_argument("--category-weights", type=parse_category_weights, default=DEFAULT_CATEGORY_WEIGHTS,
+                        help="e.g. mains=4,sides=2,desserts=1,drinks=2")
+    parser.add_argument("--allergen-rate", type=float, default=0.6, help="share of items with allergens")
+    parser.add_argument("--max-allergens", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per transaction")
+    parser.add_argument("--method", choices=("auto", "insert", "copy"), default="auto",
+                        help="how menu items are loaded (auto: COPY on PostgreSQL)")
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args(argv)
+    if args.admins_per_restaurant and not args.admin_password:
+        parser.error("--admins-per-restaurant needs --admin-password")
+
+    # imported here: benchmarks/load.py uses this module with an engine of its own
+    from app.db.database import engine
+    from app.db.migrations import upgrade_to_head
+    from app.core.security import get_password_hash
+
+    try:
+        _load_method(engine, args.method)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    upgrade_to_head(engine)
+    hashed_password = get_password_hash(args.admin_password) if args.admins_per_restaurant else None
+
+    start = time.perf_counter()
+    restaurant_ids = seed_synthetic(
+        engine, args.restaurants, args.items,
+        category_weights=args.category_weights, allergen_rate=args.allergen_rate,
+        max_allergens=args.max_allergens, admins_per_restaurant=args.admins_per_restaurant,
+        hashed_password=hashed_password, seed=args.seed, batch_size=args.batch_size,
+        method=args.method, progress=Progress,
+    )
+    # fresh statistics, so the planner knows how big the tables have become
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"✅ Added {len(restaurant_ids)} restaurants, {len(restaurant_ids) * args.items} menu items and "
+          f"{len(restaurant_ids) * args.admins_per_restaurant} admins in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#backend/app/db/translations.py
+import asyncio
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal, AsyncSessionLocal, run_crud
+from app.models.restaurant import Restaurant
+from app.crud.translation import (
+    get_translations, get_translations_async, get_translation_sources, get_translation_sources_async,
+    get_known_translations, get_known_translations_async, save_translations, save_translations_async
+)
+from app.core.jobs import job_queue
+from app.core.config import (
+    USE_ASYNC_DB, TRANSLATION_SOURCE_LANGUAGE, TRANSLATION_LANGUAGES, TRANSLATION_PROVIDER, TRANSLATION_BATCH_SIZE
+)
+from app.core.translation import (
+    TRANSLATED_FIELDS, TranslationProvider, TranslationWorker, create_provider, fresh_translations, source_hash,
+    untranslated_restaurants
+)
+
+# Translates menus into TRANSLATION_LANGUAGES (see app/core/translation.py).
+# Run as a module to translate every restaurant's menu, e.g. after adding a language:
+#
+#     cd backend
+#     python -m app.db.translations
+
+
+def _session():
+    return AsyncSessionLocal() if USE_ASYNC_DB else SessionLocal()
+
+
+async def _translate_texts(provider: TranslationProvider, texts: list[str], lang: str) -> dict:
+    translated = {}
+    for start in range(0, len(texts), TRANSLATION_BATCH_SIZE):
+        batch = texts[start:start + TRANSLATION_BATCH_SIZE]
+        results = await provider.translate(batch, TRANSLATION_SOURCE_LANGUAGE, lang)
+        translated.update((source_hash(text), result) for text, result in zip(batch, results))
+    return translated
+
+
+# Translates the texts of a restaurant's menu that have no fresh translation;
+# returns the number of translations written
+async def translate_restaurant(provider: TranslationProvider, restaurant_id: int) -> int:
+    db = _session()
+    try:
+        items = await run_crud(db, get_translation_sources, get_translation_sources_async, restaurant_id)
+        item_ids = [item.id for item in items]
+        values = []
+        for lang in TRANSLATION_LANGUAGES:
+            rows = await run_crud(db, get_translations, get_translations_async, item_ids, lang)
+            fresh = fresh_translations(items, rows)
+            needed = [
+                (item.id, field, getattr(item, field))
+                for item in items for field in TRANSLATED_FIELDS
+                if getattr(item, field) and (item.id, field) not in fresh
+            ]
+            if not needed:
+                continue
+
+            # texts translated before (for any item) are reused, the rest go to the provider once each
+            texts = {source_hash(text): text for _, _, text in needed}
+            known = await run_crud(db, get_known_translations, get_known_translations_async, lang, list(texts))
+            known.update(await _translate_texts(
+                provider, [text for digest, text in texts.items() if digest not in known], lang
+            ))
+            values.extend(
+                {"menu_item_id": item_id, "lang": lang, "field": field,
+                 "source_hash": source_hash(text), "text": known[source_hash(text)]}
+                for item_id, field, text in needed
+            )
+
+        if values:
+            await run_crud(db, save_translations, save_translations_async, restaurant_id, values)
+        return len(values)
+    finally:
+        if USE_ASYNC_DB:
+            await db.close()
+        else:
+            db.close()
+
+
+# translates menus found untranslated on a read (see load_translations)
+translation_worker = TranslationWorker(create_provider(TRANSLATION_PROVIDER))
+translation_worker.translate_restaurant = translate_restaurant
+
+
+# translates written menus (see app/core/jobs.py)
+async def translate_restaurant_job(restaurant_id: int) -> None:
+    await translate_restaurant(translation_worker.provider, restaurant_id)
+
+
+if TRANSLATION_LANGUAGES:
+    job_queue.register("translate", translate_restaurant_job)
+
+
+# Fresh translations of the given menu items for ?lang=; restaurants with items that
+# are not translated yet are scheduled (and served in the source language meanwhile)
+def _served_translations(items, rows) -> dict:
+    translations = fresh_translations(items, rows)
+    for restaurant_id in untranslated_restaurants(items, translations):
+        translation_worker.schedule(restaurant_id)
+    return translations
+
+
+def load_translations(db: Session, items, lang: str) -> dict:
+    return _served_translations(items, get_translations(db, [item.id for item in items], lang))
+
+
+# for `async def` handlers, with either kind of session (see get_session)
+async def load_translations_async(db, items, lang: str) -> dict:
+    rows = await run_crud(db, get_translations, get_translations_async, [item.id for item in items], lang)
+    return _served_translations(items, rows)
+
+
+async def translate_all() -> None:
+    db = SessionLocal()
+    try:
+        restaurant_ids = db.execute(select(Restaurant.id).order_by(Restaurant.id)).scalars().all()
+    finally:
+        db.close()
+
+    provider = translation_worker.provider
+    start = time.perf_counter()
+    written = 0
+    try:
+        for restaurant_id in restaurant_ids:
+            written += await translate_restaurant(provider, restaurant_id)
+    finally:
+        await provider.close()
+    print(f"✅ Wrote {written} translations for {len(restaurant_ids)} restaurants "
+          f"({', '.join(TRANSLATION_LANGUAGES) or 'no TRANSLATION_LANGUAGES set'}) in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(translate_all())
@@ -1,32 +1,139 @@
-from fastapi import FastAPI
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import engine
-from app.db.base import Base
-from app.routers import auth, admin, menu, restaurant
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.db.database import engine, async_engine, get_session
+from app.db.pool import pool_stats, prewarm_pool, prewarm_async_pool
+from app.core.config import (
+    COMPRESSION_ENABLED, DB_POOL_PREWARM, FAST_JSON_RESPONSES, METRICS_ENABLED, QUERY_TRACKING_ENABLED,
+    RUN_MIGRATIONS_ON_STARTUP, TRANSLATION_LANGUAGES, VERIFY_SCHEMA_ON_STARTUP
+)
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_tracker import QueryTrackerMiddleware, query_budget
+from app.core.rate_limit import limit_requests
+from app.core.menu_events import menu_events
+from app.core.serialization import FastJSONResponse
+from app.db.translations import translation_worker
+from app.db.jobs import job_queue, job_stats
+from app.routers import auth, admin, menu, restaurant, search
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Nothing touches the database at import: the engines connect on first use, and the
+# schema and connection pools are dealt with in `lifespan`, once per worker.
 
-app = FastAPI(title="Gusto API", version="0.1.0")
+# startup timings show next to uvicorn's own messages
+logger = logging.getLogger("uvicorn.error")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def _ms(seconds: float) -> int:
+    return round(seconds * 1000)
+
+async def _prepare_schema() -> None:
+    # imported here: Alembic is slow to import and not needed when migrations run on deploy
+    from app.db.migrations import upgrade_to_head, is_up_to_date
+    # Apply schema migrations (disable in production and run `alembic upgrade head` on deploy)
+    if RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(upgrade_to_head, engine)
+    elif not await run_in_threadpool(is_up_to_date, engine):
+        raise RuntimeError("The database is not at the latest migration, run `alembic upgrade head`")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    # from the start of this module's import to here: imports and create_app()
+    timings = {"import": _ms(started - _IMPORT_STARTED)}
+
+    if RUN_MIGRATIONS_ON_STARTUP or VERIFY_SCHEMA_ON_STARTUP:
+        await _prepare_schema()
+        timings["schema"] = _ms(time.perf_counter() - started)
+
+    if DB_POOL_PREWARM:
+        prewarm_started = time.perf_counter()
+        await run_in_threadpool(prewarm_pool, engine, DB_POOL_PREWARM)
+        if async_engine is not None:
+            await prewarm_async_pool(async_engine, DB_POOL_PREWARM)
+        timings["pool"] = _ms(time.perf_counter() - prewarm_started)
+
+    # menu writes are pushed to /api/restaurants/{id}/menu/events (see app/core/menu_events.py)
+    menu_events.start()
+    # menus are translated in the background while the app runs (see app/core/translation.py)
+    if TRANSLATION_LANGUAGES:
+        translation_worker.start()
+    # follow-up work of writes (see app/core/jobs.py); JOB_WORKERS=0 leaves it to `python -m app.db.jobs`
+    job_queue.start()
+
+    logger.info("Gusto API ready in %d ms (%s)", _ms(time.perf_counter() - _IMPORT_STARTED),
+                ", ".join(f"{step} {ms} ms" for step, ms in timings.items()))
+    yield
+    await job_queue.stop()
+    if TRANSLATION_LANGUAGES:
+        await translation_worker.stop()
+    menu_events.stop()
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Gusto API", version="0.1.0",
+        default_response_class=FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse,
+        lifespan=lifespan
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    if QUERY_TRACKING_ENABLED:
+        app.add_middleware(QueryTrackerMiddleware)
+
+    #Register routers, each with the per-IP rate limit of its group (see app/core/rate_limit.py)
+    app.include_router(auth.router, dependencies=[Depends(limit_requests("auth"))])
+    app.include_router(admin.router, dependencies=[Depends(limit_requests("admin"))])
+    app.include_router(menu.router, dependencies=[Depends(limit_requests("menu"))])
+    app.include_router(restaurant.router, dependencies=[Depends(limit_requests("menu"))])
+    app.include_router(search.router, dependencies=[Depends(limit_requests("menu"))])
+
+    @app.get("/")
+    def root():
+        return {"message": "Welcome to Gusto API"}
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "ok"}
+
+    #internal: connection pool statistics for capacity planning
+    @app.get("/health/pool", include_in_schema=False)
+    def pool_health():
+        pools = {"sync": pool_stats(engine.pool)}
+        if async_engine is not None:
+            pools["async"] = pool_stats(async_engine.pool)
+        return pools
+
+    #internal: background job queue depth per job kind (pending, running, failed and the
+    #age of the oldest pending job) of every restaurant, and job latency in this worker
+    @app.get("/health/jobs", include_in_schema=False, dependencies=[Depends(query_budget(1))])
+    async def jobs_health(db=Depends(get_session)):
+        return await job_stats(db)
 
-#Register routers
-app.include_router(auth.router)
-app.include_router(admin.router)
-app.include_router(menu.router)
-app.include_router(restaurant.router)
+    #Prometheus text exposition format
+    #async so that rendering runs on the event loop, where the metrics are updated
+    if METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
-@app.get("/")
-def root():
-    return {"message": "Welcome to Gusto API"}
+    return app
 
-@app.get("/health")
-def health_check():
-    return {"status": "ok"}
+app = create_app()
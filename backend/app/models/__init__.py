@@ -1,5 +1,7 @@
 from .user import User
 from .restaurant import Restaurant
 from .menuitems import MenuItem
+from .translation import MenuItemTranslation
+from .job import Job
 
-__all__ = ["User", "Restaurant", "MenuItem"]
\ No newline at end of file
+__all__ = ["User", "Restaurant", "MenuItem", "MenuItemTranslation", "Job"]
\ No newline at end of file
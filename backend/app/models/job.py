@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, text
+from app.db.base import Base
+
+# Outbox of background jobs (see app/core/jobs.py). Writes add their follow-up jobs
+# in the same transaction, so a job exists exactly when its write was committed.
+# Timestamps are set by the application (UTC) so they compare consistently on SQLite.
+class Job(Base):
+    __tablename__ = "jobs"
+    # created by migrations/versions/0007_jobs.py
+    __table_args__ = (
+        # one pending job per (kind, restaurant): enqueueing again only moves it forward
+        Index(
+            "uq_jobs_pending_kind_restaurant", "kind", "restaurant_id", unique=True,
+            sqlite_where=text("status = 'pending'"), postgresql_where=text("status = 'pending'"),
+        ),
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(64), nullable=False)
+    # no foreign key: a job may outlive its restaurant (e.g. to clean up after it)
+    restaurant_id = Column(Integer, nullable=True)
+    status = Column(String(16), nullable=False, default="pending") # pending, running or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    # when the job is due (later than created_at while backing off after a failure)
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
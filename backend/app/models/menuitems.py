@@ -1,11 +1,23 @@
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, DateTime, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, search_vector
+from app.core.allergens import allergen_mask
 
 # Model for menu items
 class MenuItem(Base):
     __tablename__ = "menuitems"
+    # created by migrations/versions/0002_query_indexes.py, 0003 and 0005
+    __table_args__ = (
+        # keyset pagination; allergen_mask lets exclusion filters be checked on the index entries
+        Index("ix_menuitems_restaurant_id_id_allergens", "restaurant_id", "id", "allergen_mask"),
+        Index("uq_menuitems_restaurant_id_name", "restaurant_id", "name", unique=True),
+        Index("ix_menuitems_restaurant_category_available", "restaurant_id", "category", "is_available"),
+        Index(
+            "ix_menuitems_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -21,7 +33,23 @@ class MenuItem(Base):
     ar_model_url = Column(String(500), nullable=True)
 
     allergens = Column(String(255), nullable=True)
+    # bitmask of app.core.allergens.Allergen parsed from allergens, for filtering in SQL
+    allergen_mask = Column(Integer, nullable=False, default=0, server_default="0")
 
     is_available = Column(Boolean, default=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
     # relationship to restaurant
-    restaurant = relationship("Restaurant", back_populates="menu_items")
\ No newline at end of file
+    restaurant = relationship("Restaurant", back_populates="menu_items")
+
+    # keeps allergen_mask in step for ORM writes; bulk statements set it themselves
+    @validates("allergens")
+    def _sync_allergen_mask(self, key, value):
+        self.allergen_mask = allergen_mask(value)
+        return value
+
+
+# searched by SEARCH_BACKEND=postgres; created by migrations/versions/0004_search_indexes.py
+menu_item_search_vector = search_vector(MenuItem.name, MenuItem.description, MenuItem.category, MenuItem.allergens)
+Index("ix_menuitems_search", menu_item_search_vector, postgresql_using="gin").ddl_if(dialect="postgresql")
\ No newline at end of file
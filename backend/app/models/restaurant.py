@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, search_vector
 
 # Model for restaurants
 class Restaurant(Base):
     __tablename__ = "restaurants"
+    # created by migrations/versions/0002_query_indexes.py
+    __table_args__ = (
+        Index(
+            "ix_restaurants_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -13,9 +20,18 @@ class Restaurant(Base):
     rating = Column(Float, default=0.0)
     image = Column(String(500), nullable=True) #stores image URL
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # bumped on every write to the restaurant or its menu, used for ETags
+    menu_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # relationship to menu items
     menu_items = relationship("MenuItem", back_populates="restaurant", cascade="all, delete-orphan")
 
     # relationship to admin
     admins = relationship("User", back_populates="restaurant")
+
+
+# searched by SEARCH_BACKEND=postgres; created by migrations/versions/0004_search_indexes.py
+restaurant_search_vector = search_vector(Restaurant.name, Restaurant.category)
+Index("ix_restaurants_search", restaurant_search_vector, postgresql_using="gin").ddl_if(dialect="postgresql")
\ No newline at end of file
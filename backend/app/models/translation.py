@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+# Machine translations of menu item fields (see app/core/translation.py).
+# source_hash identifies the source text a translation was made from: a translation
+# whose hash no longer matches the item's text is stale, and a text translated once
+# is reused for every item with the same source (looked up by (lang, source_hash)).
+class MenuItemTranslation(Base):
+    __tablename__ = "menu_item_translations"
+    # created by migrations/versions/0006_menu_item_translations.py
+    __table_args__ = (
+        Index("uq_menu_item_translations_item_lang_field", "menu_item_id", "lang", "field", unique=True),
+        Index("ix_menu_item_translations_lang_source_hash", "lang", "source_hash"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    menu_item_id = Column(Integer, ForeignKey("menuitems.id", ondelete="CASCADE"), nullable=False)
+    lang = Column(String(16), nullable=False)
+    field = Column(String(32), nullable=False) # "name" or "description"
+    source_hash = Column(String(64), nullable=False)
+    text = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,18 +1,40 @@
 #app/routers/admin.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_current_admin_user, get_admin_restaurant_id
-from app.models import User
-from app.db.database import get_db
-from app.schemas.restaurant import RestaurantResponse, RestaurantUpdate
-from app.schemas.menu import MenuItemResponse, MenuItemCreate, MenuItemUpdate
+from app.core.dependencies import get_current_admin_user, get_admin_restaurant_id, Principal
+from app.db.database import get_session, run_crud
+from app.schemas.restaurant import RestaurantResponse, RestaurantUpdate, RestaurantWithMenuResponse
+from app.schemas.menu import (
+    MenuItemResponse, MenuItemCreate, MenuItemUpdate, MenuImportResult, MenuImportRowError,
+    MenuItemBatchUpdate, MenuItemBatchResult
+)
 from app.crud import restaurant as restaurant_crud
 from app.crud import menu as menu_crud
+from app.core.query_tracker import query_budget
+from app.core.serialization import MENU_ITEM_ROWS, parse_menu_item_fields, restaurant_with_menu_json
+from app.core.config import BULK_IMPORT_MAX_ROWS, BULK_BATCH_SIZE, FAST_JSON_RESPONSES
+from app.core.menu_io import read_menu_import, csv_header, csv_rows, ndjson_rows, EXPORT_MEDIA_TYPES
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
-@router.get("/dashboard")
-async def admin_dashboard(current_admin: User = Depends(get_current_admin_user)):
+#query budgets below include the user lookup get_current_user makes on a cache miss
+
+#writes include the version bump and enqueueing its follow-up jobs (see app/core/jobs.py)
+
+#bulk routes run one statement per batch (or per group of identical changes),
+#plus the user lookup, existing names, the version bump and its jobs, and one more
+#batch when an upsert without ON CONFLICT splits inserts from updates
+_BULK_QUERY_BUDGET = 5 + -(-BULK_IMPORT_MAX_ROWS // BULK_BATCH_SIZE)
+
+#item names are unique per restaurant (uq_menuitems_restaurant_id_name)
+_DUPLICATE_NAME = "Another menu item of your restaurant already has this name"
+
+@router.get("/dashboard", dependencies=[Depends(query_budget(1))])
+async def admin_dashboard(current_admin: Principal = Depends(get_current_admin_user)):
     """this is an admin only endpoint
     requires valid JWT Token AND is_admin=True"""
     return {
@@ -26,13 +48,15 @@ async def admin_dashboard(current_admin: User = Depends(get_current_admin_user))
 
 #RESTAURANT ENDPOINTS
 
-@router.get("/restaurant", response_model=RestaurantResponse)
-def get_my_restaurant(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+@router.get("/restaurant", response_model=RestaurantResponse, dependencies=[Depends(query_budget(2))])
+async def get_my_restaurant(
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get the restaurant associated with the logged-in admin"""
-    restaurant = restaurant_crud.get_admin_restaurant(db, current_user)
+    restaurant = await run_crud(
+        db, restaurant_crud.get_admin_restaurant, restaurant_crud.get_admin_restaurant_async, current_user
+    )
     
     if not restaurant:
         raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
@@ -40,14 +64,38 @@ def get_my_restaurant(
     return restaurant
 
 
-@router.patch("/restaurant", response_model=RestaurantResponse)
-def update_my_restaurant(
+@router.get("/restaurant/full", response_model=RestaurantWithMenuResponse, dependencies=[Depends(query_budget(3))])
+async def get_my_restaurant_full(
+    fields: str | None = None,
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Get the admin's restaurant with its menu grouped by category
+    `fields` limits the menu item fields returned"""
+    projection = parse_menu_item_fields(fields)
+    if not current_user.restaurant_id:
+        raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
+
+    restaurant = await run_crud(
+        db, restaurant_crud.get_restaurant_with_menu, restaurant_crud.get_restaurant_with_menu_async,
+        current_user.restaurant_id
+    )
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
+
+    return Response(content=restaurant_with_menu_json(restaurant, projection), media_type="application/json")
+
+
+@router.patch("/restaurant", response_model=RestaurantResponse, dependencies=[Depends(query_budget(6))])
+async def update_my_restaurant(
     data: RestaurantUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update the restaurant associated with the logged-in admin"""
-    restaurant = restaurant_crud.update_admin_restaurant(db, current_user, data)
+    restaurant = await run_crud(
+        db, restaurant_crud.update_admin_restaurant, restaurant_crud.update_admin_restaurant_async, current_user, data
+    )
     
     if not restaurant:
         raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
@@ -57,23 +105,63 @@ def update_my_restaurant(
 
 #MENU ENDPOINTS
 
-@router.get("/menu", response_model=list[MenuItemResponse])
-def get_my_menu_items(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+@router.get("/menu", response_model=list[MenuItemResponse], dependencies=[Depends(query_budget(2))])
+async def get_my_menu_items(
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get all menu items for the admin's restaurant"""
-    return menu_crud.get_admin_menu_items(db, current_user)
+    if FAST_JSON_RESPONSES:
+        items = await run_crud(
+            db, menu_crud.get_admin_menu_item_rows, menu_crud.get_admin_menu_item_rows_async, current_user
+        )
+        return Response(content=MENU_ITEM_ROWS.dump_json(items), media_type="application/json")
+    return await run_crud(db, menu_crud.get_admin_menu_items, menu_crud.get_admin_menu_items_async, current_user)
+
+
+@router.get("/menu/export", dependencies=[Depends(query_budget(_BULK_QUERY_BUDGET, allow_repeats=True))])
+async def export_my_menu_items(
+    format: Literal["csv", "ndjson"] = "csv",
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Stream all menu items of the admin's restaurant as CSV or NDJSON
+    the CSV can be imported again with POST /menu/bulk?mode=upsert"""
+    restaurant_id = current_user.restaurant_id
+    if not restaurant_id:
+        raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
+
+    #the generator keeps using `db` while the response streams: the request-scoped
+    #session is only closed once the response is sent (FastAPI >= 0.121, see requirements1.txt)
+    async def content():
+        if format == "csv":
+            yield csv_header()
+        after = None
+        while True:
+            items, has_more = await run_crud(
+                db, menu_crud.get_menu_items_page, menu_crud.get_menu_items_page_async,
+                BULK_BATCH_SIZE, restaurant_id=restaurant_id, after=after
+            )
+            yield csv_rows(items) if format == "csv" else ndjson_rows(items)
+            if not has_more:
+                break
+            after = (restaurant_id, items[-1].id)
 
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="menu-{restaurant_id}.{format}"'}
+    )
 
-@router.get("/menu/{item_id}", response_model=MenuItemResponse)
-def get_my_menu_item(
+
+@router.get("/menu/{item_id}", response_model=MenuItemResponse, dependencies=[Depends(query_budget(2))])
+async def get_my_menu_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get a specific menu item (only if it belongs to admin's restaurant)"""
-    item = menu_crud.get_admin_menu_item(db, item_id, current_user)
+    item = await run_crud(db, menu_crud.get_admin_menu_item, menu_crud.get_admin_menu_item_async, item_id, current_user)
     
     if not item:
         raise HTTPException(
@@ -84,15 +172,20 @@ def get_my_menu_item(
     return item
 
 
-@router.post("/menu", response_model=MenuItemResponse, status_code=201)
-def create_my_menu_item(
+@router.post("/menu", response_model=MenuItemResponse, status_code=201, dependencies=[Depends(query_budget(5))])
+async def create_my_menu_item(
     item: MenuItemCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new menu item for the admin's restaurant"""
     #Note: restaurant_id in MenuItemCreate will be overridden with admin's restaurant_id
-    created_item = menu_crud.create_admin_menu_item(db, item, current_user)
+    try:
+        created_item = await run_crud(
+            db, menu_crud.create_admin_menu_item, menu_crud.create_admin_menu_item_async, item, current_user
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail=_DUPLICATE_NAME)
     
     if not created_item:
         raise HTTPException(status_code=400, detail="Failed to create menu item")
@@ -100,15 +193,74 @@ def create_my_menu_item(
     return created_item
 
 
-@router.patch("/menu/{item_id}", response_model=MenuItemResponse)
-def update_my_menu_item(
+@router.post("/menu/bulk", response_model=MenuImportResult, dependencies=[Depends(query_budget(_BULK_QUERY_BUDGET, allow_repeats=True))])
+async def import_my_menu_items(
+    request: Request,
+    mode: Literal["create", "upsert"] = "create",
+    atomic: bool = False,
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """Create many menu items at once from a JSON array, CSV (with a header row)
+    or NDJSON body, sent as application/json, text/csv or application/x-ndjson.
+    Rows that fail validation are reported and skipped, unless atomic=true (nothing is imported).
+    mode=upsert updates the items whose name already exists instead of rejecting them"""
+    if not current_user.restaurant_id:
+        raise HTTPException(status_code=404, detail="No restaurant associated with this admin")
+
+    rows, errors = await read_menu_import(request)
+    created = updated = 0
+    if rows and not (atomic and errors):
+        created, updated, conflicts = await run_crud(
+            db, menu_crud.import_admin_menu_items, menu_crud.import_admin_menu_items_async,
+            rows, current_user, upsert=mode == "upsert", atomic=atomic
+        )
+        errors += [
+            MenuImportRowError(row=row, errors=["name: an item with this name already exists (use mode=upsert)"])
+            for row in conflicts
+        ]
+
+    errors.sort(key=lambda e: e.row)
+    result = MenuImportResult(created=created, updated=updated, failed=len(errors), errors=errors)
+    if atomic and errors:
+        raise HTTPException(status_code=422, detail=result.model_dump())
+    return result
+
+
+@router.patch("/menu", response_model=MenuItemBatchResult, dependencies=[Depends(query_budget(_BULK_QUERY_BUDGET, allow_repeats=True))])
+async def batch_update_my_menu_items(
+    data: MenuItemBatchUpdate,
+    restaurant_id: int = Depends(get_admin_restaurant_id),
+    db: Session | AsyncSession = Depends(get_session)
+):
+    """Update many menu items in one transaction
+    `items` holds per-item changes ({id, changes}); `operations` are set-based
+    changes, e.g. {"category": "drinks", "is_available": false} or
+    {"category": "mains", "price_multiplier": 1.05}. Operations run after the item changes"""
+    try:
+        items, not_found = await run_crud(
+            db, menu_crud.batch_update_admin_menu_items, menu_crud.batch_update_admin_menu_items_async,
+            restaurant_id, data.items, data.operations
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail=_DUPLICATE_NAME)
+    return MenuItemBatchResult(items=items, not_found=not_found)
+
+
+@router.patch("/menu/{item_id}", response_model=MenuItemResponse, dependencies=[Depends(query_budget(6))])
+async def update_my_menu_item(
     item_id: int,
     data: MenuItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update a menu item (only if it belongs to admin's restaurant)"""
-    item = menu_crud.update_admin_menu_item(db, item_id, data, current_user)
+    try:
+        item = await run_crud(
+            db, menu_crud.update_admin_menu_item, menu_crud.update_admin_menu_item_async, item_id, data, current_user
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail=_DUPLICATE_NAME)
     
     if not item:
         raise HTTPException(
@@ -119,14 +271,16 @@ def update_my_menu_item(
     return item
 
 
-@router.delete("/menu/{item_id}")
-def delete_my_menu_item(
+@router.delete("/menu/{item_id}", dependencies=[Depends(query_budget(5))])
+async def delete_my_menu_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session | AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Delete a menu item (only if it belongs to admin's restaurant)"""
-    deleted = menu_crud.delete_admin_menu_item(db, item_id, current_user)
+    deleted = await run_crud(
+        db, menu_crud.delete_admin_menu_item, menu_crud.delete_admin_menu_item_async, item_id, current_user
+    )
     
     if not deleted:
         raise HTTPException(
@@ -134,4 +288,4 @@ def delete_my_menu_item(
             detail="Menu item not found or doesn't belong to your restaurant"
         )
     
-    return {"message": "Menu item deleted successfully"}
\ No newline at end of file
+    return {"message": "Menu item deleted successfully"}
@@ -1,20 +1,25 @@
 #app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_session, run_crud
 from app.models.user import User
+from app.crud import user as user_crud
 from app.schemas.auth import Token, UserResponse, UserCreate
-from app.core.security import verify_password, create_access_token, get_password_hash
-from app.core.dependencies import get_current_active_user
+from app.core.security import verify_and_update_password, create_access_token, hash_password
+from app.core.dependencies import get_current_active_user, Principal
+from app.core.rate_limit import rate_limiter, login_failures_key, LOGIN_FAILURE_RATE
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 #TEMPORARY ADMIN SIGNUP ENDPOINT
 @router.post("/signup-admin", response_model=UserResponse)
-async def signup_admin(user_data: UserCreate, restaurant_id: int=1, db: Session = Depends(get_db)):
+async def signup_admin(user_data: UserCreate, restaurant_id: int=1, db: Session | AsyncSession = Depends(get_session)):
     #check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_crud(
+        db, user_crud.get_user_by_email, user_crud.get_user_by_email_async, user_data.email
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -22,16 +27,11 @@ async def signup_admin(user_data: UserCreate, restaurant_id: int=1, db: Session
         )
     
     #create admin user
-    new_admin = User(
-        email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
-        is_admin=True,
-        is_active=True,
-        restaurant_id=restaurant_id
+    hashed_password = await hash_password(user_data.password)
+    new_admin = await run_crud(
+        db, user_crud.create_admin_user, user_crud.create_admin_user_async,
+        user_data.email, hashed_password, restaurant_id
     )
-    db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
 
     return new_admin
 
@@ -40,18 +40,36 @@ async def signup_admin(user_data: UserCreate, restaurant_id: int=1, db: Session
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: Session | AsyncSession = Depends(get_session)
 ):
+    #accounts with too many recent failed logins are refused before the bcrypt verify
+    failures_key = login_failures_key(form_data.username)
+    rate_limiter.check_failures(failures_key, LOGIN_FAILURE_RATE)
+
     #find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await run_crud(
+        db, user_crud.get_user_by_email, user_crud.get_user_by_email_async, form_data.username
+    )
 
     #check if user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
+        rate_limiter.add_failure(failures_key, LOGIN_FAILURE_RATE)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    rate_limiter.reset(failures_key)
+
+    #rehash transparently when the configured bcrypt cost has changed
+    if new_hash:
+        await run_crud(
+            db, user_crud.update_password_hash, user_crud.update_password_hash_async, user, new_hash
+        )
     
     #check if user is admin
     if not user.is_admin:
@@ -68,13 +86,25 @@ async def login(
         )
     
     #create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={
+        "sub": user.email,
+        "uid": user.id,
+        "is_admin": user.is_admin,
+        "restaurant_id": user.restaurant_id,
+        "ver": user.token_version,
+    })
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
 #gets current user
-async def get_me(current_user: User = Depends(get_current_active_user)):
-    return current_user
+async def get_me(
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session | AsyncSession = Depends(get_session)
+):
+    user = await run_crud(db, user_crud.get_user, user_crud.get_user_async, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
 @router.post("/logout")
 async def logout():
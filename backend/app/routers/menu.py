@@ -1,29 +1,210 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.schemas.menu import MenuItemResponse, MenuItemCreate, MenuItemUpdate
-from app.crud.menu import get_all_menu_items, get_menu_item
-from app.models.menuitems import MenuItem
+from app.db.database import get_db, get_session, run_crud
+from app.db.snapshots import snapshot_builder
+from app.db.translations import load_translations, load_translations_async
+from app.schemas.menu import MenuItemResponse, MenuItemPage, MenuCategory
+from app.schemas.restaurant import RestaurantWithMenuResponse
+from app.crud import menu as menu_crud
+from app.crud import restaurant as restaurant_crud
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from app.core.cache import menu_cache
+from app.core.query_tracker import query_budget
+from app.core.allergens import ALLERGEN_NAMES, parse_allergens
+from app.core.config import FAST_JSON_RESPONSES, SNAPSHOTS_ENABLED, SNAPSHOT_LANGUAGES, TRANSLATION_LANGUAGES
+from app.core.serialization import MENU_ITEM_ROWS, page_json, restaurant_with_menu_json, translated_menu_items
+from app.core.translation import parse_language
+from app.core.compression import IDENTITY, negotiate_encoding
+from app.core.snapshots import snapshot_store, read_manifest
+from app.core.conditional import (
+    make_etag, body_etag, http_date, is_not_modified, not_modified_response, json_response
+)
 
 router = APIRouter(prefix="/api/menu", tags=["menu"])
 
-# Returns all menu items
-@router.get("/", response_model=list[MenuItemResponse])
-def list_menu_items(restaurant_id: int | None = None, db: Session = Depends(get_db)):
-    if restaurant_id:
-        #filter by restaurant
-        return db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
-    return get_all_menu_items(db)
+# Returns a page of menu items, optionally filtered; `lang` translates them where available
+@router.get("/", response_model=MenuItemPage, dependencies=[Depends(query_budget(3))])
+async def list_menu_items(
+    request: Request,
+    restaurant_id: int | None = None,
+    category: MenuCategory | None = None,
+    is_available: bool | None = None,
+    min_price: float | None = Query(default=None, ge=0),
+    max_price: float | None = Query(default=None, ge=0),
+    exclude_allergens: str | None = Query(default=None, description="Comma-separated allergens to exclude"),
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    lang: str | None = None,
+    db: Session | AsyncSession = Depends(get_session)
+):
+    after = decode_cursor(cursor, 2) if cursor else None
+    lang = parse_language(lang)
+    allergens = None
+    if exclude_allergens:
+        allergens, unknown = parse_allergens(exclude_allergens)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown allergens: {', '.join(unknown)}. Known allergens: {', '.join(ALLERGEN_NAMES.values())}"
+            )
 
-# Returns a specific menu item by ID
-@router.get("/{item_id}", response_model=MenuItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
-    item = get_menu_item(db, item_id)
+    cache_key = menu_cache.make_key(
+        "menu", restaurant_id=restaurant_id, category=category.value if category else None,
+        is_available=is_available, min_price=min_price, max_price=max_price,
+        exclude_allergens=allergens or None, cursor=cursor, limit=limit, lang=lang,
+    )
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        etag, last_modified, body = cached
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return json_response(body, etag, last_modified)
+    token = menu_cache.token()
+
+    # a single restaurant's menu is validated by its menu version,
+    # so a matching If-None-Match skips loading the items entirely
+    etag = last_modified = None
+    if restaurant_id is not None:
+        version = await run_crud(
+            db, restaurant_crud.get_restaurant_version, restaurant_crud.get_restaurant_version_async, restaurant_id
+        )
+        if version is not None:
+            last_modified = http_date(version.updated_at)
+            etag = make_etag(cache_key, version.menu_version, last_modified)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+
+    if FAST_JSON_RESPONSES:
+        get_page = menu_crud.get_menu_item_rows_page, menu_crud.get_menu_item_rows_page_async
+    else:
+        get_page = menu_crud.get_menu_items_page, menu_crud.get_menu_items_page_async
+    items, has_more = await run_crud(
+        db,
+        *get_page,
+        limit=limit,
+        after=after,
+        restaurant_id=restaurant_id,
+        category=category.value if category else None,
+        is_available=is_available,
+        min_price=min_price,
+        max_price=max_price,
+        exclude_allergens=allergens or None,
+    )
+
+    next_cursor = encode_cursor(items[-1].restaurant_id, items[-1].id) if has_more else None
+    if lang:
+        translations = await load_translations_async(db, items, lang)
+        body = MenuItemPage(items=translated_menu_items(items, translations), next_cursor=next_cursor).model_dump_json().encode()
+    elif FAST_JSON_RESPONSES:
+        body = page_json(MENU_ITEM_ROWS.dump_json(items), next_cursor)
+    else:
+        body = MenuItemPage(items=items, next_cursor=next_cursor).model_dump_json().encode()
+    if etag is None:
+        etag = body_etag(body)
+    menu_cache.set(cache_key, restaurant_id, (etag, last_modified, body), token)
+
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return json_response(body, etag, last_modified)
+
+# Returns a restaurant with its full menu from the prebuilt snapshot: no database
+# work when the snapshot is current (see app/core/snapshots.py); a sync handler, as
+# serving the snapshot reads files
+@router.get("/snapshot/{restaurant_id}", response_model=RestaurantWithMenuResponse,
+            dependencies=[Depends(query_budget(2))])
+def get_menu_snapshot(
+    restaurant_id: int,
+    request: Request,
+    lang: str | None = None,
+    db: Session = Depends(get_db)
+):
+    lang = lang or SNAPSHOT_LANGUAGES[0]
+    if lang not in SNAPSHOT_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language: {lang}. Supported languages: {', '.join(SNAPSHOT_LANGUAGES)}"
+        )
+
+    manifest = read_manifest(snapshot_store, restaurant_id, lang) if SNAPSHOTS_ENABLED else None
+    if manifest is not None:
+        files = manifest["files"]
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), files)
+        last_modified = manifest["last_modified"]
+        etag = make_etag("snapshot", restaurant_id, lang, manifest["menu_version"], last_modified, encoding)
+        if is_not_modified(request, etag, last_modified):
+            response = not_modified_response(etag, last_modified)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+
+        path = snapshot_store.local_path(files[encoding])
+        if path is not None and os.path.exists(path):
+            return FileResponse(path, media_type="application/json", headers=headers)
+        body = snapshot_store.get(files[encoding])
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers=headers)
+
+    # no snapshot yet (cold start, or a write is being rebuilt): serve from the database
+    restaurant = restaurant_crud.get_restaurant_with_menu(db, restaurant_id)
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    if SNAPSHOTS_ENABLED:
+        snapshot_builder.schedule(restaurant_id)
+
+    last_modified = http_date(restaurant.updated_at)
+    etag = make_etag("snapshot", restaurant_id, lang, restaurant.menu_version, last_modified, IDENTITY)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    translations = load_translations(db, restaurant.menu_items, lang) if lang in TRANSLATION_LANGUAGES else None
+    return json_response(restaurant_with_menu_json(restaurant, translations=translations), etag, last_modified)
+
+# Returns a specific menu item by ID; `lang` translates it where available
+@router.get("/{item_id}", response_model=MenuItemResponse, dependencies=[Depends(query_budget(3))])
+async def get_item(
+    item_id: int,
+    request: Request,
+    lang: str | None = None,
+    db: Session | AsyncSession = Depends(get_session)
+):
+    lang = parse_language(lang)
+    cache_key = menu_cache.make_key("menu_item", item_id=item_id, lang=lang)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        etag, last_modified, body = cached
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return json_response(body, etag, last_modified)
+    token = menu_cache.token()
+
+    version = await run_crud(db, menu_crud.get_menu_item_version, menu_crud.get_menu_item_version_async, item_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
+    last_modified = http_date(version.updated_at)
+    etag = make_etag(cache_key, version.restaurant_id, version.menu_version, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    item = await run_crud(db, menu_crud.get_menu_item, menu_crud.get_menu_item_async, item_id)
 
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
 
-    return item
+    if lang:
+        [data] = translated_menu_items([item], await load_translations_async(db, [item], lang))
+        body = MenuItemResponse.model_validate(data).model_dump_json().encode()
+    else:
+        body = MenuItemResponse.model_validate(item).model_dump_json().encode()
+    menu_cache.set(cache_key, item.restaurant_id, (etag, last_modified, body), token)
+    return json_response(body, etag, last_modified)
 
 
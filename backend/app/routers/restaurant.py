@@ -1,41 +1,195 @@
 #backend/app/routers/restaurant.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.schemas.restaurant import RestaurantResponse, RestaurantCreate, RestaurantUpdate
-from app.crud.restaurant import (
-    get_all_restaurants, get_restaurant,
-    create_restaurant, update_restaurant, delete_restaurant
+from app.db.database import get_session, run_crud
+from app.schemas.restaurant import (
+    RestaurantResponse, RestaurantPage, RestaurantWithMenuResponse, RestaurantCreate, RestaurantUpdate
+)
+from app.crud import restaurant as restaurant_crud
+from app.db.translations import load_translations_async
+from app.core.translation import parse_language
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from app.core.cache import menu_cache, ALL_RESTAURANTS
+from app.core.menu_events import menu_events
+from app.core.config import FAST_JSON_RESPONSES
+from app.core.serialization import (
+    RESTAURANT_ROWS, page_json, parse_menu_item_fields, restaurant_with_menu_json
+)
+from app.core.conditional import (
+    make_etag, body_etag, http_date, is_not_modified, not_modified_response, json_response
 )
 
 router = APIRouter(prefix="/api/restaurants", tags=["restaurants"])
 
-#get all restaurants - for landing page
-@router.get("/", response_model=list[RestaurantResponse])
-def list_restaurants(db: Session = Depends(get_db)):
-    return get_all_restaurants(db)
+#get a page of restaurants - for landing page
+@router.get("/", response_model=RestaurantPage)
+async def list_restaurants(
+    request: Request,
+    category: str | None = None,
+    min_rating: float | None = Query(default=None, ge=0),
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session | AsyncSession = Depends(get_session)
+):
+    after = decode_cursor(cursor, 1)[0] if cursor else None
+
+    cache_key = menu_cache.make_key(
+        "restaurants", category=category, min_rating=min_rating, cursor=cursor, limit=limit
+    )
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        etag, body = cached
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        return json_response(body, etag)
+    token = menu_cache.token()
+
+    if FAST_JSON_RESPONSES:
+        get_page = restaurant_crud.get_restaurant_rows_page, restaurant_crud.get_restaurant_rows_page_async
+    else:
+        get_page = restaurant_crud.get_restaurants_page, restaurant_crud.get_restaurants_page_async
+    restaurants, has_more = await run_crud(
+        db, *get_page, limit=limit, after=after, category=category, min_rating=min_rating
+    )
+
+    next_cursor = encode_cursor(restaurants[-1].id) if has_more else None
+    if FAST_JSON_RESPONSES:
+        body = page_json(RESTAURANT_ROWS.dump_json(restaurants), next_cursor)
+    else:
+        body = RestaurantPage(items=restaurants, next_cursor=next_cursor).model_dump_json().encode()
+    etag = body_etag(body)
+    menu_cache.set(cache_key, ALL_RESTAURANTS, (etag, body), token)
+
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    return json_response(body, etag)
 
 
 #get a specific restaurant
 @router.get("/{restaurant_id}", response_model=RestaurantResponse)
-def get_restaurant_detail(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = get_restaurant(db, restaurant_id)
+async def get_restaurant_detail(
+    restaurant_id: int,
+    request: Request,
+    db: Session | AsyncSession = Depends(get_session)
+):
+    cache_key = menu_cache.make_key("restaurant", restaurant_id=restaurant_id)
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        etag, last_modified, body = cached
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return json_response(body, etag, last_modified)
+    token = menu_cache.token()
+
+    version = await run_crud(
+        db, restaurant_crud.get_restaurant_version, restaurant_crud.get_restaurant_version_async, restaurant_id
+    )
+    if not version:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    last_modified = http_date(version.updated_at)
+    etag = make_etag(cache_key, version.menu_version, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    restaurant = await run_crud(db, restaurant_crud.get_restaurant, restaurant_crud.get_restaurant_async, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
-    return restaurant
 
+    body = RestaurantResponse.model_validate(restaurant).model_dump_json().encode()
+    menu_cache.set(cache_key, restaurant_id, (etag, last_modified, body), token)
+    return json_response(body, etag, last_modified)
+
+
+#get a restaurant and its menu grouped by category in one request
+#`fields` limits the menu item fields returned, e.g. fields=name,price,category
+#`lang` returns translated menu items where available (see app/core/translation.py)
+@router.get("/{restaurant_id}/full", response_model=RestaurantWithMenuResponse)
+async def get_restaurant_full(
+    restaurant_id: int,
+    request: Request,
+    fields: str | None = None,
+    lang: str | None = None,
+    db: Session | AsyncSession = Depends(get_session)
+):
+    projection = parse_menu_item_fields(fields)
+    lang = parse_language(lang)
+    cache_key = menu_cache.make_key(
+        "restaurant_full", restaurant_id=restaurant_id,
+        fields=",".join(sorted(projection)) if projection else None, lang=lang
+    )
+    cached = menu_cache.get(cache_key)
+    if cached is not None:
+        etag, last_modified, body = cached
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return json_response(body, etag, last_modified)
+    token = menu_cache.token()
+
+    version = await run_crud(
+        db, restaurant_crud.get_restaurant_version, restaurant_crud.get_restaurant_version_async, restaurant_id
+    )
+    if not version:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    last_modified = http_date(version.updated_at)
+    etag = make_etag(cache_key, version.menu_version, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    restaurant = await run_crud(
+        db, restaurant_crud.get_restaurant_with_menu, restaurant_crud.get_restaurant_with_menu_async, restaurant_id
+    )
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    translations = await load_translations_async(db, restaurant.menu_items, lang) if lang else None
+    body = restaurant_with_menu_json(restaurant, projection, translations)
+    menu_cache.set(cache_key, restaurant_id, (etag, last_modified, body), token)
+    return json_response(body, etag, last_modified)
+
+
+
+#live changes to a restaurant's menu as server-sent events (see app/core/menu_events.py)
+#the session is closed before streaming starts, an idle stream holds no connection
+@router.get("/{restaurant_id}/menu/events", response_class=StreamingResponse)
+async def stream_menu_events(
+    restaurant_id: int,
+    last_event_id: str | None = Header(None),
+    db: Session | AsyncSession = Depends(get_session, scope="function")
+):
+    if not await run_crud(
+        db, restaurant_crud.get_restaurant_version, restaurant_crud.get_restaurant_version_async, restaurant_id
+    ):
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    subscriber, replay = menu_events.subscribe(restaurant_id, last_event_id)
+    return StreamingResponse(
+        menu_events.stream(restaurant_id, subscriber, replay),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 #create a new restaurant (admin only)
 @router.post("/", response_model=RestaurantResponse, status_code=201)
-def add_restaurant(restaurant: RestaurantCreate, db: Session = Depends(get_db)):
-    return create_restaurant(db, restaurant)
+async def add_restaurant(restaurant: RestaurantCreate, db: Session | AsyncSession = Depends(get_session)):
+    return await run_crud(db, restaurant_crud.create_restaurant, restaurant_crud.create_restaurant_async, restaurant)
 
 
 #update a restaurant (admin only)
 @router.put("/{restaurant_id}", response_model=RestaurantResponse)
-def edit_restaurant(restaurant_id: int, data: RestaurantUpdate, db: Session = Depends(get_db)):
-    restaurant = update_restaurant(db, restaurant_id, data)
+async def edit_restaurant(
+    restaurant_id: int,
+    data: RestaurantUpdate,
+    db: Session | AsyncSession = Depends(get_session)
+):
+    restaurant = await run_crud(
+        db, restaurant_crud.update_restaurant, restaurant_crud.update_restaurant_async, restaurant_id, data
+    )
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return restaurant
@@ -43,8 +197,10 @@ def edit_restaurant(restaurant_id: int, data: RestaurantUpdate, db: Session = De
 
 # Delete a restaurant (admin only - add auth later)
 @router.delete("/{restaurant_id}")
-def remove_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    deleted = delete_restaurant(db, restaurant_id)
+async def remove_restaurant(restaurant_id: int, db: Session | AsyncSession = Depends(get_session)):
+    deleted = await run_crud(
+        db, restaurant_crud.delete_restaurant, restaurant_crud.delete_restaurant_async, restaurant_id
+    )
     if not deleted:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return {"message": "Restaurant deleted successfully"}
\ No newline at end of file
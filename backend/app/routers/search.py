@@ -0,0 +1,56 @@
+import asyncio
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.database import get_session, run_crud
+from app.crud import search as search_crud
+from app.core.config import SEARCH_BACKEND
+from app.core.search import search_index, tokenize
+from app.core.query_tracker import query_budget
+from app.schemas.search import SearchHit, SearchResponse
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+# one refresh of the in-process index at a time
+_refresh_lock = asyncio.Lock()
+
+# Reloads the restaurants written since the last search (or everything, on first use)
+async def _refresh_index(db: Session | AsyncSession):
+    if search_index.is_built and _refresh_lock.locked():
+        return #another request is refreshing; answer from the current index
+    async with _refresh_lock:
+        token, restaurant_ids = search_index.pending()
+        if restaurant_ids is not None and not restaurant_ids:
+            return
+        documents = await run_crud(
+            db, search_crud.get_search_documents, search_crud.get_search_documents_async, restaurant_ids
+        )
+        await run_in_threadpool(search_index.apply, documents, restaurant_ids, token)
+
+# Searches menu items and restaurants by name, description, category and allergens
+# the last word also matches as a prefix (autocomplete) and small typos are tolerated
+@router.get("", response_model=SearchResponse, dependencies=[Depends(query_budget(2))])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Literal["menu_item", "restaurant"] | None = None,
+    restaurant_id: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session | AsyncSession = Depends(get_session)
+):
+    tokens = tokenize(q)
+    if not tokens:
+        return SearchResponse(query=q, hits=[])
+
+    if SEARCH_BACKEND == "postgres":
+        results = await run_crud(
+            db, search_crud.search_postgres, search_crud.search_postgres_async,
+            tokens, limit, type, restaurant_id
+        )
+    else:
+        await _refresh_index(db)
+        results = search_index.search(q, limit, type, restaurant_id)
+
+    hits = [SearchHit(**doc._asdict(), score=round(score, 4)) for doc, score in results]
+    return SearchResponse(query=q, hits=hits)
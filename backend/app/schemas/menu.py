@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from enum import Enum
 from datetime import datetime
+from app.core.allergens import normalize_allergens
 
 # Enum for menu categories (allowed categories)
 class MenuCategory(str, Enum):
@@ -12,7 +13,7 @@ class MenuCategory(str, Enum):
 # Schema for menu items
 class MenuItemBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
-    description: str = Field(default=None, max_length=255)
+    description: str | None = Field(default=None, max_length=255)
     price: float = Field (..., ge=0)
     category: MenuCategory
     allergens: str | None = None #optional
@@ -24,6 +25,12 @@ class MenuItemBase(BaseModel):
 class MenuItemCreate(MenuItemBase):
     restaurant_id: int | None = None
 
+    # stored in canonical form, e.g. "dairy, wheat" -> "Gluten, Dairy"
+    @field_validator("allergens")
+    @classmethod
+    def check_allergens(cls, value):
+        return normalize_allergens(value)
+
 # Schema for updating menu items (partial update)
 class MenuItemUpdate(BaseModel):
     name: str | None = Field(default=None, min_length=2, max_length=100)
@@ -35,10 +42,74 @@ class MenuItemUpdate(BaseModel):
     image_url: str | None = None
     ar_model_url: str | None = None
 
+    @field_validator("allergens")
+    @classmethod
+    def check_allergens(cls, value):
+        return normalize_allergens(value)
+
 # Schema for responding with menu items
 class MenuItemResponse(MenuItemBase):
     id: int
     restaurant_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Schema for one page of menu items (keyset pagination)
+class MenuItemPage(BaseModel):
+    items: list[MenuItemResponse]
+    next_cursor: str | None = None
+
+# Schemas for the result of a bulk menu import
+class MenuImportRowError(BaseModel):
+    row: int #1-based row number in the uploaded file (CSV header excluded)
+    errors: list[str]
+
+class MenuImportResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[MenuImportRowError] = []
+
+# Schemas for batch updates of menu items
+class MenuItemBatchChange(BaseModel):
+    id: int
+    changes: MenuItemUpdate
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.changes.model_fields_set:
+            raise ValueError("changes must set at least one field")
+        return self
+
+# Set-based change applied to every item of the restaurant matching the filters
+# e.g. {"category": "drinks", "is_available": false} or {"category": "mains", "price_multiplier": 1.05}
+class MenuItemBatchOperation(BaseModel):
+    #filters (all items of the restaurant when omitted)
+    category: MenuCategory | None = None
+    ids: list[int] | None = Field(default=None, max_length=1000)
+    #changes
+    is_available: bool | None = None
+    price_multiplier: float | None = Field(default=None, gt=0)
+    price_delta: float | None = None #applied after the multiplier; prices never go below 0
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if self.is_available is None and self.price_multiplier is None and self.price_delta is None:
+            raise ValueError("operation must set is_available, price_multiplier or price_delta")
+        return self
+
+class MenuItemBatchUpdate(BaseModel):
+    items: list[MenuItemBatchChange] = Field(default=[], max_length=1000)
+    operations: list[MenuItemBatchOperation] = Field(default=[], max_length=20)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [entry.id for entry in self.items]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each item id may appear only once")
+        return self
+
+class MenuItemBatchResult(BaseModel):
+    items: list[MenuItemResponse] #updated items, in their final state
+    not_found: list[int] = [] #requested ids that are not items of the restaurant
\ No newline at end of file
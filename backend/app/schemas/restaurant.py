@@ -1,6 +1,7 @@
 #backend/app/schemas/restaurant.py
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
+from app.schemas.menu import MenuCategory, MenuItemResponse
 
 # Schema for restaurants
 class RestaurantBase(BaseModel):
@@ -23,4 +24,14 @@ class RestaurantResponse(RestaurantBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Schema for one page of restaurants (keyset pagination)
+class RestaurantPage(BaseModel):
+    items: list[RestaurantResponse]
+    next_cursor: str | None = None
+
+# Schema for a restaurant together with its menu grouped by category
+# (documents the full response; `fields=` may project the menu items)
+class RestaurantWithMenuResponse(RestaurantResponse):
+    menu: dict[MenuCategory, list[MenuItemResponse]]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing import Literal
+from pydantic import BaseModel
+
+# Schema for one search result (a menu item or a restaurant)
+class SearchHit(BaseModel):
+    type: Literal["menu_item", "restaurant"]
+    id: int
+    name: str
+    restaurant_id: int
+    restaurant_name: str | None = None
+    category: str | None = None
+    price: float | None = None #menu items only
+    is_available: bool | None = None #menu items only
+    score: float
+
+# Schema for search results, best first
+class SearchResponse(BaseModel):
+    query: str
+    hits: list[SearchHit]
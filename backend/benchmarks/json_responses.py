@@ -0,0 +1,129 @@
+#backend/benchmarks/json_responses.py
+"""Throughput of the list endpoints with and without FAST_JSON_RESPONSES.
+
+Seeds a scratch database (never point this at a real one) with restaurants of
+10, 100 and 1000 menu items, then runs the app in a subprocess per mode with
+the menu cache disabled and reports requests per second (in-process client,
+so the numbers measure the handler and serialization, not the network).
+
+    cd backend
+    python -m benchmarks.json_responses --url sqlite:///./bench.db
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from sqlalchemy import create_engine, insert
+from app.db.migrations import upgrade_to_head
+from app.models.restaurant import Restaurant
+from app.models.menuitems import MenuItem
+from app.schemas.menu import MenuCategory
+
+MENU_SIZES = (10, 100, 1000)
+MODES = {"default": "false", "fast": "true"}
+PASSWORD = "benchmark-password"
+
+
+def seed(engine) -> None:
+    rng = random.Random(17)
+    categories = [c.value for c in MenuCategory]
+    with engine.begin() as conn:
+        conn.execute(insert(Restaurant), [
+            {"name": f"Restaurant {size}", "category": "Bench", "rating": 4.0, "menu_version": 0}
+            for size in MENU_SIZES
+        ])
+        for restaurant_id, size in enumerate(MENU_SIZES, start=1):
+            conn.execute(insert(MenuItem), [
+                {
+                    "restaurant_id": restaurant_id,
+                    "name": f"Item {i}",
+                    "description": "benchmark item with a description of typical length",
+                    "price": round(rng.uniform(3, 40), 2),
+                    "category": rng.choice(categories),
+                    "is_available": True,
+                    "allergens": "Gluten, Dairy",
+                    "image_url": f"https://example.com/images/{i}.jpg",
+                }
+                for i in range(size)
+            ])
+
+
+def _requests_per_second(client, path: str, headers: dict, seconds: float) -> float:
+    client.get(path, headers=headers)  # warm up
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def worker(seconds: float) -> None:
+    # imported here: the app reads FAST_JSON_RESPONSES when it is imported
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    results = {}
+    for restaurant_id, size in enumerate(MENU_SIZES, start=1):
+        email = f"bench{restaurant_id}@example.com"
+        client.post(f"/api/auth/signup-admin?restaurant_id={restaurant_id}", json={"email": email, "password": PASSWORD})
+        token = client.post("/api/auth/login", data={"username": email, "password": PASSWORD}).json()["access_token"]
+        admin = {"Authorization": f"Bearer {token}"}
+
+        results[size] = {
+            "admin menu (all items)": _requests_per_second(client, "/api/admin/menu", admin, seconds),
+            f"menu page (limit {min(size, 200)})": _requests_per_second(
+                client, f"/api/menu/?restaurant_id={restaurant_id}&limit={min(size, 200)}", {}, seconds
+            ),
+        }
+    print(json.dumps(results))
+
+
+def run_mode(url: str, flag: str, seconds: float) -> dict:
+    env = dict(
+        os.environ, DATABASE_URL=url, FAST_JSON_RESPONSES=flag, MENU_CACHE_ENABLED="false",
+        SNAPSHOTS_ENABLED="false", RUN_MIGRATIONS_ON_STARTUP="false", QUERY_TRACKING_ENABLED="false",
+        SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"), BCRYPT_ROUNDS="4", RATE_LIMIT_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.json_responses", "--worker", "--seconds", str(seconds)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="scratch database URL (its tables are created here)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each measurement")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.seconds)
+        return
+    if not args.url:
+        parser.error("--url is required")
+
+    engine = create_engine(args.url)
+    upgrade_to_head(engine)
+    seed(engine)
+    engine.dispose()
+
+    results = {mode: run_mode(args.url, flag, args.seconds) for mode, flag in MODES.items()}
+
+    print(f"{'items':>6}  {'endpoint':28} {'default req/s':>14} {'fast req/s':>12} {'speedup':>8}")
+    for size in MENU_SIZES:
+        key = str(size)
+        for endpoint, default in results["default"][key].items():
+            fast = results["fast"][key][endpoint]
+            print(f"{size:>6}  {endpoint:28} {default:14.0f} {fast:12.0f} {fast / default:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
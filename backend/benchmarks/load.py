@@ -0,0 +1,482 @@
+#backend/benchmarks/load.py
+"""Load test of the Gusto API: latency percentiles, throughput and SQL queries
+per request for scripted workloads, written to a JSON report that later runs
+can be compared against.
+
+Seeds an empty scratch database (never point this at a real one) with synthetic
+restaurants, menus and admins (app/db/synthetic.py), then runs each workload
+for --duration seconds with --concurrency virtual users against
+
+  inprocess  the ASGI app called directly (httpx ASGITransport, no network)
+  uvicorn    a local uvicorn server (--uvicorn-workers processes)
+
+Workloads:
+
+  browse       anonymous menu browsing: restaurant list and detail, filtered menu
+               pages, menu items, full menus and menu snapshots
+  login_burst  admin logins (bcrypt at --bcrypt-rounds)
+  edit_storm   logged-in admins editing prices and adding/removing items, each
+               followed by a menu read
+
+Query counts come from the app's /metrics endpoint (with several uvicorn workers
+they cover the worker that answered the scrape only). Workloads run one after the
+other on the same data: edit storms change prices, so compare runs with the same
+arguments. Settings under test are passed through the environment, e.g.
+
+    cd backend
+    pip install -r requirements-dev.txt   # httpx
+    python -m benchmarks.load --url sqlite:///./bench.db --report baseline.json
+    FAST_JSON_RESPONSES=true python -m benchmarks.load --url sqlite:///./bench2.db \\
+        --report fast.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+import httpx
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, func, select
+from app.core.config import BCRYPT_ROUNDS
+from app.db.migrations import upgrade_to_head
+from app.db.synthetic import ADMIN_EMAIL, ALLERGENS, DEFAULT_CATEGORY_WEIGHTS, parse_category_weights, seed_synthetic
+from app.models.restaurant import Restaurant
+from app.models.menuitems import MenuItem
+
+TARGETS = ("inprocess", "uvicorn")
+PASSWORD = "benchmark-password"
+# menu item ids per restaurant handed to the workloads
+ITEM_SAMPLE = 20
+
+_QUERY_METRIC = re.compile(r'^gusto_db_queries_per_request_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+
+# ---- measurement ----
+
+def _latency_ms(values: list[float]) -> dict:
+    values = sorted(value * 1000 for value in values)
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        quantiles = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    return {
+        "p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3),
+        "mean": round(statistics.fmean(values), 3), "max": round(values[-1], 3),
+    }
+
+
+class Recorder:
+    """Latencies and errors of one workload, by route ("METHOD /route/{template}")."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.statuses: dict[str, int] = {}
+
+    async def request(self, client, method: str, route: str, url: str | None = None, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url or route, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            response, status = None, "connection error"
+        label = f"{method} {route}"
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if response is None or response.status_code not in expected:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return None
+        return response
+
+    def summary(self, duration: float, queries: dict) -> dict:
+        everything = [value for values in self.latencies.values() for value in values]
+        if not everything:
+            return {"requests": 0, "errors": 0, "duration_seconds": round(duration, 3)}
+        return {
+            "requests": len(everything),
+            "errors": sum(self.errors.values()),
+            "statuses": dict(sorted(self.statuses.items())),
+            "duration_seconds": round(duration, 3),
+            "throughput_rps": round(len(everything) / duration, 2),
+            "latency_ms": _latency_ms(everything),
+            "routes": {
+                label: {
+                    "requests": len(values),
+                    "errors": self.errors.get(label, 0),
+                    "latency_ms": _latency_ms(values),
+                    "queries_per_request": queries.get(label),
+                }
+                for label, values in sorted(self.latencies.items())
+            },
+        }
+
+
+async def _query_counters(client) -> dict:
+    response = await client.get("/metrics")
+    if response.status_code != 200:
+        return {}  # METRICS_ENABLED=false
+    counters = {}
+    for line in response.text.splitlines():
+        match = _QUERY_METRIC.match(line)
+        if match:
+            kind, method, route, value = match.groups()
+            counters.setdefault(f"{method} {route}", {})[kind] = float(value)
+    return counters
+
+
+def _queries_per_request(before: dict, after: dict) -> dict:
+    result = {}
+    for label, counts in after.items():
+        previous = before.get(label, {})
+        requests = counts.get("count", 0) - previous.get("count", 0)
+        if requests:
+            result[label] = round((counts.get("sum", 0) - previous.get("sum", 0)) / requests, 2)
+    return result
+
+
+# ---- workloads ----
+# one iteration of a virtual user; `session` is what the workload's setup returned
+
+async def browse(client, recorder: Recorder, rng: random.Random, context: dict, session) -> None:
+    restaurant_id = rng.choice(context["restaurant_ids"])
+    item_id = rng.choice(context["items"][str(restaurant_id)])
+    await recorder.request(client, "GET", "/api/restaurants/", params={"limit": 20})
+    await recorder.request(client, "GET", "/api/restaurants/{restaurant_id}", f"/api/restaurants/{restaurant_id}")
+    await recorder.request(client, "GET", "/api/menu/", params={
+        "restaurant_id": restaurant_id, "category": rng.choice(context["categories"]),
+    })
+    await recorder.request(client, "GET", "/api/menu/", params={
+        "restaurant_id": restaurant_id, "exclude_allergens": rng.choice(ALLERGENS),
+    })
+    await recorder.request(client, "GET", "/api/menu/{item_id}", f"/api/menu/{item_id}")
+    await recorder.request(
+        client, "GET", "/api/restaurants/{restaurant_id}/full", f"/api/restaurants/{restaurant_id}/full"
+    )
+    await recorder.request(
+        client, "GET", "/api/menu/snapshot/{restaurant_id}", f"/api/menu/snapshot/{restaurant_id}"
+    )
+
+
+async def login_burst(client, recorder: Recorder, rng: random.Random, context: dict, session) -> None:
+    email, _ = rng.choice(context["admins"])
+    await recorder.request(client, "POST", "/api/auth/login", data={"username": email, "password": PASSWORD})
+
+
+async def _admin_session(client, rng: random.Random, context: dict) -> dict:
+    email, restaurant_id = rng.choice(context["admins"])
+    response = await client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {
+        "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+        "restaurant_id": restaurant_id,
+    }
+
+
+async def edit_storm(client, recorder: Recorder, rng: random.Random, context: dict, session: dict) -> None:
+    restaurant_id, headers = session["restaurant_id"], session["headers"]
+    item_id = rng.choice(context["items"][str(restaurant_id)])
+    await recorder.request(
+        client, "PATCH", "/api/admin/menu/{item_id}", f"/api/admin/menu/{item_id}",
+        headers=headers, json={"price": round(rng.uniform(3, 40), 2)},
+    )
+    if rng.random() < 0.2:
+        created = await recorder.request(
+            client, "POST", "/api/admin/menu", expected=(201,), headers=headers,
+            json={"name": f"Storm {uuid.uuid4().hex[:12]}", "price": 9.5, "category": "sides"},
+        )
+        if created is not None:
+            await recorder.request(
+                client, "DELETE", "/api/admin/menu/{item_id}", f"/api/admin/menu/{created.json()['id']}",
+                headers=headers,
+            )
+    await recorder.request(client, "GET", "/api/menu/", params={"restaurant_id": restaurant_id})
+
+
+# name: (iteration, per-user setup)
+WORKLOADS = {
+    "browse": (browse, None),
+    "login_burst": (login_burst, None),
+    "edit_storm": (edit_storm, _admin_session),
+}
+
+
+async def run_workload(client, name: str, context: dict, concurrency: int, duration: float, seed: int) -> dict:
+    iteration, setup = WORKLOADS[name]
+    recorder = Recorder()
+    before = await _query_counters(client)
+
+    async def user(index: int) -> None:
+        rng = random.Random(f"{seed}:{name}:{index}")
+        session = await setup(client, rng, context) if setup else None
+        while time.perf_counter() < deadline:
+            await iteration(client, recorder, rng, context, session)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return recorder.summary(elapsed, _queries_per_request(before, await _query_counters(client)))
+
+
+async def run_workloads(client, context: dict, options: dict) -> dict:
+    results = {}
+    for name in options["workloads"]:
+        results[name] = await run_workload(
+            client, name, context, options["concurrency"], options["duration"], options["seed"]
+        )
+        print(f"  {name}: {_one_line(results[name])}", file=sys.stderr)
+    return results
+
+
+def _one_line(result: dict) -> str:
+    if not result["requests"]:
+        return "no requests"
+    latency = result["latency_ms"]
+    return (f"{result['requests']} requests, {result['errors']} errors, {result['throughput_rps']:.0f} req/s, "
+            f"p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms")
+
+
+# ---- targets ----
+
+def worker(context_path: str) -> None:
+    # runs in a subprocess: the app reads its settings when it is imported
+    from app.main import app
+
+    with open(context_path) as f:
+        context = json.load(f)
+
+    async def main() -> dict:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await run_workloads(client, context, context["options"])
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def _app_env(args, snapshot_dir: str) -> dict:
+    return dict(
+        os.environ, DATABASE_URL=args.url, RUN_MIGRATIONS_ON_STARTUP="false", METRICS_ENABLED="true",
+        SNAPSHOT_DIR=snapshot_dir, BCRYPT_ROUNDS=str(args.bcrypt_rounds),
+        SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"),
+        # every virtual user has the same IP; set RATE_LIMIT_ENABLED=true to measure the limiter
+        RATE_LIMIT_ENABLED=os.environ.get("RATE_LIMIT_ENABLED", "false"),
+    )
+
+
+def run_inprocess(args, env: dict, context_path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.load", "--worker", context_path],
+        env=env, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                if time.perf_counter() > deadline:
+                    raise
+            await asyncio.sleep(0.2)
+
+
+def run_uvicorn(args, env: dict, context: dict) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.uvicorn_workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+
+    async def main() -> dict:
+        await _wait_until_up(base_url, server)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            return await run_workloads(client, context, context["options"])
+
+    try:
+        return asyncio.run(main())
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# ---- data and report ----
+
+def prepare(args) -> dict:
+    engine = create_engine(args.url)
+    upgrade_to_head(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Restaurant)).scalar():
+            sys.exit(f"{args.url} already has restaurants: use an empty scratch database")
+
+    start = time.perf_counter()
+    hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.bcrypt_rounds).hash(PASSWORD)
+    restaurant_ids = seed_synthetic(
+        engine, args.restaurants, args.items,
+        category_weights=args.category_weights, allergen_rate=args.allergen_rate,
+        max_allergens=args.max_allergens, admins_per_restaurant=1, hashed_password=hashed_password,
+        seed=args.seed,
+    )
+    items = {}
+    with engine.connect() as conn:
+        for restaurant_id, item_id in conn.execute(
+            select(MenuItem.restaurant_id, MenuItem.id).order_by(MenuItem.restaurant_id, MenuItem.id)
+        ):
+            ids = items.setdefault(str(restaurant_id), [])
+            if len(ids) < ITEM_SAMPLE:
+                ids.append(item_id)
+    engine.dispose()
+    print(f"seeded {args.restaurants} restaurants x {args.items} items in {time.perf_counter() - start:.1f} s",
+          file=sys.stderr)
+
+    return {
+        "restaurant_ids": restaurant_ids,
+        "items": items,
+        "admins": [
+            (ADMIN_EMAIL.format(restaurant_id=restaurant_id, index=0), restaurant_id)
+            for restaurant_id in restaurant_ids
+        ],
+        "categories": [name for name, weight in args.category_weights.items() if weight > 0],
+        "options": {
+            "workloads": args.workloads, "concurrency": args.concurrency,
+            "duration": args.duration, "seed": args.seed,
+        },
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# settings that change what is measured, recorded with the report
+_RECORDED_SETTINGS = (
+    "USE_ASYNC_DB", "FAST_JSON_RESPONSES", "COMPRESSION_ENABLED", "MENU_CACHE_ENABLED", "SNAPSHOTS_ENABLED",
+    "SEARCH_BACKEND", "TRANSLATION_LANGUAGES", "JOB_WORKERS", "DB_POOL_SIZE", "RATE_LIMIT_ENABLED",
+)
+
+
+def compare(baseline: dict, report: dict, threshold: float) -> bool:
+    regressed = False
+    print(f"\n{'target':10} {'workload':12} {'metric':9} {'baseline':>10} {'current':>10} {'change':>8}")
+    for target, workloads in report["results"].items():
+        for name, result in workloads.items():
+            previous = baseline.get("results", {}).get(target, {}).get(name)
+            if not previous or not previous.get("requests") or not result.get("requests"):
+                continue
+            rows = [("rps", previous["throughput_rps"], result["throughput_rps"], True)]
+            rows += [
+                (percentile, previous["latency_ms"][percentile], result["latency_ms"][percentile], False)
+                for percentile in ("p50", "p95", "p99")
+            ]
+            for metric, old, new, higher_is_better in rows:
+                change = (new - old) / old if old else 0.0
+                worse = -change if higher_is_better else change
+                # p99 of short runs is noisy: only throughput and p95 gate the comparison
+                flag = ""
+                if worse > threshold and metric in ("rps", "p95"):
+                    flag, regressed = "  REGRESSION", True
+                print(f"{target:10} {name:12} {metric:9} {old:10.1f} {new:10.1f} {change:+8.1%}{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="empty scratch database URL (its tables are created here)")
+    parser.add_argument("--restaurants", type=int, default=100)
+    parser.add_argument("--items", type=int, default=50, help="menu items per restaurant")
+    parser.add_argument("--category-weights", type=parse_category_weights, default=DEFAULT_CATEGORY_WEIGHTS,
+                        help="e.g. mains=4,sides=2,desserts=1,drinks=2")
+    parser.add_argument("--allergen-rate", type=float, default=0.6, help="share of items with allergens")
+    parser.add_argument("--max-allergens", type=int, default=3, help="allergens per item, at most")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users per workload")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per workload")
+    parser.add_argument("--uvicorn-workers", type=int, default=1)
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--seed", type=int, default=21)
+    parser.add_argument("--report", default="load-report.json", help="where to write the JSON report")
+    parser.add_argument("--compare", help="baseline report; exits with 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative throughput or p95 change counted as a regression")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+        return
+    if not args.url:
+        parser.error("--url is required")
+
+    context = prepare(args)
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        env = _app_env(args, os.path.join(scratch, "snapshots"))
+        context_path = os.path.join(scratch, "context.json")
+        with open(context_path, "w") as f:
+            json.dump(context, f)
+        for target in args.targets:
+            print(f"{target}:", file=sys.stderr)
+            if target == "inprocess":
+                results[target] = run_inprocess(args, env, context_path)
+            else:
+                results[target] = run_uvicorn(args, env, context)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "database": create_engine(args.url).dialect.name,
+        "parameters": {
+            "restaurants": args.restaurants, "items_per_restaurant": args.items,
+            "category_weights": args.category_weights, "allergen_rate": args.allergen_rate,
+            "max_allergens": args.max_allergens, "concurrency": args.concurrency, "duration": args.duration,
+            "uvicorn_workers": args.uvicorn_workers, "bcrypt_rounds": args.bcrypt_rounds, "seed": args.seed,
+        },
+        "settings": {name: os.environ[name] for name in _RECORDED_SETTINGS if name in os.environ},
+        "results": results,
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {args.report}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
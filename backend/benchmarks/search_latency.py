@@ -0,0 +1,109 @@
+#backend/benchmarks/search_latency.py
+"""Latency of the in-process search index (SEARCH_BACKEND=memory).
+
+Builds the index from synthetic menus (no database needed) and reports
+percentiles over a mix of exact, multi-word, prefix and misspelled queries.
+
+    cd backend
+    python -m benchmarks.search_latency --items 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from app.core.search import InMemorySearchIndex
+
+DISHES = (
+    "chicken beef lamb pork tofu paneer prawn salmon tuna duck mushroom veggie falafel halloumi "
+    "biryani curry tikka masala korma vindaloo burger pizza pasta risotto ramen udon pho laksa "
+    "taco burrito quesadilla nachos sushi sashimi tempura gyoza dumplings noodles rice salad soup "
+    "wrap sandwich kebab shawarma souvlaki gyros lasagne gnocchi ravioli carbonara bolognese"
+).split()
+STYLES = (
+    "spicy crispy grilled smoked roasted fried steamed braised garlic lemon honey chilli "
+    "teriyaki tandoori butter creamy classic house signature mini loaded double"
+).split()
+EXTRAS = (
+    "fresh herbs served with seasonal greens homemade sauce slow cooked tender charred "
+    "toasted sesame coriander mint yogurt cheese tomato onion pepper basil ginger"
+).split()
+ALLERGENS = ("Gluten", "Dairy", "Nuts", "Eggs", "Soy", "Shellfish", "Fish", "Sesame")
+CATEGORIES = ("mains", "sides", "dessert", "drinks")
+CUISINES = ("Indian", "Italian", "Japanese", "Mexican", "Chinese", "Greek", "Thai", "American")
+
+
+def synthetic_documents(restaurants: int, items: int, seed: int = 14):
+    rng = random.Random(seed)
+    restaurant_rows = [
+        SimpleNamespace(id=i, name=f"{rng.choice(STYLES).title()} {rng.choice(DISHES).title()} House {i}",
+                        category=rng.choice(CUISINES))
+        for i in range(1, restaurants + 1)
+    ]
+    item_rows = [
+        SimpleNamespace(
+            id=i, restaurant_id=rng.randint(1, restaurants),
+            name=f"{rng.choice(STYLES).title()} {rng.choice(DISHES).title()} {rng.choice(DISHES).title()}",
+            description=" ".join(rng.sample(EXTRAS, 6)),
+            category=rng.choice(CATEGORIES),
+            allergens=", ".join(rng.sample(ALLERGENS, rng.randint(0, 3))),
+            price=round(rng.uniform(3, 40), 2), is_available=rng.random() > 0.1,
+        )
+        for i in range(1, items + 1)
+    ]
+    return restaurant_rows, item_rows
+
+
+def _misspell(rng, word: str) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def queries(count: int, seed: int = 41) -> list[str]:
+    rng = random.Random(seed)
+    long_words = [w for w in DISHES + STYLES if len(w) >= 5]
+    makers = (
+        lambda: rng.choice(DISHES),
+        lambda: f"{rng.choice(STYLES)} {rng.choice(DISHES)}",
+        lambda: rng.choice(DISHES)[:rng.randint(2, 4)],
+        lambda: f"{rng.choice(DISHES)} {rng.choice(DISHES)[:3]}",
+        lambda: _misspell(rng, rng.choice(long_words)),
+        lambda: rng.choice(ALLERGENS).lower(),
+    )
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.restaurants, args.items)
+    index = InMemorySearchIndex(max_age_seconds=float("inf"))
+    start = time.perf_counter()
+    index.apply(documents, None, index.pending()[0])
+    print(f"built index of {args.items} items / {args.restaurants} restaurants in {time.perf_counter() - start:.2f} s")
+
+    # incremental refresh of one restaurant, as after an admin write
+    restaurant_id = 1
+    rows = ([r for r in documents[0] if r.id == restaurant_id], [i for i in documents[1] if i.restaurant_id == restaurant_id])
+    start = time.perf_counter()
+    index.apply(rows, {restaurant_id}, index.pending()[0])
+    print(f"reindexed one restaurant ({len(rows[1])} items) in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    samples = []
+    for query in queries(args.queries):
+        start = time.perf_counter()
+        index.search(query, args.limit)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    percentiles = statistics.quantiles(samples, n=100)
+    print(f"{len(samples)} queries: p50 {percentiles[49]:.2f} ms, p95 {percentiles[94]:.2f} ms, "
+          f"p99 {percentiles[98]:.2f} ms, max {max(samples):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
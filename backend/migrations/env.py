@@ -0,0 +1,70 @@
+#backend/migrations/env.py
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.core.config import DATABASE_URL
+from app.db.base import Base
+import app.models  # noqa: F401 (registers the models on Base.metadata)
+
+config = context.config
+
+# only configure logging when run from the alembic CLI, not from the app
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # indexes declared with .ddl_if(dialect=...) (e.g. the Postgres trigram
+    # indexes) only exist on that dialect; don't autogenerate them elsewhere
+    ddl_if = getattr(object, "_ddl_if", None)
+    if type_ == "index" and not reflected and ddl_if is not None and ddl_if.dialect:
+        dialect = context.get_context().dialect.name
+        allowed = ddl_if.dialect if isinstance(ddl_if.dialect, (list, tuple, set)) else (ddl_if.dialect,)
+        return dialect in allowed
+    return True
+
+
+def run_migrations_offline() -> None:
+    # emits SQL to stdout (alembic upgrade head --sql)
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # a connection can be handed in by app.db.migrations
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # sqlite cannot ALTER most things in place
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
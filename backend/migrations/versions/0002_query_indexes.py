@@ -0,0 +1,50 @@
+"""indexes for the menu and auth query shapes
+
+- menuitems (restaurant_id, id): keyset pagination of a restaurant's menu and
+  admin lookups by id + restaurant_id
+- menuitems (restaurant_id, category, is_available): filtered menu listings
+- users.restaurant_id: admins of a restaurant (FK, not indexed by Postgres)
+- trigram GIN indexes on menu item and restaurant names (Postgres only) for
+  ILIKE '%...%' and similarity search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_menuitems_restaurant_id_id", "menuitems", ["restaurant_id", "id"])
+    op.create_index(
+        "ix_menuitems_restaurant_category_available", "menuitems",
+        ["restaurant_id", "category", "is_available"]
+    )
+    op.create_index("ix_users_restaurant_id", "users", ["restaurant_id"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_menuitems_name_trgm", "menuitems", ["name"],
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        )
+        op.create_index(
+            "ix_restaurants_name_trgm", "restaurants", ["name"],
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_restaurants_name_trgm", table_name="restaurants")
+        op.drop_index("ix_menuitems_name_trgm", table_name="menuitems")
+
+    op.drop_index("ix_users_restaurant_id", table_name="users")
+    op.drop_index("ix_menuitems_restaurant_category_available", table_name="menuitems")
+    op.drop_index("ix_menuitems_restaurant_id_id", table_name="menuitems")
@@ -0,0 +1,37 @@
+"""unique menu item names per restaurant
+
+Bulk imports match items by (restaurant_id, name). Existing duplicates are
+renamed to "<name> (<id>)" (all but the oldest) before the index is created.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE menuitems SET name = name || ' (' || CAST(id AS VARCHAR(20)) || ')'
+        WHERE EXISTS (
+            SELECT 1 FROM menuitems AS older
+            WHERE older.restaurant_id = menuitems.restaurant_id
+              AND older.name = menuitems.name
+              AND older.id < menuitems.id
+        )
+        """
+    )
+    op.create_index(
+        "uq_menuitems_restaurant_id_name", "menuitems", ["restaurant_id", "name"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_menuitems_restaurant_id_name", table_name="menuitems")
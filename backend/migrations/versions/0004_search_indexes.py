@@ -0,0 +1,38 @@
+"""full-text search indexes (Postgres only)
+
+GIN indexes over the documents searched by SEARCH_BACKEND=postgres. The
+expressions must stay identical to app.db.base.search_vector for the
+planner to use them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "CREATE INDEX ix_menuitems_search ON menuitems USING gin (to_tsvector('simple', "
+        "coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || "
+        "coalesce(category, '') || ' ' || coalesce(allergens, '')))"
+    )
+    op.execute(
+        "CREATE INDEX ix_restaurants_search ON restaurants USING gin (to_tsvector('simple', "
+        "coalesce(name, '') || ' ' || coalesce(category, '')))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_restaurants_search", table_name="restaurants")
+    op.drop_index("ix_menuitems_search", table_name="menuitems")
@@ -0,0 +1,60 @@
+"""allergen bitmask on menu items
+
+Adds menuitems.allergen_mask (bits of app.core.allergens.Allergen) and fills it
+by parsing the free-form allergens text. Fully recognized texts are rewritten
+in canonical form ("dairy, wheat" -> "Gluten, Dairy", "None" -> NULL); texts
+with unrecognized names are kept as they are.
+The keyset pagination index gains allergen_mask as a trailing column.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+from app.core.allergens import parse_allergens, format_allergens
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+menuitems = sa.table(
+    "menuitems",
+    sa.column("id", sa.Integer),
+    sa.column("allergens", sa.String),
+    sa.column("allergen_mask", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column("menuitems", sa.Column("allergen_mask", sa.Integer(), nullable=False, server_default="0"))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(menuitems.c.id, menuitems.c.allergens).where(menuitems.c.allergens.is_not(None))
+    ).all()
+    updates = []
+    for item_id, text in rows:
+        mask, unknown = parse_allergens(text)
+        updates.append({"item_id": item_id, "mask": mask, "text": text if unknown else format_allergens(mask)})
+    if updates:
+        bind.execute(
+            sa.update(menuitems)
+            .where(menuitems.c.id == sa.bindparam("item_id"))
+            .values(allergen_mask=sa.bindparam("mask"), allergens=sa.bindparam("text")),
+            updates,
+        )
+
+    op.drop_index("ix_menuitems_restaurant_id_id", table_name="menuitems")
+    op.create_index(
+        "ix_menuitems_restaurant_id_id_allergens", "menuitems", ["restaurant_id", "id", "allergen_mask"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_menuitems_restaurant_id_id_allergens", table_name="menuitems")
+    op.create_index("ix_menuitems_restaurant_id_id", "menuitems", ["restaurant_id", "id"])
+    with op.batch_alter_table("menuitems") as batch_op:
+        batch_op.drop_column("allergen_mask")
@@ -0,0 +1,45 @@
+"""menu item translations
+
+Machine translations of menu item names and descriptions, keyed by a hash of
+their source text (see app/core/translation.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "menu_item_translations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("menu_item_id", sa.Integer(), nullable=False),
+        sa.Column("lang", sa.String(length=16), nullable=False),
+        sa.Column("field", sa.String(length=32), nullable=False),
+        sa.Column("source_hash", sa.String(length=64), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["menu_item_id"], ["menuitems.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_menu_item_translations_item_lang_field", "menu_item_translations",
+        ["menu_item_id", "lang", "field"], unique=True
+    )
+    op.create_index(
+        "ix_menu_item_translations_lang_source_hash", "menu_item_translations", ["lang", "source_hash"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_menu_item_translations_lang_source_hash", table_name="menu_item_translations")
+    op.drop_index("uq_menu_item_translations_item_lang_field", table_name="menu_item_translations")
+    op.drop_table("menu_item_translations")
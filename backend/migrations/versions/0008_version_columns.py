@@ -0,0 +1,57 @@
+"""version columns
+
+Adds restaurants.updated_at and restaurants.menu_version (ETags, see
+app/core/conditional.py), menuitems.updated_at and users.token_version (token
+revocation, see app/core/dependencies.py).
+Databases upgraded while revision 0001 still created these columns already have
+them; they are left as they are.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "restaurants": [
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("menu_version", sa.Integer(), server_default="0", nullable=False),
+    ],
+    "users": [
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    ],
+    "menuitems": [
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    ],
+}
+
+
+def _recreate() -> str:
+    # SQLite cannot add a column whose default is not a constant (now()) in place
+    return "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing = [column for column in columns if column.name not in existing]
+        if not missing:
+            continue
+        with op.batch_alter_table(table, recreate=_recreate()) as batch_op:
+            for column in missing:
+                batch_op.add_column(column)
+
+
+def downgrade() -> None:
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.drop_column(column.name)
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# The app reads its settings when imported: point it at a scratch SQLite database
+# before any test module imports it
+_scratch = tempfile.mkdtemp(prefix="gusto-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_scratch, 'test.db')}",
+    SECRET_KEY="test",
+    SNAPSHOT_DIR=os.path.join(_scratch, "snapshots"),
+    BCRYPT_ROUNDS="4",
+    RATE_LIMIT_ENABLED="false",
+    TRANSLATION_LANGUAGES="",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+_admins = iter(range(1, 1_000_000))
+
+
+# a new restaurant with an admin; returns (restaurant id, auth headers)
+@pytest.fixture
+def admin(client):
+    restaurant = client.post("/api/restaurants/", json={"name": "Test Kitchen", "category": "Test", "rating": 4.0})
+    restaurant_id = restaurant.json()["id"]
+    email = f"admin{next(_admins)}@example.com"
+    client.post(f"/api/auth/signup-admin?restaurant_id={restaurant_id}", json={"email": email, "password": "secret"})
+    token = client.post("/api/auth/login", data={"username": email, "password": "secret"}).json()["access_token"]
+    return restaurant_id, {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,51 @@
+ITEM = {"name": "Margherita", "price": 9.5, "category": "mains"}
+
+
+def test_create_item_with_duplicate_name_conflicts(client, admin):
+    _, headers = admin
+    assert client.post("/api/admin/menu", headers=headers, json=ITEM).status_code == 201
+
+    response = client.post("/api/admin/menu", headers=headers, json=ITEM)
+    assert response.status_code == 409
+    # the session is usable again afterwards
+    assert client.post("/api/admin/menu", headers=headers, json={**ITEM, "name": "Marinara"}).status_code == 201
+
+
+def test_rename_item_to_existing_name_conflicts(client, admin):
+    _, headers = admin
+    client.post("/api/admin/menu", headers=headers, json=ITEM)
+    other = client.post("/api/admin/menu", headers=headers, json={**ITEM, "name": "Diavola"}).json()
+
+    response = client.patch(f"/api/admin/menu/{other['id']}", headers=headers, json={"name": ITEM["name"]})
+    assert response.status_code == 409
+    assert client.get(f"/api/admin/menu/{other['id']}", headers=headers).json()["name"] == "Diavola"
+
+
+def test_same_name_in_another_restaurant_is_allowed(client, admin):
+    _, headers = admin
+    assert client.post("/api/admin/menu", headers=headers, json=ITEM).status_code == 201
+
+
+def test_export_streams_every_batch(client, admin):
+    _, headers = admin
+    # more than one BULK_BATCH_SIZE page, all read while the response streams
+    items = [{**ITEM, "name": f"Pizza {n}"} for n in range(600)]
+    assert client.post("/api/admin/menu/bulk", headers=headers, json=items).json()["created"] == 600
+
+    exported = client.get("/api/admin/menu/export", params={"format": "ndjson"}, headers=headers)
+    assert exported.status_code == 200
+    assert len(exported.text.splitlines()) == 600
+
+
+def test_bulk_upsert_without_on_conflict(client, admin, monkeypatch):
+    # dialects without INSERT ... ON CONFLICT insert new names and update existing ones
+    from app.crud import menu as menu_crud
+    monkeypatch.setattr(menu_crud, "_DIALECT_INSERTS", {})
+    _, headers = admin
+    client.post("/api/admin/menu", headers=headers, json=ITEM)
+
+    rows = [{**ITEM, "price": 11.0}, {**ITEM, "name": "Quattro Formaggi"}]
+    result = client.post("/api/admin/menu/bulk", params={"mode": "upsert"}, headers=headers, json=rows).json()
+    assert (result["created"], result["updated"], result["failed"]) == (1, 1, 0)
+    prices = {item["name"]: item["price"] for item in client.get("/api/admin/menu", headers=headers).json()}
+    assert prices == {"Margherita": 11.0, "Quattro Formaggi": 9.5}
@@ -0,0 +1,16 @@
+def test_token_revoked_when_restaurant_is_deleted(client, admin):
+    restaurant_id, headers = admin
+    assert client.get("/api/admin/dashboard", headers=headers).status_code == 200
+
+    assert client.delete(f"/api/restaurants/{restaurant_id}").status_code == 200
+    # the token still claims the deleted restaurant
+    assert client.get("/api/admin/dashboard", headers=headers).status_code == 401
+    assert client.get("/api/admin/restaurant", headers=headers).status_code == 401
+
+
+def test_tokens_of_other_restaurants_stay_valid(client, admin):
+    restaurant_id, headers = admin
+    other = client.post("/api/restaurants/", json={"name": "Other", "category": "Test", "rating": 4.0})
+
+    assert client.delete(f"/api/restaurants/{other.json()['id']}").status_code == 200
+    assert client.get("/api/admin/restaurant", headers=headers).json()["id"] == restaurant_id
@@ -0,0 +1,62 @@
+from app.core.cache import ALL_RESTAURANTS, InMemoryBackend, MenuCache, menu_cache
+
+
+def _names(page):
+    return {item["name"]: item["price"] for item in page["items"]}
+
+
+def test_menu_write_refreshes_cached_reads(client, admin):
+    restaurant_id, headers = admin
+    item = client.post(
+        "/api/admin/menu", headers=headers, json={"name": "Cannoli", "price": 777.0, "category": "dessert"}
+    ).json()
+
+    # cached: the restaurant's own responses, and a listing spanning every restaurant
+    full = client.get(f"/api/restaurants/{restaurant_id}/full").json()
+    assert [entry["price"] for entry in full["menu"]["dessert"]] == [777.0]
+    assert _names(client.get("/api/menu/", params={"restaurant_id": restaurant_id}).json()) == {"Cannoli": 777.0}
+    assert _names(client.get("/api/menu/", params={"min_price": 700}).json()) == {"Cannoli": 777.0}
+    assert menu_cache.get(menu_cache.make_key("restaurant_full", restaurant_id=restaurant_id)) is not None
+    assert menu_cache.get(menu_cache.make_key("menu", min_price=700.0, limit=50)) is not None
+
+    client.patch(f"/api/admin/menu/{item['id']}", headers=headers, json={"name": "Cannoli Siciliani", "price": 778.0})
+
+    full = client.get(f"/api/restaurants/{restaurant_id}/full").json()
+    assert [(entry["name"], entry["price"]) for entry in full["menu"]["dessert"]] == [("Cannoli Siciliani", 778.0)]
+    page = client.get("/api/menu/", params={"restaurant_id": restaurant_id}).json()
+    assert _names(page) == {"Cannoli Siciliani": 778.0}
+    assert _names(client.get("/api/menu/", params={"min_price": 700}).json()) == {"Cannoli Siciliani": 778.0}
+
+
+def test_restaurant_write_refreshes_cached_listing(client, admin):
+    restaurant_id, headers = admin
+    listing = {"category": "Cache Test", "limit": 100}
+    assert client.get("/api/restaurants/", params=listing).json()["items"] == []
+
+    client.patch("/api/admin/restaurant", headers=headers, json={"category": "Cache Test"})
+
+    items = client.get("/api/restaurants/", params=listing).json()["items"]
+    assert [restaurant["id"] for restaurant in items] == [restaurant_id]
+    assert client.get(f"/api/restaurants/{restaurant_id}").json()["category"] == "Cache Test"
+
+
+def test_invalidation_scopes():
+    cache = MenuCache(InMemoryBackend(max_entries=16, ttl_seconds=60))
+    invalidated = []
+    cache.add_listener(invalidated.append)
+    for key, scope in (("one", 1), ("two", 2), ("all", ALL_RESTAURANTS)):
+        cache.set(key, scope, key, cache.token())
+
+    cache.invalidate_restaurant(1)
+    assert cache.get("one") is None
+    assert cache.get("two") == "two"
+    assert cache.get("all") is None
+    assert invalidated == [1]
+
+
+def test_read_racing_a_write_is_not_stored():
+    cache = MenuCache(InMemoryBackend(max_entries=16, ttl_seconds=60))
+    token = cache.token()
+    cache.invalidate_restaurant(2)
+    cache.set("two", 2, "stale", token)
+    assert cache.get("two") is None
@@ -0,0 +1,61 @@
+import pytest
+
+ITEM = {"name": "Arancini", "price": 5.0, "category": "sides"}
+
+
+def _revalidate(client, url, etag, **params):
+    return client.get(url, params=params, headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+
+
+def _etag(client, url, **params):
+    response = client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+@pytest.mark.parametrize("path", ["/api/restaurants/{id}", "/api/restaurants/{id}/full", "/api/menu/snapshot/{id}"])
+def test_restaurant_reads_revalidate(client, admin, path):
+    restaurant_id, headers = admin
+    client.post("/api/admin/menu", headers=headers, json=ITEM)
+    url = path.format(id=restaurant_id)
+
+    etag = _etag(client, url)
+    response = _revalidate(client, url, etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    client.patch("/api/admin/restaurant", headers=headers, json={"rating": 3.5})
+    changed = _revalidate(client, url, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_menu_reads_revalidate(client, admin):
+    restaurant_id, headers = admin
+    item = client.post("/api/admin/menu", headers=headers, json=ITEM).json()
+    reads = [
+        (f"/api/menu/{item['id']}", {}),
+        ("/api/menu/", {"restaurant_id": restaurant_id}),
+        (f"/api/menu/snapshot/{restaurant_id}", {}),
+    ]
+
+    etags = [_etag(client, url, **params) for url, params in reads]
+    for (url, params), etag in zip(reads, etags):
+        assert _revalidate(client, url, etag, **params).status_code == 304
+
+    client.patch(f"/api/admin/menu/{item['id']}", headers=headers, json={"price": 5.5})
+    for (url, params), etag in zip(reads, etags):
+        changed = _revalidate(client, url, etag, **params)
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+
+def test_restaurant_listing_revalidates(client, admin):
+    _, headers = admin
+    listing = {"category": "Conditional Test"}
+    etag = _etag(client, "/api/restaurants/", **listing)
+    assert _revalidate(client, "/api/restaurants/", etag, **listing).status_code == 304
+
+    client.patch("/api/admin/restaurant", headers=headers, json={"category": "Conditional Test"})
+    assert _revalidate(client, "/api/restaurants/", etag, **listing).status_code == 200
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from app.core.jobs import JobKindStats, JobQueue, JobStore
+
+
+class SlowClaimStore(JobStore):
+    """Claims take a while on a threadpool thread, like a sync database call."""
+
+    def __init__(self):
+        self.claim_started = threading.Event()
+        self.claims_in_progress = 0
+        self.interrupted = False
+
+    def _claim(self):
+        self.claims_in_progress += 1
+        self.claim_started.set()
+        time.sleep(0.3)
+        self.claims_in_progress -= 1
+
+    async def claim(self, now):
+        try:
+            await asyncio.to_thread(self._claim)
+        except asyncio.CancelledError:
+            self.interrupted = True
+            raise
+        return None
+
+    async def requeue_stale(self, claimed_before) -> int:
+        return 0
+
+
+def test_stop_waits_for_claim_in_flight():
+    store = SlowClaimStore()
+    queue = JobQueue()
+    queue.store = store
+
+    async def run():
+        queue.start(workers=2)
+        await asyncio.to_thread(store.claim_started.wait, 1)
+        await queue.stop(timeout=5)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert not store.interrupted
+    assert store.claims_in_progress == 0
+
+
+def test_stop_cancels_workers_after_timeout():
+    queue = JobQueue()
+
+    class HangingStore(JobStore):
+        async def claim(self, now):
+            await asyncio.sleep(60)
+
+        async def requeue_stale(self, claimed_before) -> int:
+            return 0
+
+    queue.store = HangingStore()
+
+    async def run():
+        queue.start(workers=1)
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await queue.stop(timeout=0.2)
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 2
+
+
+def test_app_shutdown_with_database_claims_in_flight():
+    # claims on SQLite through the real job store, stopped at random points; a queue
+    # of its own, the app's one runs in the test client
+    from app.db.jobs import DatabaseJobStore
+    from app.db.database import engine
+    from app.db.migrations import upgrade_to_head
+
+    upgrade_to_head(engine)
+    job_queue = JobQueue()
+    job_queue.store = DatabaseJobStore()
+
+    async def run():
+        for delay in (0, 0.001, 0.005, 0.01, 0.02):
+            job_queue.start(workers=4)
+            await asyncio.sleep(delay)
+            await job_queue.stop(timeout=5)
+
+    asyncio.run(asyncio.wait_for(run(), 30))
+
+
+def test_job_kind_stats_snapshot():
+    stats = JobKindStats()
+    stats.wait.observe(0.2)
+    stats.wait.observe(120)
+    stats.run.observe(0.003)
+    stats.succeeded += 1
+
+    snapshot = stats.snapshot()
+    assert snapshot["wait"]["buckets"]["0.5"] == 1
+    assert snapshot["wait"]["buckets"]["300.0"] == 1
+    assert snapshot["wait"]["count"] == 2
+    assert snapshot["wait"]["sum_seconds"] == 120.2
+    assert snapshot["run"] == {
+        "buckets": {**dict.fromkeys(snapshot["run"]["buckets"], 0), "0.01": 1}, "count": 1, "sum_seconds": 0.003
+    }
+    assert snapshot["succeeded"] == 1
+
+
+def test_job_stats_are_internal(client, admin):
+    restaurant_id, headers = admin
+    client.post("/api/admin/menu", json={"name": "Soup", "price": 4, "category": "starters"}, headers=headers)
+
+    stats = client.get("/health/jobs").json()
+    assert set(stats) == {"depth", "latency"}
+    # no longer among the admin routes, where it showed every restaurant's jobs
+    assert client.get("/api/admin/jobs", headers=headers).status_code == 404
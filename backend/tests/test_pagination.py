@@ -0,0 +1,42 @@
+import pytest
+from app.core.pagination import encode_cursor
+
+
+def _pages(client, url, **params):
+    ids, cursor = [], None
+    while True:
+        page = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        assert len(page["items"]) <= params["limit"]
+        ids += [entry["id"] for entry in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_restaurant_cursor_round_trip(client):
+    created = [
+        client.post("/api/restaurants/", json={"name": f"Paged {n}", "category": "Pagination Test"}).json()["id"]
+        for n in range(5)
+    ]
+    assert _pages(client, "/api/restaurants/", category="Pagination Test", limit=2) == sorted(created)
+
+
+def test_menu_cursor_round_trip(client, admin):
+    restaurant_id, headers = admin
+    created = [
+        client.post("/api/admin/menu", headers=headers, json={"name": f"Dish {n}", "price": 4.0, "category": "mains"}).json()["id"]
+        for n in range(5)
+    ]
+    assert _pages(client, "/api/menu/", restaurant_id=restaurant_id, limit=2) == sorted(created)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!", encode_cursor(1, 2), encode_cursor(), "WyJhIl0"])
+def test_invalid_restaurant_cursor(client, cursor):
+    response = client.get("/api/restaurants/", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!", encode_cursor(1), encode_cursor(1, 2, 3), "WyJhIiwxXQ"])
+def test_invalid_menu_cursor(client, cursor):
+    response = client.get("/api/menu/", params={"cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import RATE_LIMIT_MAX_KEYS
+from app.core.rate_limit import RATE_LIMITS, LOGIN_FAILURE_RATE, MemoryBackend, Rate, rate_limiter
+
+
+# the limiter is off for the other tests (see conftest.py); on here, with empty counters
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend(RATE_LIMIT_MAX_KEYS))
+    return rate_limiter
+
+
+def _login(client, username, password="wrong"):
+    return client.post("/api/auth/login", data={"username": username, "password": password})
+
+
+def test_failed_logins_lock_the_account_only(client, limiter):
+    client.post("/api/auth/signup-admin", json={"email": "locked@example.com", "password": "secret"})
+    client.post("/api/auth/signup-admin", json={"email": "other@example.com", "password": "secret"})
+
+    for _ in range(LOGIN_FAILURE_RATE.requests):
+        assert _login(client, "locked@example.com").status_code == 401
+    response = _login(client, "locked@example.com", "secret")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # the same client, well within its per-IP budget, can still log in to another account
+    assert _login(client, "other@example.com", "secret").status_code == 200
+
+
+def test_requests_are_limited_per_ip(client, limiter):
+    # failures on distinct accounts, so that no account is locked
+    for n in range(RATE_LIMITS["auth"].requests):
+        assert _login(client, f"nobody{n}@example.com").status_code == 401
+    response = _login(client, "nobody@example.com")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    other_ip = TestClient(client.app, client=("203.0.113.7", 50000))
+    assert _login(other_ip, "nobody@example.com").status_code == 401
+
+
+def test_window_counts_previous_window_in_part():
+    backend = MemoryBackend(16)
+    rate = Rate.parse("2/minute")
+    backend.window_add("key", rate, 30)
+    backend.window_add("key", rate, 50)
+    assert backend.window_wait("key", rate, 59) > 0
+    # half of the previous window still overlaps the last minute at 90 s
+    assert backend.window_wait("key", rate, 90) == 0
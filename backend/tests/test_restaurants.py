@@ -0,0 +1,51 @@
+def test_restaurant_lifecycle(client):
+    created = client.post("/api/restaurants/", json={"name": "Trattoria", "category": "Italian", "rating": 4.5})
+    assert created.status_code == 201
+    restaurant_id = created.json()["id"]
+
+    assert client.get(f"/api/restaurants/{restaurant_id}").json()["name"] == "Trattoria"
+    edited = client.put(f"/api/restaurants/{restaurant_id}", json={"rating": 4.8})
+    assert edited.json()["rating"] == 4.8
+    assert client.get(f"/api/restaurants/{restaurant_id}").json()["rating"] == 4.8
+
+    listed = client.get("/api/restaurants/", params={"category": "Italian", "limit": 100}).json()
+    assert restaurant_id in [restaurant["id"] for restaurant in listed["items"]]
+
+    assert client.delete(f"/api/restaurants/{restaurant_id}").status_code == 200
+    assert client.get(f"/api/restaurants/{restaurant_id}").status_code == 404
+    assert client.delete(f"/api/restaurants/{restaurant_id}").status_code == 404
+    assert client.put(f"/api/restaurants/{restaurant_id}", json={"rating": 1}).status_code == 404
+
+
+def test_menu_reads_follow_admin_writes(client, admin):
+    restaurant_id, headers = admin
+    item = client.post(
+        "/api/admin/menu", json={"name": "Tiramisu", "price": 6.0, "category": "dessert"}, headers=headers
+    ).json()
+
+    assert client.get(f"/api/menu/{item['id']}").json()["name"] == "Tiramisu"
+    full = client.get(f"/api/restaurants/{restaurant_id}/full").json()
+    assert [entry["name"] for entry in full["menu"]["dessert"]] == ["Tiramisu"]
+    page = client.get("/api/menu/", params={"restaurant_id": restaurant_id}).json()
+    assert [entry["id"] for entry in page["items"]] == [item["id"]]
+
+    updated = client.patch(f"/api/admin/menu/{item['id']}", json={"price": 6.5}, headers=headers)
+    assert updated.json()["price"] == 6.5
+    assert client.get(f"/api/menu/{item['id']}").json()["price"] == 6.5
+    assert client.get(f"/api/admin/menu/{item['id']}", headers=headers).json()["price"] == 6.5
+    assert [entry["id"] for entry in client.get("/api/admin/menu", headers=headers).json()] == [item["id"]]
+
+    assert client.delete(f"/api/admin/menu/{item['id']}", headers=headers).status_code == 200
+    assert client.get(f"/api/menu/{item['id']}").status_code == 404
+    assert client.get(f"/api/admin/menu/{item['id']}", headers=headers).status_code == 404
+
+
+def test_admin_restaurant(client, admin):
+    restaurant_id, headers = admin
+    assert client.get("/api/admin/restaurant", headers=headers).json()["id"] == restaurant_id
+
+    updated = client.patch("/api/admin/restaurant", json={"name": "Renamed Kitchen"}, headers=headers)
+    assert updated.json()["name"] == "Renamed Kitchen"
+    full = client.get("/api/admin/restaurant/full", headers=headers).json()
+    assert full["name"] == "Renamed Kitchen"
+    assert not any(full["menu"].values())
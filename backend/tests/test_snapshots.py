@@ -0,0 +1,47 @@
+from app.core.config import SNAPSHOT_LANGUAGES
+from app.core.snapshots import LocalSnapshotStore, read_manifest, snapshot_store, write_snapshot
+from app.db import snapshots as snapshot_db
+from app.db.database import SessionLocal
+
+
+def _versions(*versions):
+    # current_version() answering each of `versions` in turn, then the last one
+    remaining = list(versions)
+    return lambda: remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+
+def test_stale_build_is_dropped(tmp_path):
+    store = LocalSnapshotStore(str(tmp_path))
+    write_snapshot(store, 1, "en", b"{}", 3, None, encodings=[], current_version=_versions(4))
+    assert read_manifest(store, 1, "en") is None
+
+    write_snapshot(store, 1, "en", b"{}", 4, None, encodings=[], current_version=_versions(4))
+    assert read_manifest(store, 1, "en")["menu_version"] == 4
+
+
+def test_write_during_manifest_put_retracts_it(tmp_path):
+    store = LocalSnapshotStore(str(tmp_path))
+    # current before the manifest is written, bumped right after
+    write_snapshot(store, 1, "en", b"{}", 3, None, encodings=[], current_version=_versions(3, 4))
+    assert read_manifest(store, 1, "en") is None
+
+
+def test_rebuild_racing_a_write(client, admin, monkeypatch):
+    restaurant_id, headers = admin
+    item = client.post("/api/admin/menu", headers=headers, json={"name": "Gnocchi", "price": 9.0, "category": "mains"}).json()
+    load = snapshot_db.get_restaurant_with_menu
+
+    def load_then_write(db, restaurant_id):
+        restaurant = load(db, restaurant_id)
+        # the write commits and invalidates while this build still holds the old menu
+        client.patch(f"/api/admin/menu/{item['id']}", headers=headers, json={"price": 9.5})
+        return restaurant
+
+    monkeypatch.setattr(snapshot_db, "get_restaurant_with_menu", load_then_write)
+    with SessionLocal() as db:
+        snapshot_db.rebuild_snapshot(db, restaurant_id)
+
+    for lang in SNAPSHOT_LANGUAGES:
+        assert read_manifest(snapshot_store, restaurant_id, lang) is None
+    snapshot = client.get(f"/api/menu/snapshot/{restaurant_id}", headers={"Accept-Encoding": "identity"}).json()
+    assert [entry["price"] for entry in snapshot["menu"]["mains"]] == [9.5]
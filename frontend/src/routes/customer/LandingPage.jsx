@@ -15,8 +15,17 @@ export default function GustoHome() {
 
   const fetchRestaurants = async () => {
     try {
-      const response = await api.get("/api/restaurants/");
-      setRestaurants(response.data);
+      // the listing is paginated; the search below filters every restaurant, so fetch all pages
+      const all = [];
+      let cursor = null;
+      do {
+        const response = await api.get("/api/restaurants/", {
+          params: { limit: 200, ...(cursor && { cursor }) },
+        });
+        all.push(...response.data.items);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+      setRestaurants(all);
       setLoading(false);
     } catch (err) {
       console.error("Error fetching restaurants:", err);
@@ -19,9 +19,10 @@ export default function MenuPage() {
 
   const fetchMenuItems = async () => {
     try {
-      //fetch menu items based on restaurant
-      const response = await api.get(`/api/menu/?restaurant_id=${restaurantId}`);
-      setMenuItems(response.data);
+      //fetch the restaurant with its menu (grouped by category) in one request
+      const response = await api.get(`/api/restaurants/${restaurantId}/full`);
+      const items = Object.values(response.data.menu).flat();
+      setMenuItems(items);
       setLoading(false);
     } catch (err) {
       console.error("Error fetching menu:", err);